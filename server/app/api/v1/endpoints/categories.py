@@ -4,6 +4,7 @@ from typing import List
 
 from app.core.database import get_db
 from app.models.category import Category
+from app.utils.cache import invalidate_categories
 from app.schemas.category import (
     CategoryCreate,
     CategoryResponse,
@@ -36,6 +37,7 @@ def create_category(
     
     db.add(db_category)
     db.commit()
+    invalidate_categories()
     db.refresh(db_category)
     
     return {
@@ -76,6 +78,7 @@ def delete_category(
     # 真删除
     db.delete(category)
     db.commit()
+    invalidate_categories()
     
     return DeleteCategoryResponse(
         message="类目删除成功",
@@ -2,6 +2,8 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from datetime import datetime
 
+from app.utils.cache import cache_stats
+
 router = APIRouter()
 
 
@@ -37,4 +39,10 @@ async def service_status():
             "database": "connected",
             "timestamp": datetime.now().isoformat()
         }
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/cache")
+async def cache_status():
+    """类目、用户查询缓存的命中统计"""
+    return {"caches": cache_stats()}
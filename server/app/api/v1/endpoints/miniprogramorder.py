@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, text, Integer
-from typing import List, Optional
+from sqlalchemy import and_, or_, func, text, Integer, literal, union_all
+from typing import Dict, List, Optional
 from datetime import datetime, date
 import traceback
 
@@ -18,13 +19,15 @@ from app.schemas.order import (
     OrderListItem
 )
 from app.core.response import success_response, error_response
-from app.utils.scheduler import calculate_design_cycle_days
+from app.utils.scheduler import calculate_design_cycle_days_batch
+from app.utils.batch import chunked
+from app.utils.order_timeline import etag_cache, get_order_timeline
 
 router = APIRouter()
 
 
 @router.post("/list", response_model=OrderListResponse, summary="小程序订单列表查询")
-async def get_miniprogram_orders(
+def get_miniprogram_orders(
     query_data: OrderListQuery,
     db: Session = Depends(get_db)
 ):
@@ -49,17 +52,17 @@ async def get_miniprogram_orders(
                 # 只查询一个表
                 progress = order_progress[0]
                 if progress == "设计":
-                    return await _get_orders_from_design(query_data, db)
+                    return _get_orders_from_design(query_data, db)
                 elif progress == "拆单":
-                    return await _get_orders_from_split(query_data, db)
+                    return _get_orders_from_split(query_data, db)
                 elif progress == "生产":
-                    return await _get_orders_from_production(query_data, db)
+                    return _get_orders_from_production(query_data, db)
             else:
                 # 查询多个表或全部表，需要合并并去重
-                return await _get_orders_merged(query_data, db)
+                return _get_orders_merged(query_data, db)
         
         # 默认查询全部订单（三个表合并去重）
-        return await _get_orders_merged(query_data, db)
+        return _get_orders_merged(query_data, db)
 
     except Exception as e:
         traceback.print_exc()
@@ -73,187 +76,221 @@ async def get_miniprogram_orders(
         )
 
 
-async def _get_orders_from_design(query_data: OrderListQuery, db: Session):
-    """从设计订单表查询"""
-    try:
-        # 构建查询
-        query = db.query(Order).options(
-            joinedload(Order.progresses)
-        )
+def _paginate(query, query_data: OrderListQuery):
+    """对查询分页，返回 (记录列表, 总数, 页码, 每页数量, 总页数)"""
+    total = query.count()
+    if query_data.no_pagination:
+        return query.all(), total, 1, total, 1
+    offset = (query_data.page - 1) * query_data.page_size
+    rows = query.offset(offset).limit(query_data.page_size).all()
+    page_size = query_data.page_size
+    return rows, total, query_data.page, page_size, (total + page_size - 1) // page_size
 
-        # 判断是否需要关联拆单表（用于拆单员和报价状态筛选）
-        need_join_split = query_data.splitter or query_data.quote_status
-        
-        if need_join_split:
-            # 使用 LEFT JOIN 关联拆单表，避免丢失没有拆单记录的订单
-            query = query.outerjoin(Split, Order.order_number == Split.order_number)
-
-        # 应用搜索条件（仅保留小程序需要的字段）
-        if query_data.order_number:
-            query = query.filter(Order.order_number.ilike(
-                f"%{query_data.order_number}%"))
-
-        if query_data.customer_name:
-            query = query.filter(Order.customer_name.ilike(
-                f"%{query_data.customer_name}%"))
-
-        if query_data.designer:
-            query = query.filter(Order.designer.ilike(
-                f"%{query_data.designer}%"))
-
-        if query_data.salesperson:
-            query = query.filter(Order.salesperson.ilike(
-                f"%{query_data.salesperson}%"))
-
-        # 拆单员筛选：通过关联的拆单表筛选
-        if query_data.splitter:
-            query = query.filter(Split.splitter.ilike(
-                f"%{query_data.splitter}%"))
-
-        # 报价状态筛选：通过关联的拆单表筛选
-        if query_data.quote_status:
-            query = query.filter(Split.quote_status.in_(query_data.quote_status))
-
-        if query_data.order_type:
-            query = query.filter(Order.order_type == query_data.order_type)
-
-        if query_data.category_names:
-            category_conditions = []
-            for category in query_data.category_names:
-                category_conditions.append(
-                    Order.category_name.like(f"%{category}%"))
-            query = query.filter(or_(*category_conditions))
-        
-        # 订单状态详情筛选（设计管理）
-        order_status_detail = getattr(query_data, 'order_status_detail', None)
-        if order_status_detail and len(order_status_detail) > 0:
-            # 定义设计管理的所有已知状态
-            design_statuses = [
-                "量尺", "初稿", "公司对方案", "线上对方案", "改图", "客户确认图",
-                "客户硬装阶段", "出内部结构图", "出下单图", "复尺", "报价", "打款", 
-                "下单", "暂停", "已下单", "已撤销", "其他"
-            ]
-            
-            # 检查是否包含"其他"状态
-            if "其他" in order_status_detail:
-                # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
-                if len(order_status_detail) == 1:
-                    query = query.filter(
-                        ~Order.order_status.in_(design_statuses))
-                else:
-                    # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
-                    other_selected_statuses = [
-                        s for s in order_status_detail if s != "其他"]
-                    query = query.filter(
-                        or_(
-                            Order.order_status.in_(other_selected_statuses),
-                            ~Order.order_status.in_(design_statuses)
-                        )
-                    )
+
+def _load_by_order_number(db: Session, model, order_numbers: List[str]) -> Dict[str, object]:
+    """按订单编号批量查询记录，每个订单编号保留id最小的一条"""
+    record_map = {}
+    order_numbers = list(dict.fromkeys(order_numbers))
+    for chunk in chunked(order_numbers):
+        records = db.query(model).filter(
+            model.order_number.in_(chunk)
+        ).order_by(model.id).all()
+        for record in records:
+            record_map.setdefault(record.order_number, record)
+    return record_map
+
+
+def _is_specific_progress(query_data: OrderListQuery, progress: str) -> bool:
+    """前端是否只选择了指定的订单进度"""
+    order_progress = getattr(query_data, 'order_progress', None)
+    return bool(order_progress and len(order_progress) == 1 and order_progress[0] == progress)
+
+
+def _build_design_query(query_data: OrderListQuery, db: Session):
+    """构建设计订单表的筛选查询（不含排序和分页）"""
+    query = db.query(Order)
+
+    # 判断是否需要关联拆单表（用于拆单员和报价状态筛选）
+    need_join_split = query_data.splitter or query_data.quote_status
+    
+    if need_join_split:
+        # 使用 LEFT JOIN 关联拆单表，避免丢失没有拆单记录的订单
+        query = query.outerjoin(Split, Order.order_number == Split.order_number)
+
+    # 应用搜索条件（仅保留小程序需要的字段）
+    if query_data.order_number:
+        query = query.filter(Order.order_number.ilike(
+            f"%{query_data.order_number}%"))
+
+    if query_data.customer_name:
+        query = query.filter(Order.customer_name.ilike(
+            f"%{query_data.customer_name}%"))
+
+    if query_data.designer:
+        query = query.filter(Order.designer.ilike(
+            f"%{query_data.designer}%"))
+
+    if query_data.salesperson:
+        query = query.filter(Order.salesperson.ilike(
+            f"%{query_data.salesperson}%"))
+
+    # 拆单员筛选：通过关联的拆单表筛选
+    if query_data.splitter:
+        query = query.filter(Split.splitter.ilike(
+            f"%{query_data.splitter}%"))
+
+    # 报价状态筛选：通过关联的拆单表筛选
+    if query_data.quote_status:
+        query = query.filter(Split.quote_status.in_(query_data.quote_status))
+
+    if query_data.order_type:
+        query = query.filter(Order.order_type == query_data.order_type)
+
+    if query_data.category_names:
+        category_conditions = []
+        for category in query_data.category_names:
+            category_conditions.append(
+                Order.category_name.like(f"%{category}%"))
+        query = query.filter(or_(*category_conditions))
+    
+    # 订单状态详情筛选（设计管理）
+    order_status_detail = getattr(query_data, 'order_status_detail', None)
+    if order_status_detail and len(order_status_detail) > 0:
+        # 定义设计管理的所有已知状态
+        design_statuses = [
+            "量尺", "初稿", "公司对方案", "线上对方案", "改图", "客户确认图",
+            "客户硬装阶段", "出内部结构图", "出下单图", "复尺", "报价", "打款", 
+            "下单", "暂停", "已下单", "已撤销", "其他"
+        ]
+        
+        # 检查是否包含"其他"状态
+        if "其他" in order_status_detail:
+            # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
+            if len(order_status_detail) == 1:
+                query = query.filter(
+                    ~Order.order_status.in_(design_statuses))
             else:
-                # 如果没有选择"其他"，则按原逻辑筛选
+                # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
+                other_selected_statuses = [
+                    s for s in order_status_detail if s != "其他"]
                 query = query.filter(
-                    Order.order_status.in_(order_status_detail))
-        
-        # 如果关联了拆单表，需要去重（因为一个订单可能对应多个拆单记录，虽然理论上应该只有一个）
-        if need_join_split:
-            query = query.distinct()
-
-        query = query.order_by(Order.assignment_date.desc())
-
-        # 分页
-        total = query.count()
-        if query_data.no_pagination:
-            orders = query.all()
-            page = 1
-            page_size = total
-            total_pages = 1
+                    or_(
+                        Order.order_status.in_(other_selected_statuses),
+                        ~Order.order_status.in_(design_statuses)
+                    )
+                )
         else:
-            offset = (query_data.page - 1) * query_data.page_size
-            orders = query.offset(offset).limit(query_data.page_size).all()
-            page = query_data.page
-            page_size = query_data.page_size
-            total_pages = (total + page_size - 1) // page_size
-
-        # 转换为响应格式
-        order_items = []
-        for order in orders:
-            design_process_items = []
-            if order.progresses:
-                sorted_progresses = sorted(
-                    order.progresses, key=lambda p: p.created_at, reverse=True)
-                for p in sorted_progresses:
-                    planned = p.planned_date if p.planned_date else "-"
-                    actual = p.actual_date if p.actual_date else "-"
-                    design_process_items.append(f"{p.task_item}:{planned}:{actual}")
-                design_process = ",".join(design_process_items)
-            else:
-                design_process = "暂无进度"
-
-            calculated_design_cycle = str(calculate_design_cycle_days(
-                order.assignment_date, 
-                order.order_date, 
-                order.order_status
-            ))
-
-            # 动态获取订单状态：如果设计阶段已下单，查看拆单状态；如果拆单阶段已下单，查看生产状态
-            final_order_status = order.order_status
-            quote_status = None
-            splitter = None
-            progress_prefix = "设计"  # 默认前缀
-            
-            # 检查前端是否选择了具体的进度
-            order_progress = getattr(query_data, 'order_progress', None)
-            is_specific_progress = order_progress and len(order_progress) == 1 and order_progress[0] == "设计"
-            
-            # 查询拆单表获取拆单员和报价状态
-            split = db.query(Split).filter(Split.order_number == order.order_number).first()
-            if split:
-                splitter = split.splitter
-                quote_status = split.quote_status
-                # 如果前端选择了具体的进度，就不自动变更状态前缀
-                if not is_specific_progress:
-                    # 如果设计阶段状态是"已下单"，查看拆单表的状态
-                    if order.order_status == "已下单":
-                        # 如果拆单状态也是"已下单"，查询生产表的状态
-                        if split.order_status == "已下单":
-                            production = db.query(Production).filter(Production.order_number == order.order_number).first()
-                            if production:
-                                final_order_status = production.order_status
-                                progress_prefix = "生产"
-                            else:
-                                final_order_status = split.order_status
-                                progress_prefix = "拆单"
+            # 如果没有选择"其他"，则按原逻辑筛选
+            query = query.filter(
+                Order.order_status.in_(order_status_detail))
+    
+    # 如果关联了拆单表，需要去重（因为一个订单可能对应多个拆单记录，虽然理论上应该只有一个）
+    if need_join_split:
+        query = query.distinct()
+
+    return query
+
+
+def _build_design_items(orders: List[Order], is_specific_progress: bool, db: Session) -> List[OrderListItem]:
+    """将设计订单转换为列表项"""
+    # 批量查询当前页的拆单记录，以及需要查看生产状态的生产记录
+    split_map = _load_by_order_number(db, Split, [order.order_number for order in orders])
+    production_map = {}
+    if not is_specific_progress:
+        production_map = _load_by_order_number(db, Production, [
+            order.order_number for order in orders
+            if order.order_status == "已下单"
+            and order.order_number in split_map
+            and split_map[order.order_number].order_status == "已下单"
+        ])
+
+    design_cycles = calculate_design_cycle_days_batch(
+        [order.assignment_date for order in orders],
+        [order.order_date for order in orders],
+        [order.order_status for order in orders]
+    )
+
+    order_items = []
+    for order, design_cycle in zip(orders, design_cycles):
+        design_process_items = []
+        if order.progresses:
+            sorted_progresses = sorted(
+                order.progresses, key=lambda p: p.created_at, reverse=True)
+            for p in sorted_progresses:
+                planned = p.planned_date if p.planned_date else "-"
+                actual = p.actual_date if p.actual_date else "-"
+                design_process_items.append(f"{p.task_item}:{planned}:{actual}")
+            design_process = ",".join(design_process_items)
+        else:
+            design_process = "暂无进度"
+
+        # 动态获取订单状态：如果设计阶段已下单，查看拆单状态；如果拆单阶段已下单，查看生产状态
+        final_order_status = order.order_status
+        quote_status = None
+        splitter = None
+        progress_prefix = "设计"  # 默认前缀
+        
+        # 拆单表中的拆单员和报价状态
+        split = split_map.get(order.order_number)
+        if split:
+            splitter = split.splitter
+            quote_status = split.quote_status
+            # 如果前端选择了具体的进度，就不自动变更状态前缀
+            if not is_specific_progress:
+                # 如果设计阶段状态是"已下单"，查看拆单表的状态
+                if order.order_status == "已下单":
+                    # 如果拆单状态也是"已下单"，查询生产表的状态
+                    if split.order_status == "已下单":
+                        production = production_map.get(order.order_number)
+                        if production:
+                            final_order_status = production.order_status
+                            progress_prefix = "生产"
                         else:
                             final_order_status = split.order_status
                             progress_prefix = "拆单"
-            
-            # 添加进度前缀
-            final_order_status = f"{progress_prefix}-{final_order_status}"
-
-            order_item = OrderListItem(
-                id=order.id,
-                order_number=order.order_number,
-                customer_name=order.customer_name,
-                address=order.address,
-                designer=order.designer,
-                salesperson=order.salesperson,
-                splitter=splitter,
-                assignment_date=order.assignment_date,
-                design_process=design_process,
-                category_name=order.category_name,
-                design_cycle=calculated_design_cycle,
-                order_date=order.order_date,
-                order_type=order.order_type,
-                is_installation=order.is_installation,
-                cabinet_area=order.cabinet_area,
-                wall_panel_area=order.wall_panel_area,
-                order_amount=order.order_amount,
-                remarks=order.remarks,
-                order_status=final_order_status,
-                quote_status=quote_status
-            )
-            order_items.append(order_item)
+                    else:
+                        final_order_status = split.order_status
+                        progress_prefix = "拆单"
+        
+        # 添加进度前缀
+        final_order_status = f"{progress_prefix}-{final_order_status}"
+
+        order_item = OrderListItem(
+            id=order.id,
+            order_number=order.order_number,
+            customer_name=order.customer_name,
+            address=order.address,
+            designer=order.designer,
+            salesperson=order.salesperson,
+            splitter=splitter,
+            assignment_date=order.assignment_date,
+            design_process=design_process,
+            category_name=order.category_name,
+            design_cycle=str(design_cycle),
+            order_date=order.order_date,
+            order_type=order.order_type,
+            is_installation=order.is_installation,
+            cabinet_area=order.cabinet_area,
+            wall_panel_area=order.wall_panel_area,
+            order_amount=order.order_amount,
+            remarks=order.remarks,
+            order_status=final_order_status,
+            quote_status=quote_status
+        )
+        order_items.append(order_item)
+    return order_items
+
+
+def _get_orders_from_design(query_data: OrderListQuery, db: Session):
+    """从设计订单表查询"""
+    try:
+        query = _build_design_query(query_data, db).options(
+            joinedload(Order.progresses)
+        ).order_by(Order.assignment_date.desc())
+
+        orders, total, page, page_size, total_pages = _paginate(query, query_data)
+        order_items = _build_design_items(
+            orders, _is_specific_progress(query_data, "设计"), db)
 
         return OrderListResponse(
             items=order_items,
@@ -274,124 +311,124 @@ async def _get_orders_from_design(query_data: OrderListQuery, db: Session):
         )
 
 
-async def _get_orders_from_split(query_data: OrderListQuery, db: Session):
-    """从拆单表查询"""
-    try:
-        # 直接查询拆单表
-        query = db.query(Split)
-        
-        # 应用搜索条件（仅保留小程序需要的字段）
-        if query_data.order_number:
-            query = query.filter(Split.order_number.contains(query_data.order_number))
-        if query_data.customer_name:
-            query = query.filter(Split.customer_name.contains(query_data.customer_name))
-        if query_data.designer:
-            query = query.filter(Split.designer.contains(query_data.designer))
-        if query_data.salesperson:
-            query = query.filter(Split.salesperson.contains(query_data.salesperson))
-        if query_data.splitter:
-            query = query.filter(Split.splitter.contains(query_data.splitter))
-        if query_data.order_type:
-            query = query.filter(Split.order_type == query_data.order_type)
-        if query_data.quote_status:
-            query = query.filter(Split.quote_status.in_(query_data.quote_status))
-        if query_data.category_names:
-            # 通过SplitProgress查询
-            split_ids_with_categories = db.query(SplitProgress.split_id).filter(
-                SplitProgress.category_name.in_(query_data.category_names)
-            ).distinct().subquery()
-            query = query.filter(Split.id.in_(split_ids_with_categories))
-        
-        # 订单状态详情筛选（拆单管理）
-        order_status_detail = getattr(query_data, 'order_status_detail', None)
-        if order_status_detail and len(order_status_detail) > 0:
-            # 定义拆单管理的所有已知状态
-            split_statuses = [
-                "未开始", "拆单中", "撤销中", "未审核", "已审核", "已下单"
-            ]
-            
-            # 检查是否包含"其他"状态
-            if "其他" in order_status_detail:
-                # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
-                if len(order_status_detail) == 1:
-                    query = query.filter(
-                        ~Split.order_status.in_(split_statuses))
-                else:
-                    # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
-                    other_selected_statuses = [
-                        s for s in order_status_detail if s != "其他"]
-                    query = query.filter(
-                        or_(
-                            Split.order_status.in_(other_selected_statuses),
-                            ~Split.order_status.in_(split_statuses)
-                        )
-                    )
+def _build_split_query(query_data: OrderListQuery, db: Session):
+    """构建拆单表的筛选查询（不含排序和分页）"""
+    query = db.query(Split)
+    
+    # 应用搜索条件（仅保留小程序需要的字段）
+    if query_data.order_number:
+        query = query.filter(Split.order_number.contains(query_data.order_number))
+    if query_data.customer_name:
+        query = query.filter(Split.customer_name.contains(query_data.customer_name))
+    if query_data.designer:
+        query = query.filter(Split.designer.contains(query_data.designer))
+    if query_data.salesperson:
+        query = query.filter(Split.salesperson.contains(query_data.salesperson))
+    if query_data.splitter:
+        query = query.filter(Split.splitter.contains(query_data.splitter))
+    if query_data.order_type:
+        query = query.filter(Split.order_type == query_data.order_type)
+    if query_data.quote_status:
+        query = query.filter(Split.quote_status.in_(query_data.quote_status))
+    if query_data.category_names:
+        # 通过SplitProgress查询
+        split_ids_with_categories = db.query(SplitProgress.split_id).filter(
+            SplitProgress.category_name.in_(query_data.category_names)
+        ).distinct().subquery()
+        query = query.filter(Split.id.in_(split_ids_with_categories))
+    
+    # 订单状态详情筛选（拆单管理）
+    order_status_detail = getattr(query_data, 'order_status_detail', None)
+    if order_status_detail and len(order_status_detail) > 0:
+        # 定义拆单管理的所有已知状态
+        split_statuses = [
+            "未开始", "拆单中", "撤销中", "未审核", "已审核", "已下单"
+        ]
+        
+        # 检查是否包含"其他"状态
+        if "其他" in order_status_detail:
+            # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
+            if len(order_status_detail) == 1:
+                query = query.filter(
+                    ~Split.order_status.in_(split_statuses))
             else:
-                # 如果没有选择"其他"，则按原逻辑筛选
+                # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
+                other_selected_statuses = [
+                    s for s in order_status_detail if s != "其他"]
                 query = query.filter(
-                    Split.order_status.in_(order_status_detail))
-        
-        # 排序
-        query = query.order_by(Split.order_date.desc(), Split.order_number.desc())
-        
-        # 分页
-        total = query.count()
-        if query_data.no_pagination:
-            splits = query.all()
-            page = 1
-            page_size = total
-            total_pages = 1
+                    or_(
+                        Split.order_status.in_(other_selected_statuses),
+                        ~Split.order_status.in_(split_statuses)
+                    )
+                )
         else:
-            offset = (query_data.page - 1) * query_data.page_size
-            splits = query.offset(offset).limit(query_data.page_size).all()
-            page = query_data.page
-            page_size = query_data.page_size
-            total_pages = (total + page_size - 1) // page_size
-        
-        # 转换为 OrderListResponse 格式
-        order_items = []
-        # 检查前端是否选择了具体的进度
-        order_progress = getattr(query_data, 'order_progress', None)
-        is_specific_progress = order_progress and len(order_progress) == 1 and order_progress[0] == "拆单"
-        
-        for split in splits:
-            # 动态获取订单状态：如果拆单阶段状态是"已下单"，查看生产表的状态
-            final_order_status = split.order_status
-            progress_prefix = "拆单"  # 默认前缀
-            # 如果前端选择了具体的进度，就不自动变更状态前缀
-            if not is_specific_progress:
-                if split.order_status == "已下单":
-                    production = db.query(Production).filter(Production.order_number == split.order_number).first()
-                    if production:
-                        final_order_status = production.order_status
-                        progress_prefix = "生产"
-            
-            # 添加进度前缀
-            final_order_status = f"{progress_prefix}-{final_order_status}"
-            
-            order_item = OrderListItem(
-                id=split.id,
-                order_number=split.order_number,
-                customer_name=split.customer_name,
-                address=split.address,
-                designer=split.designer,
-                salesperson=split.salesperson,
-                splitter=split.splitter,  # 拆单表有拆单员
-                assignment_date=split.order_date or "",  # 拆单没有assignment_date，使用order_date
-                design_process="",
-                category_name="",  # 拆单的类目信息在split_progress中
-                design_cycle="",
-                order_date=split.order_date,
-                order_type=split.order_type,
-                is_installation=False,  # 拆单表没有is_installation字段
-                cabinet_area=split.cabinet_area,
-                wall_panel_area=split.wall_panel_area,
-                order_amount=split.order_amount,
-                remarks=split.remarks,
-                order_status=final_order_status,
-                quote_status=split.quote_status
-            )
-            order_items.append(order_item)
+            # 如果没有选择"其他"，则按原逻辑筛选
+            query = query.filter(
+                Split.order_status.in_(order_status_detail))
+
+    return query
+
+
+def _build_split_items(splits: List[Split], is_specific_progress: bool, db: Session) -> List[OrderListItem]:
+    """将拆单记录转换为列表项"""
+    # 批量查询已下单拆单对应的生产记录
+    production_map = {}
+    if not is_specific_progress:
+        production_map = _load_by_order_number(db, Production, [
+            split.order_number for split in splits if split.order_status == "已下单"
+        ])
+
+    order_items = []
+    for split in splits:
+        # 动态获取订单状态：如果拆单阶段状态是"已下单"，查看生产表的状态
+        final_order_status = split.order_status
+        progress_prefix = "拆单"  # 默认前缀
+        # 如果前端选择了具体的进度，就不自动变更状态前缀
+        if not is_specific_progress:
+            if split.order_status == "已下单":
+                production = production_map.get(split.order_number)
+                if production:
+                    final_order_status = production.order_status
+                    progress_prefix = "生产"
+        
+        # 添加进度前缀
+        final_order_status = f"{progress_prefix}-{final_order_status}"
+        
+        order_item = OrderListItem(
+            id=split.id,
+            order_number=split.order_number,
+            customer_name=split.customer_name,
+            address=split.address,
+            designer=split.designer,
+            salesperson=split.salesperson,
+            splitter=split.splitter,  # 拆单表有拆单员
+            assignment_date=split.order_date or "",  # 拆单没有assignment_date，使用order_date
+            design_process="",
+            category_name="",  # 拆单的类目信息在split_progress中
+            design_cycle="",
+            order_date=split.order_date,
+            order_type=split.order_type,
+            is_installation=False,  # 拆单表没有is_installation字段
+            cabinet_area=split.cabinet_area,
+            wall_panel_area=split.wall_panel_area,
+            order_amount=split.order_amount,
+            remarks=split.remarks,
+            order_status=final_order_status,
+            quote_status=split.quote_status
+        )
+        order_items.append(order_item)
+    return order_items
+
+
+def _get_orders_from_split(query_data: OrderListQuery, db: Session):
+    """从拆单表查询"""
+    try:
+        query = _build_split_query(query_data, db).order_by(
+            Split.order_date.desc(), Split.order_number.desc())
+
+        splits, total, page, page_size, total_pages = _paginate(query, query_data)
+        order_items = _build_split_items(
+            splits, _is_specific_progress(query_data, "拆单"), db)
         
         return OrderListResponse(
             items=order_items,
@@ -412,160 +449,155 @@ async def _get_orders_from_split(query_data: OrderListQuery, db: Session):
         )
 
 
-async def _get_orders_from_production(query_data: OrderListQuery, db: Session):
-    """从生产表查询"""
-    try:
-        # 直接查询生产表
-        query = db.query(Production)
-        
-        # 判断是否需要关联拆单表（用于设计师、销售员、订单类型、报价状态筛选）
-        need_join_split = (query_data.designer or query_data.salesperson or 
-                          query_data.order_type or query_data.quote_status)
-        
-        if need_join_split:
-            # 使用 LEFT JOIN 关联拆单表
-            query = query.outerjoin(Split, Production.order_number == Split.order_number)
-        
-        # 应用搜索条件（仅保留小程序需要的字段）
-        if query_data.order_number:
-            query = query.filter(Production.order_number.like(f"%{query_data.order_number}%"))
-        if query_data.customer_name:
-            query = query.filter(Production.customer_name.like(f"%{query_data.customer_name}%"))
-        
-        # 设计师筛选：通过关联的拆单表筛选
-        if query_data.designer:
-            query = query.filter(Split.designer.ilike(
-                f"%{query_data.designer}%"))
-        
-        # 销售员筛选：通过关联的拆单表筛选
-        if query_data.salesperson:
-            query = query.filter(Split.salesperson.ilike(
-                f"%{query_data.salesperson}%"))
-        
-        # 拆单员筛选：生产表本身有splitter字段
-        if query_data.splitter:
-            query = query.filter(Production.splitter.ilike(
-                f"%{query_data.splitter}%"))
-        
-        # 订单类型筛选：通过关联的拆单表筛选
-        if query_data.order_type:
-            query = query.filter(Split.order_type == query_data.order_type)
-        
-        # 报价状态筛选：通过关联的拆单表筛选
-        if query_data.quote_status:
-            query = query.filter(Split.quote_status.in_(query_data.quote_status))
-        
-        if query_data.category_names:
-            # 通过ProductionProgress查询
-            query = query.join(ProductionProgress, Production.id == ProductionProgress.production_id)
-            query = query.filter(ProductionProgress.category_name.in_(query_data.category_names))
-            query = query.distinct()
-        elif need_join_split:
-            # 如果关联了拆单表但没有关联ProductionProgress，也需要去重
-            query = query.distinct()
-        
-        # 订单状态详情筛选（生产管理）
-        order_status_detail = getattr(query_data, 'order_status_detail', None)
-        if order_status_detail and len(order_status_detail) > 0:
-            # 定义生产管理的所有已知状态
-            production_statuses = [
-                "未齐料", "已齐料", "已下料", "已入库", "已发货", "已完成"
-            ]
-            
-            # 检查是否包含"其他"状态
-            if "其他" in order_status_detail:
-                # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
-                if len(order_status_detail) == 1:
-                    query = query.filter(
-                        ~Production.order_status.in_(production_statuses))
-                else:
-                    # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
-                    other_selected_statuses = [
-                        s for s in order_status_detail if s != "其他"]
-                    query = query.filter(
-                        or_(
-                            Production.order_status.in_(other_selected_statuses),
-                            ~Production.order_status.in_(production_statuses)
-                        )
-                    )
+def _build_production_query(query_data: OrderListQuery, db: Session):
+    """构建生产表的筛选查询（不含排序和分页）"""
+    query = db.query(Production)
+    
+    # 判断是否需要关联拆单表（用于设计师、销售员、订单类型、报价状态筛选）
+    need_join_split = (query_data.designer or query_data.salesperson or 
+                      query_data.order_type or query_data.quote_status)
+    
+    if need_join_split:
+        # 使用 LEFT JOIN 关联拆单表
+        query = query.outerjoin(Split, Production.order_number == Split.order_number)
+    
+    # 应用搜索条件（仅保留小程序需要的字段）
+    if query_data.order_number:
+        query = query.filter(Production.order_number.like(f"%{query_data.order_number}%"))
+    if query_data.customer_name:
+        query = query.filter(Production.customer_name.like(f"%{query_data.customer_name}%"))
+    
+    # 设计师筛选：通过关联的拆单表筛选
+    if query_data.designer:
+        query = query.filter(Split.designer.ilike(
+            f"%{query_data.designer}%"))
+    
+    # 销售员筛选：通过关联的拆单表筛选
+    if query_data.salesperson:
+        query = query.filter(Split.salesperson.ilike(
+            f"%{query_data.salesperson}%"))
+    
+    # 拆单员筛选：生产表本身有splitter字段
+    if query_data.splitter:
+        query = query.filter(Production.splitter.ilike(
+            f"%{query_data.splitter}%"))
+    
+    # 订单类型筛选：通过关联的拆单表筛选
+    if query_data.order_type:
+        query = query.filter(Split.order_type == query_data.order_type)
+    
+    # 报价状态筛选：通过关联的拆单表筛选
+    if query_data.quote_status:
+        query = query.filter(Split.quote_status.in_(query_data.quote_status))
+    
+    if query_data.category_names:
+        # 通过ProductionProgress查询
+        query = query.join(ProductionProgress, Production.id == ProductionProgress.production_id)
+        query = query.filter(ProductionProgress.category_name.in_(query_data.category_names))
+        query = query.distinct()
+    elif need_join_split:
+        # 如果关联了拆单表但没有关联ProductionProgress，也需要去重
+        query = query.distinct()
+    
+    # 订单状态详情筛选（生产管理）
+    order_status_detail = getattr(query_data, 'order_status_detail', None)
+    if order_status_detail and len(order_status_detail) > 0:
+        # 定义生产管理的所有已知状态
+        production_statuses = [
+            "未齐料", "已齐料", "已下料", "已入库", "已发货", "已完成"
+        ]
+        
+        # 检查是否包含"其他"状态
+        if "其他" in order_status_detail:
+            # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
+            if len(order_status_detail) == 1:
+                query = query.filter(
+                    ~Production.order_status.in_(production_statuses))
             else:
-                # 如果没有选择"其他"，则按原逻辑筛选
+                # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
+                other_selected_statuses = [
+                    s for s in order_status_detail if s != "其他"]
                 query = query.filter(
-                    Production.order_status.in_(order_status_detail))
-        
-        # 排序
-        query = query.order_by(Production.expected_shipping_date.desc().nulls_last(), Production.order_number.desc())
-        
-        # 分页
-        total = query.count()
-        if query_data.no_pagination:
-            productions = query.all()
-            page = 1
-            page_size = total
-            total_pages = 1
+                    or_(
+                        Production.order_status.in_(other_selected_statuses),
+                        ~Production.order_status.in_(production_statuses)
+                    )
+                )
         else:
-            offset = (query_data.page - 1) * query_data.page_size
-            productions = query.offset(offset).limit(query_data.page_size).all()
-            page = query_data.page
-            page_size = query_data.page_size
-            total_pages = (total + page_size - 1) // page_size
-        
-        # 转换为 OrderListResponse 格式
-        order_items = []
-        # 检查前端是否选择了具体的进度
-        order_progress = getattr(query_data, 'order_progress', None)
-        is_specific_progress = order_progress and len(order_progress) == 1 and order_progress[0] == "生产"
+            # 如果没有选择"其他"，则按原逻辑筛选
+            query = query.filter(
+                Production.order_status.in_(order_status_detail))
+
+    return query
+
+
+def _build_production_items(productions: List[Production], db: Session) -> List[OrderListItem]:
+    """将生产记录转换为列表项"""
+    # 批量查询当前页的拆单记录
+    split_map = _load_by_order_number(db, Split, [prod.order_number for prod in productions])
+
+    order_items = []
+    for prod in productions:
+        # 生产表已经是最新状态，直接使用
+        # 需要查询拆单表获取设计师、销售员、订单类型、报价状态等信息
+        designer = None
+        salesperson = None
+        order_type = None
+        quote_status = None
+        splitter = prod.splitter  # 生产表本身有splitter字段
+        
+        # 拆单表中的完整信息（设计师、销售员、订单类型、报价状态等）
+        split = split_map.get(prod.order_number)
+        if split:
+            designer = split.designer
+            salesperson = split.salesperson
+            order_type = split.order_type
+            quote_status = split.quote_status
+            # 如果生产表的splitter为空，使用拆单表的splitter
+            if not splitter:
+                splitter = split.splitter
         
-        for prod in productions:
-            # 生产表已经是最新状态，直接使用
-            # 需要查询拆单表获取设计师、销售员、订单类型、报价状态等信息
-            designer = None
-            salesperson = None
-            order_type = None
-            quote_status = None
-            splitter = prod.splitter  # 生产表本身有splitter字段
-            
-            # 查询拆单表获取完整信息（设计师、销售员、订单类型、报价状态等）
-            split = db.query(Split).filter(Split.order_number == prod.order_number).first()
-            if split:
-                designer = split.designer
-                salesperson = split.salesperson
-                order_type = split.order_type
-                quote_status = split.quote_status
-                # 如果生产表的splitter为空，使用拆单表的splitter
-                if not splitter:
-                    splitter = split.splitter
-            
-            # 动态获取订单状态
-            final_order_status = prod.order_status
-            progress_prefix = "生产"  # 默认前缀
-            
-            # 添加进度前缀
-            final_order_status = f"{progress_prefix}-{final_order_status}"
-            
-            order_item = OrderListItem(
-                id=prod.id,
-                order_number=prod.order_number,
-                customer_name=prod.customer_name,
-                address=prod.address or "",
-                designer=designer or "",  # 从拆单表获取设计师
-                salesperson=salesperson or "",  # 从拆单表获取销售员
-                splitter=splitter or "",  # 优先使用生产表的splitter，否则使用拆单表的
-                assignment_date="",
-                design_process="",
-                category_name="",
-                design_cycle="",
-                order_date=prod.split_order_date or "",
-                order_type=order_type or "",  # 从拆单表获取订单类型
-                is_installation=prod.is_installation,
-                cabinet_area=None,
-                wall_panel_area=None,
-                order_amount=None,
-                remarks=prod.remarks,
-                order_status=final_order_status,
-                quote_status=quote_status  # 从拆单表获取报价状态
-            )
-            order_items.append(order_item)
+        # 动态获取订单状态
+        final_order_status = prod.order_status
+        progress_prefix = "生产"  # 默认前缀
+        
+        # 添加进度前缀
+        final_order_status = f"{progress_prefix}-{final_order_status}"
+        
+        order_item = OrderListItem(
+            id=prod.id,
+            order_number=prod.order_number,
+            customer_name=prod.customer_name,
+            address=prod.address or "",
+            designer=designer or "",  # 从拆单表获取设计师
+            salesperson=salesperson or "",  # 从拆单表获取销售员
+            splitter=splitter or "",  # 优先使用生产表的splitter，否则使用拆单表的
+            assignment_date="",
+            design_process="",
+            category_name="",
+            design_cycle="",
+            order_date=prod.split_order_date or "",
+            order_type=order_type or "",  # 从拆单表获取订单类型
+            is_installation=prod.is_installation,
+            cabinet_area=None,
+            wall_panel_area=None,
+            order_amount=None,
+            remarks=prod.remarks,
+            order_status=final_order_status,
+            quote_status=quote_status  # 从拆单表获取报价状态
+        )
+        order_items.append(order_item)
+    return order_items
+
+
+def _get_orders_from_production(query_data: OrderListQuery, db: Session):
+    """从生产表查询"""
+    try:
+        query = _build_production_query(query_data, db).order_by(
+            Production.expected_shipping_date.desc().nulls_last(), Production.order_number.desc())
+
+        productions, total, page, page_size, total_pages = _paginate(query, query_data)
+        order_items = _build_production_items(productions, db)
         
         return OrderListResponse(
             items=order_items,
@@ -586,69 +618,78 @@ async def _get_orders_from_production(query_data: OrderListQuery, db: Session):
         )
 
 
-async def _get_orders_merged(query_data: OrderListQuery, db: Session):
-    """从多个表查询并合并去重（按订单编号）"""
+def _get_orders_merged(query_data: OrderListQuery, db: Session):
+    """
+    从多个表查询并合并去重（按订单编号）
+
+    三个表的筛选结果以 UNION ALL 合并为（订单编号, 优先级），按订单编号分组取最高优先级
+    （设计 > 拆单 > 生产），去重、计数和分页都在数据库中完成，之后只加载当前页的记录
+    """
     try:
         # 确定要查询的表
         progress_list = getattr(query_data, 'order_progress', None) or ["设计", "拆单", "生产"]
-        
-        # 使用字典存储，key为订单编号，value为订单项
-        # 这样可以确保每个订单编号只保留一条记录（优先保留设计表的记录）
-        order_dict = {}
-        
-        # 查询设计订单表（优先级最高）
+
+        # 各来源的筛选查询，只取订单编号和优先级
+        source_queries = []
         if "设计" in progress_list:
-            design_query = OrderListQuery(**query_data.model_dump())
-            design_query.order_progress = None  # 避免递归
-            design_query.no_pagination = True  # 获取所有数据，不分页
-            design_response = await _get_orders_from_design(design_query, db)
-            if isinstance(design_response, OrderListResponse) and hasattr(design_response, 'items'):
-                for item in design_response.items:
-                    # 只保留第一次出现的订单编号（设计表优先）
-                    if item.order_number not in order_dict:
-                        order_dict[item.order_number] = item
-        
-        # 查询拆单表（优先级次之）
+            source_queries.append(_build_design_query(query_data, db).with_entities(
+                Order.order_number.label("order_number"), literal(1).label("priority")))
         if "拆单" in progress_list:
-            split_query = OrderListQuery(**query_data.model_dump())
-            split_query.order_progress = None  # 避免递归
-            split_query.no_pagination = True  # 获取所有数据，不分页
-            split_response = await _get_orders_from_split(split_query, db)
-            if isinstance(split_response, OrderListResponse) and hasattr(split_response, 'items'):
-                for item in split_response.items:
-                    # 如果订单编号已存在（在设计表中），则跳过；否则添加
-                    if item.order_number not in order_dict:
-                        order_dict[item.order_number] = item
-        
-        # 查询生产表（优先级最低）
+            source_queries.append(_build_split_query(query_data, db).with_entities(
+                Split.order_number.label("order_number"), literal(2).label("priority")))
         if "生产" in progress_list:
-            prod_query = OrderListQuery(**query_data.model_dump())
-            prod_query.order_progress = None  # 避免递归
-            prod_query.no_pagination = True  # 获取所有数据，不分页
-            prod_response = await _get_orders_from_production(prod_query, db)
-            if isinstance(prod_response, OrderListResponse) and hasattr(prod_response, 'items'):
-                for item in prod_response.items:
-                    # 如果订单编号已存在（在设计表或拆单表中），则跳过；否则添加
-                    if item.order_number not in order_dict:
-                        order_dict[item.order_number] = item
-        
-        # 将字典转换为列表，按订单编号排序（降序）
-        all_items = list(order_dict.values())
-        all_items.sort(key=lambda x: x.order_number, reverse=True)
-        
-        # 分页处理
-        total = len(all_items)
-        if query_data.no_pagination:
-            items = all_items
-            page = 1
-            page_size = total
-            total_pages = 1
-        else:
-            offset = (query_data.page - 1) * query_data.page_size
-            items = all_items[offset:offset + query_data.page_size]
-            page = query_data.page
-            page_size = query_data.page_size
-            total_pages = (total + page_size - 1) // page_size
+            source_queries.append(_build_production_query(query_data, db).with_entities(
+                Production.order_number.label("order_number"), literal(3).label("priority")))
+
+        if not source_queries:
+            return OrderListResponse(
+                items=[],
+                total=0,
+                page=query_data.page,
+                page_size=query_data.page_size,
+                total_pages=0
+            )
+
+        merged = union_all(*[q.statement for q in source_queries]).subquery()
+        deduped = db.query(
+            merged.c.order_number.label("order_number"),
+            func.min(merged.c.priority).label("priority")
+        ).group_by(merged.c.order_number).subquery()
+
+        # 按订单编号排序（降序）并分页
+        query = db.query(deduped.c.order_number, deduped.c.priority).order_by(
+            deduped.c.order_number.desc())
+        rows, total, page, page_size, total_pages = _paginate(query, query_data)
+
+        # 只加载当前页的记录，每个来源一次查询；拆单和生产沿用同样的筛选条件，
+        # 同一订单有多条记录时，展示的记录与选中该订单的记录一致
+        numbers_by_priority = {1: [], 2: [], 3: []}
+        for order_number, priority in rows:
+            numbers_by_priority[priority].append(order_number)
+
+        item_map = {}
+        if numbers_by_priority[1]:
+            orders = db.query(Order).options(joinedload(Order.progresses)).filter(
+                Order.order_number.in_(numbers_by_priority[1])).all()
+            for item in _build_design_items(orders, False, db):
+                item_map.setdefault((1, item.order_number), item)
+        if numbers_by_priority[2]:
+            splits = _build_split_query(query_data, db).filter(
+                Split.order_number.in_(numbers_by_priority[2])
+            ).order_by(Split.order_date.desc(), Split.order_number.desc(), Split.id).all()
+            for item in _build_split_items(splits, False, db):
+                item_map.setdefault((2, item.order_number), item)
+        if numbers_by_priority[3]:
+            productions = _build_production_query(query_data, db).filter(
+                Production.order_number.in_(numbers_by_priority[3])).order_by(Production.id).all()
+            for item in _build_production_items(productions, db):
+                item_map.setdefault((3, item.order_number), item)
+
+        items = [
+            item_map[(priority, order_number)]
+            for order_number, priority in rows
+            if (priority, order_number) in item_map
+        ]
         
         return OrderListResponse(
             items=items,
@@ -670,207 +711,51 @@ async def _get_orders_merged(query_data: OrderListQuery, db: Session):
 
 
 @router.get("/detail/{order_number}", summary="小程序订单综合详情查询")
-async def get_miniprogram_order_detail(
+def get_miniprogram_order_detail(
     order_number: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     小程序订单综合详情查询接口
     综合查询设计、拆单、生产三个表的信息
+
+    详情来自预计算的订单时间线快照，响应带 ETag；
+    请求头 If-None-Match 与当前快照一致时返回 304
     """
     try:
-        result = {}
-        split = None
-        production = None
-        
-        # 1. 查询设计表
-        order = db.query(Order).options(
-            joinedload(Order.progresses)
-        ).filter(Order.order_number == order_number).first()
-        
-        if order:
-            # 处理设计过程
-            design_process_items = []
-            if order.progresses:
-                sorted_progresses = sorted(
-                    order.progresses, key=lambda p: p.created_at, reverse=True)
-                for p in sorted_progresses:
-                    planned = p.planned_date if p.planned_date else "-"
-                    actual = p.actual_date if p.actual_date else "-"
-                    design_process_items.append(f"{p.task_item}:{planned}:{actual}")
-                design_process = ",".join(design_process_items)
-            else:
-                design_process = "暂无进度"
-            
-            calculated_design_cycle = str(calculate_design_cycle_days(
-                order.assignment_date, 
-                order.order_date, 
-                order.order_status
-            ))
-            
-            result['order_info'] = {
-                'order_number': order.order_number,
-                'order_status': order.order_status,
-                'customer_name': order.customer_name,
-                'address': order.address,
-                'order_type': order.order_type,
-                'category_name': order.category_name,
-                'is_installation': order.is_installation,
-                'designer': order.designer,
-                'salesperson': order.salesperson,
-                'cabinet_area': float(order.cabinet_area) if order.cabinet_area else None,
-                'wall_panel_area': float(order.wall_panel_area) if order.wall_panel_area else None,
-                'order_amount': float(order.order_amount) if order.order_amount else None,
-                'assignment_date': order.assignment_date
-            }
-            
-            result['design_progress'] = {
-                'order_date': order.order_date,
-                'design_cycle': calculated_design_cycle,
-                'design_process': design_process,
-                'design_remarks': order.remarks,
-            }
-        
-        # 2. 查询拆单表
-        split = db.query(Split).options(
-            joinedload(Split.progress_items)
-        ).filter(Split.order_number == order_number).first()
-        
-        if split:
-            if not result.get('order_info'):
-                result['order_info'] = {}
-            result['order_info']['splitter'] = split.splitter
-            result['order_info']['quote_status'] = split.quote_status
-            
-            # 处理拆单进度
-            internal_items = []
-            external_items = []
-            for item in split.progress_items:
-                item_data = {
-                    'category_name': item.category_name,
-                    'planned_date': item.planned_date,
-                    'split_date': item.split_date if item.item_type.value == 'internal' else None,
-                    'purchase_date': item.purchase_date if item.item_type.value == 'external' else None,
-                    'cycle_days': item.cycle_days,
-                    'status': item.status,
-                    'remarks': item.remarks
-                }
-                if item.item_type.value == 'internal':
-                    internal_items.append(item_data)
-                else:
-                    external_items.append(item_data)
-            
-            result['split_progress'] = {
-                'order_date': split.order_date,
-                'completion_date': split.completion_date,
-                'internal_items': internal_items,
-                'external_items': external_items,
-                'split_remarks': split.remarks,
-            }
-        
-        # 3. 查询生产表
-        production = db.query(Production).options(
-            joinedload(Production.progress_items)
-        ).filter(Production.order_number == order_number).first()
-        
-        if production:
-            # 处理生产进度
-            production_progress_items = []
-            finished_goods_quantity = []  # 成品入库数量
-            for item in production.progress_items:
-                # 如果是厂内项，给名称后面添加"材料"
-                category_name = item.category_name
-                category_name_internal = category_name
-                if item.item_type.value == 'internal' and category_name:
-                    category_name_internal = f"{category_name}材料"
-                
-                item_data = {
-                    'category_name': category_name_internal,
-                    'item_type': item.item_type.value,
-                    'order_date': item.order_date,
-                    'expected_material_date': item.expected_material_date if item.item_type.value == 'internal' else None,
-                    'actual_storage_date': item.actual_storage_date if item.item_type.value == 'internal' else None,
-                    'storage_time': item.storage_time if item.item_type.value == 'internal' else None,
-                    'quantity': item.quantity if item.item_type.value == 'internal' else None,
-                    'expected_arrival_date': item.expected_arrival_date if item.item_type.value == 'external' else None,
-                    'actual_arrival_date': item.actual_arrival_date if item.item_type.value == 'external' else None
-                }
-                production_progress_items.append(item_data)
-                
-                # 生成成品入库数量信息：参考PC端逻辑，对所有 internal 和 external 类型都处理
-                if item.item_type.value == 'internal' or item.item_type.value == 'external':
-                    finished_goods_quantity.append({
-                        'category_name': category_name,
-                        'quantity': item.quantity
-                    })
-            
-            # 计算下单天数（从拆单下单日期到当前）
-            order_days = None
-            if production.split_order_date:
-                try:
-                    split_date = datetime.strptime(production.split_order_date, '%Y-%m-%d')
-                    today = datetime.now()
-                    order_days = str((today - split_date).days)
-                except:
-                    order_days = None
-            
-            result['production_progress'] = {
-                'customer_payment_date': production.customer_payment_date,
-                'split_order_date': production.split_order_date,
-                'order_days': order_days,
-                'expected_delivery_date': production.expected_delivery_date,
-                'purchase_status': production.order_status,  # 采购状态使用订单状态字段
-                'storage_count': len([item for item in production.progress_items if item.item_type.value == 'internal' and item.actual_storage_date]),
-                'material_count': len(production.progress_items),
-                'cutting_date': production.cutting_date,
-                'expected_shipping_date': production.expected_shipping_date,
-                'progress_items': production_progress_items,
-                'finished_goods_quantity': finished_goods_quantity,
-                'actual_delivery_date': production.actual_delivery_date,
-                "board_18": production.board_18,
-                "board_09": production.board_09,
-                "production_remarks": production.remarks,
-            }
-        
-        if not result:
+        if_none_match = request.headers.get("if-none-match")
+
+        # 进程内缓存命中时无需访问数据库
+        cached_etag = etag_cache.get(order_number)
+        if cached_etag and _etag_matches(if_none_match, cached_etag):
+            return Response(status_code=304, headers=_etag_headers(cached_etag))
+
+        timeline = get_order_timeline(db, order_number)
+        if timeline is None:
             raise HTTPException(status_code=404, detail="订单不存在")
-        
-        # 动态获取订单状态并添加前缀（与列表页逻辑一致）
-        if result.get('order_info'):
-            final_order_status = result['order_info'].get('order_status', '')
-            progress_prefix = "设计"  # 默认前缀
-            
-            # 如果设计阶段状态是"已下单"，查看拆单表的状态
-            if final_order_status == "已下单" and split:
-                # 如果拆单状态也是"已下单"，查看生产表的状态
-                if split.order_status == "已下单":
-                    if production:
-                        final_order_status = production.order_status
-                        progress_prefix = "生产"
-                    else:
-                        final_order_status = split.order_status
-                        progress_prefix = "拆单"
-                else:
-                    final_order_status = split.order_status
-                    progress_prefix = "拆单"
-            elif production:
-                # 如果有生产进度，说明已进入生产阶段
-                final_order_status = production.order_status
-                progress_prefix = "生产"
-            elif split:
-                # 如果有拆单进度，说明已进入拆单阶段
-                final_order_status = split.order_status
-                progress_prefix = "拆单"
-            
-            # 添加进度前缀
-            if final_order_status and not final_order_status.startswith(('设计-', '拆单-', '生产-')):
-                final_order_status = f"{progress_prefix}-{final_order_status}"
-                result['order_info']['order_status'] = final_order_status
-        
-        return success_response(data=result)
+
+        result, etag = timeline
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=_etag_headers(etag))
+
+        return JSONResponse(content=success_response(data=result), headers=_etag_headers(etag))
         
     except HTTPException:
         raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"查询订单详情失败: {str(e)}")
+
+
+def _etag_headers(etag: str) -> Dict[str, str]:
+    # no-cache：客户端每次都带 If-None-Match 重新验证
+    return {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 请求头是否包含当前 ETag"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip().removeprefix("W/").strip('"') for value in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
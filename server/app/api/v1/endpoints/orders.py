@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, text, Integer
-from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, or_, func, insert, text, Integer
+from typing import Iterator, List, Optional
 from datetime import datetime, date
 
 from app.core.database import get_db
@@ -11,25 +11,160 @@ from app.models.split import Split
 from app.models.split_progress import SplitProgress, ItemType
 from app.models.production import Production
 from app.models.production_progress import ProductionProgress
-from app.models.category import Category, CategoryType
-# from app.models.category import Category  # 不再需要
+from app.models.category import CategoryType
 from app.schemas.order import (
     OrderCreate,
     OrderUpdate,
     OrderStatusUpdate,
+    OrderStatusBatchUpdate,
+    OrderPurgeRequest,
     OrderResponse,
     OrderListQuery,
     OrderListResponse,
     OrderListItem
 )
 from app.core.response import success_response, error_response
-from app.utils.scheduler import calculate_design_cycle_days
+from app.utils.batch import chunked
+from app.utils.cache import get_category_type, get_category_types
+from app.utils.completion import refresh_split_counters
+from app.utils.dates import parse_date, today_str
+from app.utils.export import iter_query_batches, stream_export
+from app.utils.order_import import import_orders, iter_import_rows
+from app.utils.order_purge import purge_orders
+from app.utils.scheduler import (
+    calculate_design_cycle_days,
+    calculate_design_cycle_days_batch,
+    design_cycle_days_expression,
+)
+from app.utils.pagination import SortKey, cursor_date, cursor_int, paginate_by_cursor
 
 router = APIRouter()
 
+# 游标分页的排序键：分单日期降序，ID降序
+ORDER_CURSOR_KEYS = [SortKey(Order.assignment_date, parser=cursor_date), SortKey(Order.id, parser=cursor_int)]
+
+
+def _apply_order_filters(query, query_data: OrderListQuery, db: Session):
+    """按列表查询条件过滤订单（列表和导出共用）"""
+    # 应用搜索条件
+    if query_data.order_number:
+        query = query.filter(Order.order_number.ilike(
+            f"%{query_data.order_number}%"))
+
+    if query_data.customer_name:
+        query = query.filter(Order.customer_name.ilike(
+            f"%{query_data.customer_name}%"))
+
+    if query_data.designer:
+        query = query.filter(Order.designer.ilike(
+            f"%{query_data.designer}%"))
+
+    if query_data.salesperson:
+        query = query.filter(Order.salesperson.ilike(
+            f"%{query_data.salesperson}%"))
+
+    if query_data.order_status:
+        # 定义所有已知的订单状态
+        defined_statuses = [
+            "量尺", "初稿", "公司对方案", "线上对方案", "改图", "客户确认图",
+            "客户硬装阶段", "出内部结构图", "出下单图", "复尺", "报价", "打款", "待下单", "已下单", "待下单", "已撤销", "暂停"
+        ]
+
+        # 检查是否包含"其他"状态
+        if "其他" in query_data.order_status:
+            # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
+            if len(query_data.order_status) == 1:
+                query = query.filter(
+                    ~Order.order_status.in_(defined_statuses))
+            else:
+                # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
+                other_selected_statuses = [
+                    s for s in query_data.order_status if s != "其他"]
+                query = query.filter(
+                    or_(
+                        Order.order_status.in_(other_selected_statuses),
+                        ~Order.order_status.in_(defined_statuses)
+                    )
+                )
+        else:
+            # 如果没有选择"其他"，则按原逻辑筛选
+            query = query.filter(
+                Order.order_status.in_(query_data.order_status))
+
+    if query_data.order_type:
+        query = query.filter(Order.order_type == query_data.order_type)
+
+    # 设计周期筛选：在数据库中计算设计周期，计数和分页均由数据库完成
+    if query_data.design_cycle_filter:
+        design_cycle_days = design_cycle_days_expression(
+            Order.assignment_date,
+            Order.order_date,
+            Order.order_status,
+            db.get_bind().dialect.name
+        )
+        if query_data.design_cycle_filter == "lte20":
+            query = query.filter(design_cycle_days <= 20)
+        elif query_data.design_cycle_filter == "gt20":
+            query = query.filter(design_cycle_days > 20)
+        elif query_data.design_cycle_filter == "lt50":
+            query = query.filter(design_cycle_days < 50)
+
+    if query_data.category_names:
+        # 使用包含关系查询，只要订单中包含任一选中的类目就匹配
+        category_conditions = []
+        for category in query_data.category_names:
+            category_conditions.append(
+                Order.category_name.like(f"%{category}%"))
+        query = query.filter(or_(*category_conditions))
+
+    if query_data.assignment_date_start:
+        query = query.filter(Order.assignment_date >=
+                             query_data.assignment_date_start)
+
+    if query_data.assignment_date_end:
+        query = query.filter(Order.assignment_date <=
+                             query_data.assignment_date_end)
+
+    if query_data.order_date_start:
+        query = query.filter(Order.order_date >=
+                             query_data.order_date_start)
+
+    if query_data.order_date_end:
+        query = query.filter(Order.order_date <=
+                             query_data.order_date_end)
+
+    # 新增：按设计过程中的计划日期筛选（Progress.planned_date）
+    if query_data.planned_date_start or query_data.planned_date_end:
+        # 通过exists子查询筛选有符合计划日期的进度项的订单
+        progress_subq = db.query(Progress.order_id).filter(
+            Progress.order_id == Order.id
+        )
+        if query_data.planned_date_start:
+            progress_subq = progress_subq.filter(
+                Progress.planned_date >= query_data.planned_date_start
+            )
+        if query_data.planned_date_end:
+            progress_subq = progress_subq.filter(
+                Progress.planned_date <= query_data.planned_date_end
+            )
+        query = query.filter(progress_subq.exists())
+
+    return query
+
+
+def _format_design_process(progresses) -> str:
+    """设计过程（进度信息），格式为"事件名：计划时间：实际时间"，按创建时间从近到远排序"""
+    if not progresses:
+        return "暂无进度"
+    sorted_progresses = sorted(progresses, key=lambda p: p.created_at, reverse=True)
+    return ",".join(
+        f"{p.task_item}:{p.planned_date or '-'}:{p.actual_date or '-'}"
+        for p in sorted_progresses
+    )
+
 
 @router.post("/list", response_model=OrderListResponse, summary="获取订单列表")
-async def get_orders(
+def get_orders(
     query_data: OrderListQuery,
     db: Session = Depends(get_db)
 ):
@@ -39,182 +174,47 @@ async def get_orders(
         query = db.query(Order).options(
             joinedload(Order.progresses)
         )
-
-        # 应用搜索条件
-        if query_data.order_number:
-            query = query.filter(Order.order_number.ilike(
-                f"%{query_data.order_number}%"))
-
-        if query_data.customer_name:
-            query = query.filter(Order.customer_name.ilike(
-                f"%{query_data.customer_name}%"))
-
-        if query_data.designer:
-            query = query.filter(Order.designer.ilike(
-                f"%{query_data.designer}%"))
-
-        if query_data.salesperson:
-            query = query.filter(Order.salesperson.ilike(
-                f"%{query_data.salesperson}%"))
-
-        if query_data.order_status:
-            # 定义所有已知的订单状态
-            defined_statuses = [
-                "量尺", "初稿", "公司对方案", "线上对方案", "改图", "客户确认图",
-                "客户硬装阶段", "出内部结构图", "出下单图", "复尺", "报价", "打款", "待下单", "已下单", "待下单", "已撤销", "暂停"
-            ]
-
-            # 检查是否包含"其他"状态
-            if "其他" in query_data.order_status:
-                # 如果只选择了"其他"，则筛选出不在已定义状态中的订单
-                if len(query_data.order_status) == 1:
-                    query = query.filter(
-                        ~Order.order_status.in_(defined_statuses))
-                else:
-                    # 如果同时选择了"其他"和其他状态，则包含其他状态和不在已定义状态中的订单
-                    other_selected_statuses = [
-                        s for s in query_data.order_status if s != "其他"]
-                    query = query.filter(
-                        or_(
-                            Order.order_status.in_(other_selected_statuses),
-                            ~Order.order_status.in_(defined_statuses)
-                        )
-                    )
-            else:
-                # 如果没有选择"其他"，则按原逻辑筛选
-                query = query.filter(
-                    Order.order_status.in_(query_data.order_status))
-
-        if query_data.order_type:
-            query = query.filter(Order.order_type == query_data.order_type)
-
-        # 设计周期筛选将在应用层处理，这里先移除数据库层筛选
-
-        if query_data.category_names:
-            # 使用包含关系查询，只要订单中包含任一选中的类目就匹配
-            category_conditions = []
-            for category in query_data.category_names:
-                category_conditions.append(
-                    Order.category_name.like(f"%{category}%"))
-            query = query.filter(or_(*category_conditions))
-
-        if query_data.assignment_date_start:
-            query = query.filter(Order.assignment_date >=
-                                 query_data.assignment_date_start)
-
-        if query_data.assignment_date_end:
-            query = query.filter(Order.assignment_date <=
-                                 query_data.assignment_date_end)
-
-        if query_data.order_date_start:
-            query = query.filter(func.date(Order.order_date)
-                                 >= query_data.order_date_start)
-
-        if query_data.order_date_end:
-            query = query.filter(func.date(Order.order_date)
-                                 <= query_data.order_date_end)
-
-        # 新增：按设计过程中的计划日期筛选（Progress.planned_date）
-        if query_data.planned_date_start or query_data.planned_date_end:
-            # 通过exists子查询筛选有符合计划日期的进度项的订单
-            progress_subq = db.query(Progress.order_id).filter(
-                Progress.order_id == Order.id
-            )
-            if query_data.planned_date_start:
-                progress_subq = progress_subq.filter(
-                    func.date(Progress.planned_date) >= query_data.planned_date_start
-                )
-            if query_data.planned_date_end:
-                progress_subq = progress_subq.filter(
-                    func.date(Progress.planned_date) <= query_data.planned_date_end
-                )
-            query = query.filter(progress_subq.exists())
+        query = _apply_order_filters(query, query_data, db)
 
         # 按分单日期降序排序
         query = query.order_by(Order.assignment_date.desc())
 
-        # 如果有设计周期筛选，需要获取所有数据进行筛选
-        if query_data.design_cycle_filter:
-            # 获取所有订单进行筛选
-            all_orders = query.all()
-            
-            # 应用设计周期筛选
-            filtered_orders = []
-            for order in all_orders:
-                # 动态计算设计周期
-                calculated_design_cycle = calculate_design_cycle_days(
-                    order.assignment_date, 
-                    order.order_date, 
-                    order.order_status
-                )
-                
-                design_cycle_days = int(calculated_design_cycle)
-                
-                # 应用筛选条件
-                if query_data.design_cycle_filter == "lte20" and design_cycle_days > 20:
-                    continue
-                elif query_data.design_cycle_filter == "gt20" and design_cycle_days <= 20:
-                    continue
-                elif query_data.design_cycle_filter == "lt50" and design_cycle_days >= 50:
-                    continue
-                
-                filtered_orders.append(order)
-            
-            # 计算筛选后的总数
-            total = len(filtered_orders)
-            
-            # 对筛选后的结果进行分页
-            if query_data.no_pagination:
-                orders = filtered_orders
-                page = 1
-                page_size = total
-                total_pages = 1
-            else:
-                offset = (query_data.page - 1) * query_data.page_size
-                orders = filtered_orders[offset:offset + query_data.page_size]
-                page = query_data.page
-                page_size = query_data.page_size
-                total_pages = (total + page_size - 1) // page_size
+        next_cursor = None
+        if query_data.cursor_mode or query_data.cursor:
+            # 游标分页：默认不查询总数
+            total = query.order_by(None).count() if query_data.include_total else None
+            try:
+                orders, next_cursor = paginate_by_cursor(
+                    query, ORDER_CURSOR_KEYS, query_data.cursor, query_data.page_size)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            page = query_data.page
+            page_size = query_data.page_size
+            total_pages = (total + page_size - 1) // page_size if total is not None else None
+        elif query_data.no_pagination:
+            total = query.count()
+            orders = query.all()
+            page = 1
+            page_size = total
+            total_pages = 1
         else:
-            # 没有设计周期筛选，使用原来的分页逻辑
             total = query.count()
-            
-            if query_data.no_pagination:
-                orders = query.all()
-                page = 1
-                page_size = total
-                total_pages = 1
-            else:
-                offset = (query_data.page - 1) * query_data.page_size
-                orders = query.offset(offset).limit(query_data.page_size).all()
-                page = query_data.page
-                page_size = query_data.page_size
-                total_pages = (total + page_size - 1) // page_size
+            offset = (query_data.page - 1) * query_data.page_size
+            orders = query.offset(offset).limit(query_data.page_size).all()
+            page = query_data.page
+            page_size = query_data.page_size
+            total_pages = (total + page_size - 1) // page_size
+
+        # 整页一次计算设计周期
+        design_cycles = calculate_design_cycle_days_batch(
+            [order.assignment_date for order in orders],
+            [order.order_date for order in orders],
+            [order.order_status for order in orders]
+        )
 
         # 转换为响应格式
         order_items = []
-        for order in orders:
-            # 获取设计过程（进度信息）- 格式化为"事件名：计划时间：实际时间"
-            design_process_items = []
-            if order.progresses:
-                # 按照created_at从近到远排序
-                sorted_progresses = sorted(
-                    order.progresses, key=lambda p: p.created_at, reverse=True)
-                for p in sorted_progresses:
-                    planned = p.planned_date if p.planned_date else "-"
-                    actual = p.actual_date if p.actual_date else "-"
-                    design_process_items.append(f"{p.task_item}:{planned}:{actual}")
-                design_process = ",".join(design_process_items)
-            else:
-                design_process = "暂无进度"
-
-            # 动态计算设计周期
-            calculated_design_cycle = str(calculate_design_cycle_days(
-                order.assignment_date, 
-                order.order_date, 
-                order.order_status
-            ))
-
+        for order, design_cycle in zip(orders, design_cycles):
             order_item = OrderListItem(
                 id=order.id,
                 order_number=order.order_number,
@@ -223,9 +223,9 @@ async def get_orders(
                 designer=order.designer,
                 salesperson=order.salesperson,
                 assignment_date=order.assignment_date,
-                design_process=design_process,
+                design_process=_format_design_process(order.progresses),
                 category_name=order.category_name,
-                design_cycle=calculated_design_cycle,
+                design_cycle=str(design_cycle),
                 order_date=order.order_date,
                 order_type=order.order_type,
                 is_installation=order.is_installation,
@@ -242,15 +242,66 @@ async def get_orders(
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         return error_response(message=f"获取订单列表失败: {str(e)}")
 
 
+ORDER_EXPORT_HEADERS = [
+    "订单编号", "客户名称", "地址", "设计师", "销售员", "分单日期", "设计过程", "下单类目",
+    "设计周期", "下单日期", "订单类型", "是否安装", "柜体面积", "墙板面积", "订单金额", "备注", "订单状态",
+]
+
+
+def _iter_order_export_rows(query_data: OrderListQuery, bind) -> Iterator[list]:
+    """按批读取导出的订单行；使用独立会话，生命周期与流式响应一致"""
+    with Session(bind=bind) as db:
+        query = db.query(Order).options(selectinload(Order.progresses))
+        query = _apply_order_filters(query, query_data, db)
+        query = query.order_by(Order.assignment_date.desc(), Order.id.desc())
+
+        for orders in iter_query_batches(query):
+            design_cycles = calculate_design_cycle_days_batch(
+                [order.assignment_date for order in orders],
+                [order.order_date for order in orders],
+                [order.order_status for order in orders]
+            )
+            yield [
+                (
+                    order.order_number, order.customer_name, order.address, order.designer,
+                    order.salesperson, order.assignment_date, _format_design_process(order.progresses),
+                    order.category_name, design_cycle, order.order_date, order.order_type,
+                    order.is_installation, order.cabinet_area, order.wall_panel_area,
+                    order.order_amount, order.remarks, order.order_status,
+                )
+                for order, design_cycle in zip(orders, design_cycles)
+            ]
+
+
+@router.post("/export", summary="导出订单列表")
+def export_orders(
+    query_data: OrderListQuery,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    按列表查询条件导出全部订单（忽略分页参数），以 CSV 或 XLSX 流式返回
+    """
+    return stream_export(
+        ORDER_EXPORT_HEADERS,
+        _iter_order_export_rows(query_data, db.get_bind()),
+        f"订单列表_{today_str()}",
+        export_format
+    )
+
+
 @router.post("/", summary="新增订单")
-async def create_order(
+def create_order(
     order_data: OrderCreate,
     db: Session = Depends(get_db)
 ):
@@ -319,19 +370,18 @@ async def create_order(
 
                 for category_name in category_names:
                     # 查询类目表获取类目类型
-                    category = db.query(Category).filter(
-                        Category.name == category_name).first()
+                    category_type = get_category_type(db, category_name)
 
-                    if category:
+                    if category_type is not None:
                         # 根据类目类型创建对应的进度记录
-                        if category.category_type == CategoryType.INTERNAL_PRODUCTION:
+                        if category_type == CategoryType.INTERNAL_PRODUCTION:
                             progress_item = SplitProgress(
                                 split_id=split.id,
                                 order_number=order.order_number,
                                 category_name=category_name,
                                 item_type=ItemType.INTERNAL
                             )
-                        elif category.category_type == CategoryType.EXTERNAL_PURCHASE:
+                        elif category_type == CategoryType.EXTERNAL_PURCHASE:
                             progress_item = SplitProgress(
                                 split_id=split.id,
                                 order_number=order.order_number,
@@ -357,6 +407,7 @@ async def create_order(
                         )
                         db.add(progress_item)
 
+            refresh_split_counters(db, [split.id])
             db.commit()
 
         return success_response(
@@ -369,8 +420,34 @@ async def create_order(
         return error_response(message=f"创建订单失败: {str(e)}")
 
 
+@router.post("/import", summary="批量导入订单")
+def import_order_file(
+    file: UploadFile = File(..., description="CSV、XLSX 或 JSON Lines 文件"),
+    dry_run: bool = Query(False, description="只校验不写入"),
+    db: Session = Depends(get_db)
+):
+    """
+    批量导入订单
+
+    每行按新增订单的规则校验，生产单自动创建拆单和拆单进度。
+    数据按块写入，单行失败不影响其他行，返回每个失败行的行号和原因。
+    """
+    try:
+        rows = iter_import_rows(file.file.read(), file.filename or "")
+        report = import_orders(db, rows, dry_run=dry_run)
+    except ValueError as e:
+        db.rollback()
+        return error_response(message=f"导入订单失败: {str(e)}")
+
+    result = report.to_dict()
+    message = "订单导入校验完成" if dry_run else "订单导入完成"
+    if result["failed_rows"]:
+        message += f"，{result['failed_rows']} 行失败"
+    return success_response(data=result, message=message)
+
+
 @router.put("/{order_id}", summary="编辑订单")
-async def update_order(
+def update_order(
     order_id: int,
     order_data: OrderUpdate,
     db: Session = Depends(get_db)
@@ -489,11 +566,10 @@ async def update_order(
                 # 添加新的类目记录
                 for category_name in categories_to_add:
                     # 查询类目表获取类目类型
-                    category = db.query(Category).filter(
-                        Category.name == category_name).first()
+                    category_type = get_category_type(db, category_name)
 
-                    if category:
-                        item_type = ItemType.INTERNAL if category.category_type == CategoryType.INTERNAL_PRODUCTION else ItemType.EXTERNAL
+                    if category_type is not None:
+                        item_type = ItemType.INTERNAL if category_type == CategoryType.INTERNAL_PRODUCTION else ItemType.EXTERNAL
 
                         split_progress = SplitProgress(
                             split_id=split.id,
@@ -503,6 +579,8 @@ async def update_order(
                         )
                         db.add(split_progress)
 
+                refresh_split_counters(db, [split.id])
+
         # 更新订单表字段
         for field, value in update_data.items():
             setattr(order, field, value)
@@ -532,8 +610,190 @@ async def update_order(
         return error_response(message=f"更新订单失败: {str(e)}")
 
 
+def _new_split_values(order: Order, category_names: List[str]) -> dict:
+    """订单下单时自动创建的拆单记录的插入参数"""
+    # 检查打款状态：存在打款事项且已填写实际日期则为已打款，否则为未打款
+    payment_progress = next((progress for progress in order.progresses if progress.task_item == "打款"), None)
+    actual_payment_date = None
+    if payment_progress and payment_progress.actual_date:
+        actual_payment_date = payment_progress.actual_date.strftime('%Y-%m-%d') if isinstance(payment_progress.actual_date, date) else str(payment_progress.actual_date)
+
+    now = datetime.utcnow()
+    return {
+        "order_number": order.order_number,
+        "customer_name": order.customer_name,
+        "address": order.address,
+        "order_date": order.order_date,
+        "designer": order.designer,
+        "salesperson": order.salesperson,
+        "order_amount": order.order_amount,
+        "cabinet_area": order.cabinet_area,
+        "wall_panel_area": order.wall_panel_area,
+        "order_status": "未开始",
+        "order_type": order.order_type,
+        "quote_status": "已打款" if actual_payment_date else "未打款",
+        "actual_payment_date": actual_payment_date,
+        "remarks": "",
+        # 新拆单的进度项都未完成，直接写入计数
+        "total_items": len(category_names),
+        "completed_internal_items": 0,
+        "completed_external_items": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _apply_order_statuses(db: Session, targets: List[tuple]) -> List[dict]:
+    """
+    批量更新订单状态，在调用方事务内执行，由调用方提交
+
+    订单改为已下单时设置下单时间、回填下单进度事项的实际时间，并为没有拆单的订单创建拆单和拆单进度；
+    改为已撤销/已下单时同步拆单的撤销状态。已有拆单一次查询，新拆单和拆单进度各一次批量插入。
+
+    Args:
+        targets: [(订单, 目标状态)]，订单的进度事项应已预加载
+
+    Returns:
+        List[dict]: 与 targets 顺序一致的处理结果，失败的结果中包含 error
+    """
+    existing_splits = {}
+    for chunk in chunked(list({order.order_number for order, _ in targets})):
+        for split in db.query(Split).filter(Split.order_number.in_(chunk)).order_by(Split.id):
+            existing_splits.setdefault(split.order_number, split)
+
+    results = []
+    new_splits = []
+    for order, order_status in targets:
+        result = {"order_id": order.id, "order_number": order.order_number}
+        results.append(result)
+
+        # 如果要下单，检查是否存在下单进度事项
+        if order_status == "已下单" and not order.has_order_progress():
+            result["error"] = "订单中不存在下单进度事项，无法下单"
+            continue
+
+        old_status = order.order_status
+        order.order_status = order_status
+        split = existing_splits.get(order.order_number)
+        split_created = False
+
+        # 如果订单状态变更为下单，设置下单时间并自动创建拆单记录
+        if old_status != "已下单" and order_status == "已下单":
+            order.order_date = today_str()
+
+            # 更新进度表中下单事项的实际时间
+            order_progress = next((progress for progress in order.progresses if progress.task_item == "下单"), None)
+            if order_progress:
+                order_progress.actual_date = parse_date(order.order_date)
+
+            if not split:
+                # 根据订单类目创建拆单进度记录（类目可能是逗号分隔的多个类目）
+                category_names = [
+                    name.strip() for name in (order.category_name or '').split(',') if name.strip()]
+                new_splits.append((order, category_names))
+                split_created = True
+
+        if split:
+            # 订单已撤销时拆单改为撤销中；重新下单时撤销中的拆单恢复为拆单中
+            if order_status == "已撤销":
+                split.order_status = "撤销中"
+            elif order_status == "已下单" and split.order_status == "撤销中":
+                split.order_status = "拆单中"
+
+        result.update(
+            order_status=order.order_status,
+            order_date=order.order_date,
+            split_created=split_created
+        )
+
+    if new_splits:
+        # render_nulls：空值也写入语句，各行参数一致才能合并为一次 executemany
+        db.execute(insert(Split).execution_options(render_nulls=True), [
+            _new_split_values(order, category_names) for order, category_names in new_splits
+        ])
+        split_ids = {}
+        for chunk in chunked([order.order_number for order, _ in new_splits]):
+            split_ids.update(db.query(Split.order_number, Split.id).filter(Split.order_number.in_(chunk)).all())
+
+        # 按类目类型创建进度记录，外购类目为外购项，其余（含不存在的类目）默认为厂内生产项
+        category_types = get_category_types(db)
+        progress_rows = [
+            {
+                "split_id": split_ids[order.order_number],
+                "order_number": order.order_number,
+                "category_name": category_name,
+                "item_type": ItemType.EXTERNAL
+                if category_types.get(category_name) == CategoryType.EXTERNAL_PURCHASE else ItemType.INTERNAL,
+            }
+            for order, category_names in new_splits
+            for category_name in category_names
+        ]
+        if progress_rows:
+            db.execute(insert(SplitProgress), progress_rows)
+
+    return results
+
+
+@router.patch("/status/batch", summary="批量更新订单状态")
+def batch_update_order_status(
+    batch_data: OrderStatusBatchUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    批量更新订单状态
+
+    多组订单分别改为各自的目标状态，统一提交；返回每个订单的处理结果，
+    不存在、重复或不满足下单条件的订单单独标记失败，不影响其他订单
+    """
+    try:
+        requested = [
+            (order_id, group.order_status)
+            for group in batch_data.updates
+            for order_id in group.order_ids
+        ]
+
+        # 一次预取全部订单及其进度事项
+        orders = {}
+        for chunk in chunked(list({order_id for order_id, _ in requested})):
+            orders.update(
+                (order.id, order)
+                for order in db.query(Order).options(selectinload(Order.progresses)).filter(Order.id.in_(chunk))
+            )
+
+        results = []
+        targets = []
+        seen = set()
+        for order_id, order_status in requested:
+            if order_id not in orders:
+                results.append({"order_id": order_id, "error": "订单不存在"})
+            elif order_id in seen:
+                results.append({"order_id": order_id, "error": "订单在本次批量更新中重复"})
+            else:
+                seen.add(order_id)
+                targets.append((orders[order_id], order_status))
+                results.append(None)
+
+        applied = iter(_apply_order_statuses(db, targets))
+        results = [result if result is not None else next(applied) for result in results]
+        db.commit()
+
+        failed = sum(1 for result in results if "error" in result)
+        return success_response(
+            data={
+                "results": results,
+                "updated": len(results) - failed,
+                "failed": failed
+            },
+            message=f"订单状态批量更新完成，成功{len(results) - failed}条，失败{failed}条"
+        )
+
+    except Exception as e:
+        db.rollback()
+        return error_response(message=f"批量更新订单状态失败: {str(e)}")
+
+
 @router.patch("/{order_id}/status", summary="更新订单状态")
-async def update_order_status(
+def update_order_status(
     order_id: str,
     status_data: OrderStatusUpdate,
     db: Session = Depends(get_db)
@@ -552,135 +812,9 @@ async def update_order_status(
         if not order:
             return error_response(message="订单不存在")
 
-        # 记录原状态
-        old_status = order.order_status
-
-        # 如果要下单，检查是否存在下单进度事项
-        if status_data.order_status == "已下单":
-            if not order.has_order_progress():
-                return error_response(message="订单中不存在下单进度事项，无法下单")
-
-        # 更新状态
-        order.order_status = status_data.order_status
-
-        # 如果订单状态变更为下单，设置下单时间并自动创建拆单记录
-        if (old_status != "已下单" and
-                status_data.order_status == "已下单"):
-            # 设置下单时间
-            order.order_date = datetime.now().strftime('%Y-%m-%d')
-
-            # 更新进度表中下单事项的实际时间
-            order_progress = db.query(Progress).filter(
-                Progress.order_id == order.id,
-                Progress.task_item == "下单"
-            ).first()
-            if order_progress:
-                order_progress.actual_date = datetime.strptime(
-                    order.order_date, '%Y-%m-%d').date()
-            # 检查是否已存在拆单记录
-            existing_split = db.query(Split).filter(
-                Split.order_number == order.order_number
-            ).first()
-
-            if not existing_split:
-                # 检查打款状态
-                payment_progress = db.query(Progress).filter(
-                    Progress.order_id == order.id,
-                    Progress.task_item == "打款"
-                ).first()
-
-                # 如果存在打款事项且已填写实际日期，则为已打款，否则为未打款
-                quote_status = "已打款" if (
-                    payment_progress and payment_progress.actual_date) else "未打款"
-                
-                # 获取实际打款日期
-                actual_payment_date = None
-                if payment_progress and payment_progress.actual_date:
-                    actual_payment_date = payment_progress.actual_date.strftime('%Y-%m-%d') if isinstance(payment_progress.actual_date, date) else str(payment_progress.actual_date)
-
-                # 创建拆单记录
-                split = Split(
-                    order_number=order.order_number,
-                    customer_name=order.customer_name,
-                    address=order.address,
-                    order_date=order.order_date,
-                    designer=order.designer,
-                    salesperson=order.salesperson,
-                    order_amount=order.order_amount,
-                    cabinet_area=getattr(order, 'cabinet_area', None),
-                    wall_panel_area=getattr(order, 'wall_panel_area', None),
-                    order_status="未开始",
-                    order_type=order.order_type,
-                    quote_status=quote_status,
-                    actual_payment_date=actual_payment_date,
-                    remarks="",
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                db.add(split)
-                db.flush()  # 获取split.id
-
-                # 根据订单类目创建拆单进度记录
-                if order.category_name:
-                    # 解析类目名称（可能是逗号分隔的多个类目）
-                    category_names = [
-                        name.strip() for name in order.category_name.split(',') if name.strip()]
-
-                    for category_name in category_names:
-                        # 查询类目表获取类目类型
-                        category = db.query(Category).filter(
-                            Category.name == category_name).first()
-
-                        if category:
-                            # 根据类目类型创建对应的进度记录
-                            if category.category_type == CategoryType.INTERNAL_PRODUCTION:
-                                progress_item = SplitProgress(
-                                    split_id=split.id,
-                                    order_number=order.order_number,
-                                    category_name=category_name,
-                                    item_type=ItemType.INTERNAL
-                                )
-                            elif category.category_type == CategoryType.EXTERNAL_PURCHASE:
-                                progress_item = SplitProgress(
-                                    split_id=split.id,
-                                    order_number=order.order_number,
-                                    category_name=category_name,
-                                    item_type=ItemType.EXTERNAL
-                                )
-                            else:
-                                # 默认为厂内生产项
-                                progress_item = SplitProgress(
-                                    split_id=split.id,
-                                    order_number=order.order_number,
-                                    category_name=category_name,
-                                    item_type=ItemType.INTERNAL
-                                )
-                            db.add(progress_item)
-                        else:
-                            # 如果类目不存在，默认创建厂内生产项
-                            progress_item = SplitProgress(
-                                split_id=split.id,
-                                order_number=order.order_number,
-                                category_name=category_name,
-                                item_type=ItemType.INTERNAL
-                            )
-                            db.add(progress_item)
-
-        # 如果订单状态变更为已撤销，同步更新拆单管理中相同订单的状态为撤销中
-        if status_data.order_status == "已撤销":
-            existing_split = db.query(Split).filter(
-                Split.order_number == order.order_number
-            ).first()
-            if existing_split:
-                existing_split.order_status = "撤销中"
-
-        # 如果订单状态变更为已下单，检查拆单管理中相同订单是否为撤销中，如果是则改为进行中
-        if status_data.order_status == "已下单":
-            existing_split = db.query(Split).filter(
-                Split.order_number == order.order_number
-            ).first()
-            if existing_split and existing_split.order_status == "撤销中":
-                existing_split.order_status = "拆单中"
+        result = _apply_order_statuses(db, [(order, status_data.order_status)])[0]
+        if "error" in result:
+            return error_response(message=result["error"])
 
         db.commit()
         db.refresh(order)
@@ -740,7 +874,7 @@ async def update_order_status(
 
 
 @router.get("/{order_id}", response_model=OrderResponse, summary="获取订单详情")
-async def get_order(
+def get_order(
     order_id: int,
     db: Session = Depends(get_db)
 ):
@@ -805,8 +939,34 @@ async def get_order(
         raise HTTPException(status_code=500, detail=f"获取订单详情失败: {str(e)}")
 
 
+@router.post("/purge", summary="批量清理订单（联动删除拆单、生产及过程数据）")
+def purge_order_data(
+    criteria: OrderPurgeRequest,
+    dry_run: bool = Query(False, description="只统计将删除的数据，不写入"),
+    db: Session = Depends(get_db)
+):
+    """
+    按订单ID列表或筛选条件（订单状态、分单/下单日期范围）批量删除订单，
+    联动删除设计进度、拆单及其进度、生产及其进度、订单详情快照。
+
+    订单按块分多个事务删除；建议先以 dry_run=true 查看各表将删除的行数。
+    """
+    try:
+        counts = purge_orders(db, criteria, dry_run=dry_run)
+    except ValueError as e:
+        return error_response(message=str(e))
+    except Exception as e:
+        return error_response(message=f"批量清理订单失败: {str(e)}")
+
+    action = "将删除" if dry_run else "已删除"
+    return success_response(
+        data={"dry_run": dry_run, "deleted": counts},
+        message=f"{action}订单 {counts['orders']} 条"
+    )
+
+
 @router.delete("/{order_id}", summary="删除订单（联动删除拆单、生产及过程数据）")
-async def delete_order(
+def delete_order(
     order_id: int,
     db: Session = Depends(get_db)
 ):
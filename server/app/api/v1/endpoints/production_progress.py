@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
@@ -6,20 +7,24 @@ from app.core.database import get_db
 from app.models.production_progress import ProductionProgress, ItemType
 from app.models.production import Production
 from app.models.split import Split
-from app.models.split_progress import SplitProgress, ItemType
+from app.models.split_progress import SplitProgress, ItemType as SplitItemType
 from app.schemas.production import (
-    ProductionProgressBase,
+    ProductionProgressUpdate,
     ProductionProgressBatchUpdate,
     ProductionProgressResponse
 )
 from app.core.response import success_response, error_response
+from app.utils.dates import days_between
+from app.utils.completion import refresh_production_counters, refresh_split_counters
 from app.utils.production_status_validator import validate_production_status
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
 @router.get("/production/{production_id}", response_model=List[ProductionProgressResponse], summary="获取生产进度列表")
-async def get_production_progress(
+def get_production_progress(
     production_id: int,
     db: Session = Depends(get_db)
 ):
@@ -53,7 +58,7 @@ async def get_production_progress(
 
 
 @router.post("/production/{production_id}/batch", response_model=List[ProductionProgressResponse], summary="批量更新生产进度")
-async def batch_update_production_progress(
+def batch_update_production_progress(
     production_id: int,
     progress_data: List[ProductionProgressBatchUpdate],
     db: Session = Depends(get_db)
@@ -71,60 +76,34 @@ async def batch_update_production_progress(
                 detail="生产记录不存在"
             )
 
+        # 一次查询本次要更新的全部进度记录
+        item_ids = [item_data.id for item_data in progress_data if item_data.id]
+        progress_map = {}
+        if item_ids:
+            progress_map = {
+                item.id: item
+                for item in db.query(ProductionProgress).filter(
+                    ProductionProgress.id.in_(item_ids),
+                    ProductionProgress.production_id == production_id
+                )
+            }
+
         # 更新现有的进度记录
         updated_progress_items = []
+        synced_order_dates = {}
         for item_data in progress_data:
             # 检查是否包含ID字段（前端发送的更新数据应该包含ID）
-            if hasattr(item_data, 'id') and item_data.id:
+            if item_data.id:
                 # 更新现有记录
-                progress_item = db.query(ProductionProgress).filter(
-                    ProductionProgress.id == item_data.id,
-                    ProductionProgress.production_id == production_id
-                ).first()
+                progress_item = progress_map.get(item_data.id)
 
                 if progress_item:
                     # 更新所有非None的字段
                     if item_data.order_date is not None:
                         progress_item.order_date = item_data.order_date
-                        
-                        # 同步order_date到拆单进度中的purchase_date（外购项）
-                        try:
-                            # 查找对应的拆单记录
-                            split = db.query(Split).filter(
-                                Split.order_number == production.order_number
-                            ).first()
-                            
-                            if split:
-                                # 只更新相同category_name的外购项的采购日期
-                                external_progress_items = db.query(SplitProgress).filter(
-                                    SplitProgress.split_id == split.id,
-                                    SplitProgress.item_type == ItemType.EXTERNAL,
-                                    SplitProgress.category_name == progress_item.category_name
-                                ).all()
-                                
-                                for external_item in external_progress_items:
-                                    external_item.purchase_date = item_data.order_date
-                                    external_item.updated_at = datetime.utcnow()
-                                    
-                                    # 计算并更新周期时间
-                                    if external_item.purchase_date:
-                                        try:
-                                            from datetime import datetime as dt
-                                            # 直接使用拆单记录中的下单日期
-                                            if split.order_date:
-                                                order_dt = dt.strptime(split.order_date, '%Y-%m-%d')
-                                                purchase_dt = dt.fromisoformat(external_item.purchase_date.replace('Z', '+00:00'))
-                                                cycle_days = (purchase_dt.date() - order_dt.date()).days
-                                                external_item.cycle_days = f"{cycle_days}天"
-                                        except Exception as cycle_e:
-                                            print(f"计算周期时间失败: {str(cycle_e)}")
-                                    else:
-                                        external_item.cycle_days = None
-                                    
-                        except Exception as e:
-                            # 记录错误但不影响主要流程
-                            print(f"同步order_date到拆单进度purchase_date失败: {str(e)}")
-                            
+                        # 记录需同步到拆单进度的下单日期，循环结束后统一同步
+                        synced_order_dates[progress_item.category_name] = item_data.order_date
+
                     if item_data.expected_material_date is not None:
                         progress_item.expected_material_date = item_data.expected_material_date
                     if item_data.actual_storage_date is not None:
@@ -159,14 +138,48 @@ async def batch_update_production_progress(
                 db.add(progress_item)
                 updated_progress_items.append(progress_item)
 
-        # 使用新的状态校验方法自动更新状态
-        validate_production_status(db, production_id)
+        # 同步order_date到拆单进度中相同类目外购项的purchase_date：拆单只查一次，外购项按类目一次查出
+        # 同步失败时异常向外抛出，整批回滚，不提交与拆单进度不一致的生产进度
+        synced_split_ids = set()
+        if synced_order_dates:
+            split = db.query(Split).filter(
+                Split.order_number == production.order_number
+            ).first()
 
+            if split:
+                synced_split_ids.add(split.id)
+                external_progress_items = db.query(SplitProgress).filter(
+                    SplitProgress.split_id == split.id,
+                    SplitProgress.item_type == SplitItemType.EXTERNAL,
+                    SplitProgress.category_name.in_(list(synced_order_dates))
+                ).all()
+
+                now = datetime.utcnow()
+                for external_item in external_progress_items:
+                    external_item.purchase_date = synced_order_dates[external_item.category_name]
+                    external_item.updated_at = now
+
+                    # 计算并更新周期时间（直接使用拆单记录中的下单日期）
+                    if external_item.purchase_date:
+                        if split.order_date:
+                            cycle_days = days_between(external_item.purchase_date, split.order_date)
+                            if cycle_days is not None:
+                                external_item.cycle_days = f"{cycle_days}天"
+                    else:
+                        external_item.cycle_days = None
+
+        # 使用新的状态校验方法自动更新状态，与进度修改、计数刷新在同一事务中提交
+        validate_production_status(db, production_id, commit=False)
+
+        refresh_production_counters(db, [production_id])
+        refresh_split_counters(db, synced_split_ids)
+        db.flush()
+        returned_ids = [item.id for item in updated_progress_items]
         db.commit()
 
-        # 刷新数据以获取ID
-        for item in updated_progress_items:
-            db.refresh(item)
+        # 提交后一次查询重新加载返回的记录，不再逐条 refresh
+        if returned_ids:
+            db.query(ProductionProgress).filter(ProductionProgress.id.in_(returned_ids)).all()
 
         return [ProductionProgressResponse.model_validate(item) for item in updated_progress_items]
 
@@ -174,16 +187,17 @@ async def batch_update_production_progress(
         raise
     except Exception as e:
         db.rollback()
-        return error_response(
-            message=f"批量更新生产进度失败: {str(e)}",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        logger.exception(f"批量更新生产进度失败 (ID: {production_id})")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"批量更新生产进度失败: {str(e)}"
         )
 
 
 @router.put("/{progress_id}", response_model=ProductionProgressResponse, summary="更新单个进度项")
-async def update_progress_item(
+def update_progress_item(
     progress_id: int,
-    progress_data: ProductionProgressBase,
+    progress_data: ProductionProgressUpdate,
     db: Session = Depends(get_db)
 ):
     """
@@ -205,6 +219,7 @@ async def update_progress_item(
             setattr(progress_item, field, value)
 
         progress_item.updated_at = datetime.now()
+        refresh_production_counters(db, [progress_item.production_id])
         db.commit()
         db.refresh(progress_item)
 
@@ -221,7 +236,7 @@ async def update_progress_item(
 
 
 @router.delete("/{progress_id}", summary="删除进度项")
-async def delete_progress_item(
+def delete_progress_item(
     progress_id: int,
     db: Session = Depends(get_db)
 ):
@@ -240,6 +255,7 @@ async def delete_progress_item(
             )
 
         db.delete(progress_item)
+        refresh_production_counters(db, [progress_item.production_id])
         db.commit()
 
         return {"message": "删除进度项成功"}
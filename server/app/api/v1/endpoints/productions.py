@@ -1,7 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List
+from typing import Dict, Iterator, List
 from datetime import datetime
 import math
 
@@ -17,12 +16,140 @@ from app.schemas.production import (
 )
 from app.core.response import success_response, error_response
 from app.utils.production_status_validator import validate_production_status
+from app.utils.batch import chunked
+from app.utils.completion import PRODUCTION_COMPLETION, completion_filter
+from app.utils.dates import today_str
+from app.utils.export import iter_query_batches, stream_export
+from app.utils.pagination import SortKey, cursor_date, paginate_by_cursor
 
 router = APIRouter()
 
 
+def _load_production_progress_map(db: Session, production_ids: List[int]) -> Dict[int, List[ProductionProgress]]:
+    """批量查询生产进度记录，按production_id分组返回"""
+    progress_map: Dict[int, List[ProductionProgress]] = {}
+    for chunk in chunked(production_ids):
+        progress_items = db.query(ProductionProgress).filter(
+            ProductionProgress.production_id.in_(chunk)
+        ).order_by(ProductionProgress.id).all()
+
+        for item in progress_items:
+            progress_map.setdefault(item.production_id, []).append(item)
+    return progress_map
+
+
+def _build_production_progress_summary(progress_items: List[ProductionProgress]):
+    """
+    根据生产进度记录生成采购状态和成品入库数量字符串
+
+    采购状态格式："类目材料:计划齐料日期:实际入库日期"（厂内）或 "类目:计划到厂日期:实际到厂日期"（外购）
+    成品入库数量格式："类目:件数"
+    """
+    purchase_status_parts = []
+    finished_goods_quantity_parts = []
+
+    for progress in progress_items:
+        if progress.item_type == ItemType.INTERNAL:
+            # 厂内项目：同时返回计划齐料日期与实际入库日期
+            planned = progress.expected_material_date or ""
+            actual = progress.actual_storage_date or ""
+            purchase_status_parts.append(
+                f"{progress.category_name}材料:{planned}:{actual}"
+            )
+        elif progress.item_type == ItemType.EXTERNAL:
+            # 外购项目：同时返回计划到厂日期与实际到厂日期
+            planned = progress.expected_arrival_date or ""
+            actual = progress.actual_arrival_date or ""
+            purchase_status_parts.append(
+                f"{progress.category_name}:{planned}:{actual}"
+            )
+        else:
+            continue
+
+        # 厂内和外购项目都生成成品入库数量信息
+        finished_goods_quantity_parts.append(
+            f"{progress.category_name}:{progress.quantity or ''}"
+        )
+
+    purchase_status = "; ".join(
+        purchase_status_parts) if purchase_status_parts else "暂无进度信息"
+    finished_goods_quantity = "; ".join(
+        finished_goods_quantity_parts) if finished_goods_quantity_parts else "暂无数量信息"
+    return purchase_status, finished_goods_quantity
+
+
+def _apply_production_filters(query, query_data: ProductionListQuery):
+    """按列表查询条件过滤生产记录（列表和导出共用）"""
+    # 搜索条件
+    if query_data.order_number:
+        query = query.filter(Production.order_number.like(
+            f"%{query_data.order_number}%"))
+
+    if query_data.customer_name:
+        query = query.filter(Production.customer_name.like(
+            f"%{query_data.customer_name}%"))
+
+    if query_data.order_status:
+        query = query.filter(
+            Production.order_status.in_(query_data.order_status))
+
+    # 类目和完成状态组合过滤（按生产分组一次聚合 production_progress）
+    completion_condition = completion_filter(
+        PRODUCTION_COMPLETION, query_data.completion_status, query_data.order_category)
+    if completion_condition is not None:
+        query = query.filter(completion_condition)
+
+    # 日期区间搜索
+    if query_data.expected_delivery_start:
+        query = query.filter(
+            Production.expected_delivery_date >= query_data.expected_delivery_start)
+    if query_data.expected_delivery_end:
+        query = query.filter(
+            Production.expected_delivery_date <= query_data.expected_delivery_end)
+
+    if query_data.cutting_date_start:
+        query = query.filter(Production.cutting_date >=
+                             query_data.cutting_date_start)
+    if query_data.cutting_date_end:
+        query = query.filter(Production.cutting_date <=
+                             query_data.cutting_date_end)
+
+    if query_data.expected_shipment_start:
+        query = query.filter(
+            Production.expected_shipping_date >= query_data.expected_shipment_start)
+    if query_data.expected_shipment_end:
+        query = query.filter(
+            Production.expected_shipping_date <= query_data.expected_shipment_end)
+
+    if query_data.actual_shipment_start:
+        query = query.filter(
+            Production.actual_delivery_date >= query_data.actual_shipment_start)
+    if query_data.actual_shipment_end:
+        query = query.filter(
+            Production.actual_delivery_date <= query_data.actual_shipment_end)
+
+    return query
+
+
+def _production_sort(query_data: ProductionListQuery):
+    """
+    列表排序字段和方向
+
+    Returns:
+        (排序字段, 是否降序)，页面未传入排序字段时默认按预计出货日期降序
+    """
+    # 定义排序字段映射
+    sort_mapping = {
+        "expected_delivery_date": Production.expected_delivery_date,
+        "expected_shipping_date": Production.expected_shipping_date,
+        "split_order_date": Production.split_order_date,
+    }
+    order_column = sort_mapping.get(query_data.sort, Production.expected_shipping_date)
+    return order_column, (query_data.sort_order or "desc").lower() != "asc"
+
+
 @router.post("/list", response_model=ProductionListResponse, summary="获取生产管理列表")
-async def get_productions(
+def get_productions(
     query_data: ProductionListQuery,
     db: Session = Depends(get_db)
 ):
@@ -32,198 +159,30 @@ async def get_productions(
     """
     try:
         # 构建基础查询
-        query = db.query(Production)
-
-        # 搜索条件
-        if query_data.order_number:
-            query = query.filter(Production.order_number.like(
-                f"%{query_data.order_number}%"))
-
-        if query_data.customer_name:
-            query = query.filter(Production.customer_name.like(
-                f"%{query_data.customer_name}%"))
-
-        if query_data.order_status:
-            query = query.filter(
-                Production.order_status.in_(query_data.order_status))
-
-        # 类目和完成状态组合过滤（从production_progress表中查询）
-        if query_data.completion_status:
-            # 根据完成状态筛选
-            if query_data.completion_status == "completed":
-                # 查询完成的：所有类目都有实际日期
-                if query_data.order_category:
-                    # 如果指定了类目，查询这些类目都完成的订单
-                    # 对于厂内生产项（INTERNAL），检查 actual_storage_date 不为空
-                    # 对于外购项（EXTERNAL），检查 actual_arrival_date 不为空
-                    completed_internal = db.query(ProductionProgress.production_id).filter(
-                        ProductionProgress.category_name.in_(query_data.order_category),
-                        ProductionProgress.item_type == ItemType.INTERNAL,
-                        ProductionProgress.actual_storage_date.isnot(None),
-                        ProductionProgress.actual_storage_date != ""
-                    ).distinct()
-                    
-                    completed_external = db.query(ProductionProgress.production_id).filter(
-                        ProductionProgress.category_name.in_(query_data.order_category),
-                        ProductionProgress.item_type == ItemType.EXTERNAL,
-                        ProductionProgress.actual_arrival_date.isnot(None),
-                        ProductionProgress.actual_arrival_date != ""
-                    ).distinct()
-                    
-                    # 合并两个查询结果
-                    completed_production_ids = completed_internal.union(completed_external).subquery()
-                    query = query.filter(Production.id.in_(completed_production_ids))
-                else:
-                    # 如果没有指定类目，查询所有类目都完成的订单
-                    # 需要确保订单的所有类目都有实际日期
-                    # 查询有实际日期的类目数量
-                    completed_counts = db.query(
-                        ProductionProgress.production_id,
-                        func.count(ProductionProgress.id).label('completed_count')
-                    ).filter(
-                        or_(
-                            and_(
-                                ProductionProgress.item_type == ItemType.INTERNAL,
-                                ProductionProgress.actual_storage_date.isnot(None),
-                                ProductionProgress.actual_storage_date != ""
-                            ),
-                            and_(
-                                ProductionProgress.item_type == ItemType.EXTERNAL,
-                                ProductionProgress.actual_arrival_date.isnot(None),
-                                ProductionProgress.actual_arrival_date != ""
-                            )
-                        )
-                    ).group_by(ProductionProgress.production_id).subquery()
-                    
-                    # 查询总类目数量
-                    total_counts = db.query(
-                        ProductionProgress.production_id,
-                        func.count(ProductionProgress.id).label('total_count')
-                    ).group_by(ProductionProgress.production_id).subquery()
-                    
-                    # 查询完成数量等于总数量的生产ID
-                    fully_completed = db.query(total_counts.c.production_id).join(
-                        completed_counts,
-                        total_counts.c.production_id == completed_counts.c.production_id
-                    ).filter(
-                        total_counts.c.total_count == completed_counts.c.completed_count
-                    ).subquery()
-                    
-                    query = query.filter(Production.id.in_(fully_completed))
-            elif query_data.completion_status == "incomplete":
-                # 查询未完成的：至少有一个类目没有实际日期
-                if query_data.order_category:
-                    # 如果指定了类目，查询这些类目未完成的订单
-                    incomplete_internal = db.query(ProductionProgress.production_id).filter(
-                        ProductionProgress.category_name.in_(query_data.order_category),
-                        ProductionProgress.item_type == ItemType.INTERNAL,
-                        or_(
-                            ProductionProgress.actual_storage_date.is_(None),
-                            ProductionProgress.actual_storage_date == ""
-                        )
-                    ).distinct()
-                    
-                    incomplete_external = db.query(ProductionProgress.production_id).filter(
-                        ProductionProgress.category_name.in_(query_data.order_category),
-                        ProductionProgress.item_type == ItemType.EXTERNAL,
-                        or_(
-                            ProductionProgress.actual_arrival_date.is_(None),
-                            ProductionProgress.actual_arrival_date == ""
-                        )
-                    ).distinct()
-                    
-                    # 合并两个查询结果
-                    incomplete_production_ids = incomplete_internal.union(incomplete_external).subquery()
-                    query = query.filter(Production.id.in_(incomplete_production_ids))
-                else:
-                    # 如果没有指定类目，查询至少有一个类目未完成的订单
-                    incomplete_internal = db.query(ProductionProgress.production_id).filter(
-                        ProductionProgress.item_type == ItemType.INTERNAL,
-                        or_(
-                            ProductionProgress.actual_storage_date.is_(None),
-                            ProductionProgress.actual_storage_date == ""
-                        )
-                    ).distinct()
-                    
-                    incomplete_external = db.query(ProductionProgress.production_id).filter(
-                        ProductionProgress.item_type == ItemType.EXTERNAL,
-                        or_(
-                            ProductionProgress.actual_arrival_date.is_(None),
-                            ProductionProgress.actual_arrival_date == ""
-                        )
-                    ).distinct()
-                    
-                    # 合并两个查询结果
-                    incomplete_production_ids = incomplete_internal.union(incomplete_external).subquery()
-                    query = query.filter(Production.id.in_(incomplete_production_ids))
-        elif query_data.order_category:
-            # 如果只选择了类目，没有选择完成状态，查询包含指定类目的生产ID
-            # 需要JOIN ProductionProgress表
-            query = query.join(ProductionProgress, Production.id == ProductionProgress.production_id)
-            query = query.filter(ProductionProgress.category_name.in_(query_data.order_category))
-            # 去重，因为一个Production可能对应多个ProductionProgress记录
-            query = query.distinct()
-
-        # 日期区间搜索
-        if query_data.expected_delivery_start:
-            query = query.filter(
-                Production.expected_delivery_date >= query_data.expected_delivery_start)
-        if query_data.expected_delivery_end:
-            query = query.filter(
-                Production.expected_delivery_date <= query_data.expected_delivery_end)
-
-        if query_data.cutting_date_start:
-            query = query.filter(Production.cutting_date >=
-                                 query_data.cutting_date_start)
-        if query_data.cutting_date_end:
-            query = query.filter(Production.cutting_date <=
-                                 query_data.cutting_date_end)
-
-        if query_data.expected_shipment_start:
-            query = query.filter(
-                Production.expected_shipping_date >= query_data.expected_shipment_start)
-        if query_data.expected_shipment_end:
-            query = query.filter(
-                Production.expected_shipping_date <= query_data.expected_shipment_end)
-
-        if query_data.actual_shipment_start:
-            query = query.filter(
-                Production.actual_delivery_date >= query_data.actual_shipment_start)
-        if query_data.actual_shipment_end:
-            query = query.filter(
-                Production.actual_delivery_date <= query_data.actual_shipment_end)
-
-        # 获取总数
-        total = query.count()
-
-        # 排序处理
-        sort_field = query_data.sort
-        sort_order = query_data.sort_order or "desc"  # 默认降序
-
-        # 定义排序字段映射
-        sort_mapping = {
-            "expected_delivery_date": Production.expected_delivery_date,
-            "expected_shipping_date": Production.expected_shipping_date,
-            "split_order_date": Production.split_order_date,
-        }
+        query = _apply_production_filters(db.query(Production), query_data)
 
-        # 获取排序字段，如果页面没有传入排序字段则默认使用预计出货日期
-        if sort_field and sort_field in sort_mapping:
-            order_column = sort_mapping[sort_field]
-        else:
-            # 默认按预计出货日期排序
-            order_column = Production.expected_shipping_date
+        # 获取总数（游标分页时默认不查询总数）
+        cursor_mode = bool(query_data.cursor_mode or query_data.cursor)
+        total = query.count() if not cursor_mode or query_data.include_total else None
 
-        # 根据排序规则设置排序方向
-        if sort_order.lower() == "asc":
-            # 升序：从远到近
-            primary_order = order_column.asc().nulls_last()
-        else:
-            # 降序：从近到远（默认）
-            primary_order = order_column.desc().nulls_last()
+        # 排序处理：空值排在最后
+        order_column, descending = _production_sort(query_data)
+        primary_order = order_column.desc().nulls_last() if descending else order_column.asc().nulls_last()
 
         # 分页处理
-        if query_data.no_pagination:
+        next_cursor = None
+        if cursor_mode:
+            # 游标分页：按（排序字段, 订单编号）定位，排序字段空值在后
+            cursor_keys = [
+                SortKey(order_column, descending=descending, nullable=True, parser=cursor_date),
+                SortKey(Production.order_number),
+            ]
+            try:
+                productions, next_cursor = paginate_by_cursor(
+                    query, cursor_keys, query_data.cursor, query_data.page_size)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        elif query_data.no_pagination:
             # 不分页，返回全部数据
             # 使用 NULLS LAST 确保空值排在最后，然后按订单编号降序
             productions = query.order_by(
@@ -239,61 +198,15 @@ async def get_productions(
                 Production.order_number.desc()
             ).offset(offset).limit(query_data.page_size).all()
 
+        # 批量查询本页生产记录的进度项（一次查询），再在内存中按生产记录分组
+        progress_map = _load_production_progress_map(
+            db, [production.id for production in productions])
+
         # 转换为响应格式
         production_items = []
         for production in productions:
-            # 查询生产进度表，生成采购状态
-            progress_items = db.query(ProductionProgress).filter(
-                ProductionProgress.production_id == production.id
-            ).all()
-
-            # 生成采购状态字符串
-            purchase_status_parts = []
-            # 生成成品入库数量字符串
-            finished_goods_quantity_parts = []
-
-            for progress in progress_items:
-                if progress.item_type == ItemType.INTERNAL:
-                    # 厂内项目：同时返回计划齐料日期与实际入库日期
-                    planned = progress.expected_material_date or ""
-                    actual = progress.actual_storage_date or ""
-                    purchase_status_parts.append(
-                        f"{progress.category_name}材料:{planned}:{actual}"
-                    )
-
-                    # 厂内项目：生成成品入库数量信息
-                    if progress.quantity:
-                        finished_goods_quantity_parts.append(
-                            f"{progress.category_name}:{progress.quantity}"
-                        )
-                    else:
-                        finished_goods_quantity_parts.append(
-                            f"{progress.category_name}:"
-                        )
-
-                elif progress.item_type == ItemType.EXTERNAL:
-                    # 外购项目：同时返回计划到厂日期与实际到厂日期
-                    planned = progress.expected_arrival_date or ""
-                    actual = progress.actual_arrival_date or ""
-                    purchase_status_parts.append(
-                        f"{progress.category_name}:{planned}:{actual}"
-                    )
-
-                    # 外购项目：也生成成品入库数量信息
-                    if progress.quantity:
-                        finished_goods_quantity_parts.append(
-                            f"{progress.category_name}:{progress.quantity}"
-                        )
-                    else:
-                        finished_goods_quantity_parts.append(
-                            f"{progress.category_name}:"
-                        )
-
-            purchase_status = "; ".join(
-                purchase_status_parts) if purchase_status_parts else "暂无进度信息"
-            finished_goods_quantity = "; ".join(
-                finished_goods_quantity_parts) if finished_goods_quantity_parts else "暂无数量信息"
-            print(purchase_status)
+            purchase_status, finished_goods_quantity = _build_production_progress_summary(
+                progress_map.get(production.id, []))
             item_data = {
                 "id": production.id,
                 "order_number": production.order_number,
@@ -324,7 +237,9 @@ async def get_productions(
             production_items.append(ProductionListItem(**item_data))
 
         # 计算总页数
-        if query_data.no_pagination:
+        if total is None:
+            total_pages = None
+        elif query_data.no_pagination:
             total_pages = 1  # 不分页时总页数为1
         else:
             total_pages = math.ceil(
@@ -336,9 +251,12 @@ async def get_productions(
             page=query_data.page if not query_data.no_pagination else 1,
             page_size=len(
                 production_items) if query_data.no_pagination else query_data.page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -346,8 +264,61 @@ async def get_productions(
         )
 
 
+PRODUCTION_EXPORT_HEADERS = [
+    "订单编号", "客户名称", "地址", "拆单员", "是否安装", "客户打款日期", "拆单下单日期", "下单天数",
+    "预计交货日期", "18板数量", "09板数量", "下料日期", "预计出货日期", "实际出货日期",
+    "厂内生产项", "外购项", "采购状态", "成品入库数量", "订单状态", "特殊说明", "设计师", "备注",
+]
+
+
+def _iter_production_export_rows(query_data: ProductionListQuery, bind) -> Iterator[list]:
+    """按批读取导出的生产记录行；使用独立会话，生命周期与流式响应一致"""
+    with Session(bind=bind) as db:
+        order_column, descending = _production_sort(query_data)
+        primary_order = order_column.desc().nulls_last() if descending else order_column.asc().nulls_last()
+        query = _apply_production_filters(db.query(Production), query_data)
+        query = query.order_by(primary_order, Production.order_number.desc(), Production.id.desc())
+
+        for productions in iter_query_batches(query):
+            # 每批一次查询进度记录
+            progress_map = _load_production_progress_map(
+                db, [production.id for production in productions])
+            rows = []
+            for production in productions:
+                purchase_status, finished_goods_quantity = _build_production_progress_summary(
+                    progress_map.get(production.id, []))
+                rows.append((
+                    production.order_number, production.customer_name, production.address,
+                    production.splitter, production.is_installation, production.customer_payment_date,
+                    production.split_order_date, production.order_days, production.expected_delivery_date,
+                    production.board_18, production.board_09, production.cutting_date,
+                    production.expected_shipping_date, production.actual_delivery_date,
+                    production.internal_production_items, production.external_purchase_items,
+                    purchase_status, finished_goods_quantity, production.order_status,
+                    production.special_notes, production.designer, production.remarks,
+                ))
+            yield rows
+
+
+@router.post("/export", summary="导出生产管理列表")
+def export_productions(
+    query_data: ProductionListQuery,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    按列表查询条件和排序导出全部生产记录（忽略分页参数），以 CSV 或 XLSX 流式返回
+    """
+    return stream_export(
+        PRODUCTION_EXPORT_HEADERS,
+        _iter_production_export_rows(query_data, db.get_bind()),
+        f"生产管理列表_{today_str()}",
+        export_format
+    )
+
+
 @router.put("/{production_id}", summary="编辑生产记录")
-async def update_production(
+def update_production(
     production_id: int,
     production_data: ProductionEdit,
     db: Session = Depends(get_db)
@@ -424,7 +395,7 @@ async def update_production(
 
 
 @router.get("/{production_id}", response_model=ProductionResponse, summary="获取生产记录详情")
-async def get_production(
+def get_production(
     production_id: int,
     db: Session = Depends(get_db)
 ):
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
@@ -15,12 +16,13 @@ from app.schemas.split_progress import (
     SplitProgressResponse,
     SplitProgressListResponse
 )
+from app.utils.completion import refresh_split_counters
 
 router = APIRouter()
 
 
 @router.get("/split/{split_id}", response_model=SplitProgressListResponse, summary="获取拆单进度列表")
-async def get_split_progress(
+def get_split_progress(
     split_id: int,
     db: Session = Depends(get_db)
 ):
@@ -56,7 +58,7 @@ async def get_split_progress(
 
 
 @router.get("/order/{order_number}", response_model=SplitProgressListResponse, summary="通过订单号获取拆单进度列表")
-async def get_split_progress_by_order_number(
+def get_split_progress_by_order_number(
     order_number: str,
     db: Session = Depends(get_db)
 ):
@@ -82,7 +84,7 @@ async def get_split_progress_by_order_number(
 
 
 @router.post("/split/{split_id}/batch", response_model=SplitProgressListResponse, summary="批量更新拆单进度")
-async def batch_update_split_progress(
+def batch_update_split_progress(
     split_id: int,
     progress_data: SplitProgressBatchUpdate,
     db: Session = Depends(get_db)
@@ -101,112 +103,87 @@ async def batch_update_split_progress(
                 detail="拆单不存在"
             )
         
-        # 处理厂内生产项
-        if progress_data.internal_items:
-            for category_name, dates in progress_data.internal_items.items():
-                # 查找或创建进度记录
-                progress = db.query(SplitProgress).filter(
-                    SplitProgress.split_id == split_id,
-                    SplitProgress.category_name == category_name,
-                    SplitProgress.item_type == ItemType.INTERNAL
-                ).first()
-                
-                if not progress:
-                    # 创建新记录
-                    progress = SplitProgress(
-                        split_id=split_id,
-                        order_number=split.order_number,
-                        item_type=ItemType.INTERNAL,
-                        category_name=category_name
-                    )
-                    db.add(progress)
-                
-                # 更新日期（支持删除/清空）
-                if 'plannedDate' in dates:
-                    progress.planned_date = dates['plannedDate'] if dates['plannedDate'] else None
-                if 'splitDate' in dates:
-                    progress.split_date = dates['splitDate'] if dates['splitDate'] else None
-                    
-                    # 注意：拆单周期已改为动态计算，不再在此处更新cycle_days字段
-                
-                progress.updated_at = datetime.utcnow()
-        
-        # 处理外购项
-        if progress_data.external_items:
-            for category_name, dates in progress_data.external_items.items():
-                # 查找或创建进度记录
-                progress = db.query(SplitProgress).filter(
-                    SplitProgress.split_id == split_id,
-                    SplitProgress.category_name == category_name,
-                    SplitProgress.item_type == ItemType.EXTERNAL
-                ).first()
-                
-                if not progress:
-                    # 创建新记录
-                    progress = SplitProgress(
-                        split_id=split_id,
-                        order_number=split.order_number,
-                        item_type=ItemType.EXTERNAL,
-                        category_name=category_name
-                    )
-                    db.add(progress)
-                
+        # 一次查询该拆单的全部进度记录，在内存中与提交的数据比对；
+        # 新记录一条批量 INSERT 写入，已有记录的修改在 flush 时按相同字段合并为批量 UPDATE
+        progress_map = {}
+        for progress in db.query(SplitProgress).filter(
+            SplitProgress.split_id == split_id
+        ).order_by(SplitProgress.id):
+            progress_map.setdefault((progress.item_type, progress.category_name), progress)
+
+        now = datetime.utcnow()
+        # (项目类型, 提交的数据, 完成日期字段名, 对应的模型字段)
+        new_rows = {}
+        item_groups = [
+            (ItemType.INTERNAL, progress_data.internal_items, 'splitDate', 'split_date'),
+            (ItemType.EXTERNAL, progress_data.external_items, 'purchaseDate', 'purchase_date'),
+        ]
+        for item_type, items, date_key, date_field in item_groups:
+            for category_name, dates in (items or {}).items():
                 # 更新日期（支持删除/清空）
+                # 注意：拆单周期已改为动态计算，不再在此处更新cycle_days字段
+                values = {}
                 if 'plannedDate' in dates:
-                    progress.planned_date = dates['plannedDate'] if dates['plannedDate'] else None
-                if 'purchaseDate' in dates:
-                    progress.purchase_date = dates['purchaseDate'] if dates['purchaseDate'] else None
-                    
-                    # 注意：拆单周期已改为动态计算，不再在此处更新cycle_days字段
-                
-                progress.updated_at = datetime.utcnow()
-        
+                    values['planned_date'] = dates['plannedDate'] if dates['plannedDate'] else None
+                if date_key in dates:
+                    values[date_field] = dates[date_key] if dates[date_key] else None
+
+                progress = progress_map.get((item_type, category_name))
+                if progress:
+                    for field, value in values.items():
+                        setattr(progress, field, value)
+                    progress.updated_at = now
+                else:
+                    # 新记录统一批量插入
+                    new_rows[(item_type, category_name)] = {
+                        'split_id': split_id,
+                        'order_number': split.order_number,
+                        'item_type': item_type,
+                        'category_name': category_name,
+                        'planned_date': None,
+                        'split_date': None,
+                        'purchase_date': None,
+                        **values,
+                        'created_at': now,
+                        'updated_at': now,
+                    }
+
+        if new_rows:
+            # render_nulls：空值也写入语句，各行参数一致才能合并为一次 executemany
+            db.execute(insert(SplitProgress).execution_options(render_nulls=True), list(new_rows.values()))
+
         # 更新拆单备注
         if progress_data.remarks is not None:
             split.remarks = progress_data.remarks
-            split.updated_at = datetime.utcnow()
-        
-        # 同步到生产管理进度
+            split.updated_at = now
+
+        # 同步到生产管理进度：厂内项的拆单日期、外购项的采购日期同步为生产进度的下单日期
         try:
             from app.models.production import Production
             from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
-            
+
+            synced_dates = {}
+            for item_type, items, date_key, _ in item_groups:
+                production_item_type = ProductionItemType(item_type.value)
+                for category_name, dates in (items or {}).items():
+                    if dates.get(date_key):
+                        synced_dates[(production_item_type, category_name)] = dates[date_key]
+
             # 检查该订单是否存在生产管理记录
-            production = db.query(Production).filter(Production.order_number == split.order_number).first()
+            production = db.query(Production).filter(
+                Production.order_number == split.order_number).first() if synced_dates else None
             if production:
-                # 处理厂内项的同步
-                if progress_data.internal_items:
-                    for category_name, dates in progress_data.internal_items.items():
-                        if 'splitDate' in dates and dates['splitDate']:
-                            # 查找对应的生产进度记录
-                            production_progress = db.query(ProductionProgress).filter(
-                                ProductionProgress.production_id == production.id,
-                                ProductionProgress.category_name == category_name,
-                                ProductionProgress.item_type == ProductionItemType.INTERNAL
-                            ).first()
-                            
-                            if production_progress:
-                                production_progress.order_date = dates['splitDate']
-                                production_progress.updated_at = datetime.utcnow()
-                
-                # 处理外购项的同步
-                if progress_data.external_items:
-                    for category_name, dates in progress_data.external_items.items():
-                        if 'purchaseDate' in dates and dates['purchaseDate']:
-                            # 查找对应的生产进度记录
-                            production_progress = db.query(ProductionProgress).filter(
-                                ProductionProgress.production_id == production.id,
-                                ProductionProgress.category_name == category_name,
-                                ProductionProgress.item_type == ProductionItemType.EXTERNAL
-                            ).first()
-                            
-                            if production_progress:
-                                production_progress.order_date = dates['purchaseDate']
-                                production_progress.updated_at = datetime.utcnow()
+                for production_progress in db.query(ProductionProgress).filter(
+                    ProductionProgress.production_id == production.id
+                ).order_by(ProductionProgress.id):
+                    key = (production_progress.item_type, production_progress.category_name)
+                    if key in synced_dates:
+                        production_progress.order_date = synced_dates.pop(key)
+                        production_progress.updated_at = now
         except Exception as sync_e:
             print(f"同步到生产管理进度失败: {str(sync_e)}")
-        
 
+        refresh_split_counters(db, [split_id])
         db.commit()
         
         # 返回更新后的进度列表
@@ -230,7 +207,7 @@ async def batch_update_split_progress(
 
 
 @router.put("/{progress_id}", response_model=SplitProgressResponse, summary="更新单个进度项")
-async def update_progress_item(
+def update_progress_item(
     progress_id: int,
     progress_data: SplitProgressUpdate,
     db: Session = Depends(get_db)
@@ -253,6 +230,7 @@ async def update_progress_item(
                 setattr(progress, field, value)
         
         progress.updated_at = datetime.utcnow()
+        refresh_split_counters(db, [progress.split_id])
         db.commit()
         db.refresh(progress)
         
@@ -269,7 +247,7 @@ async def update_progress_item(
 
 
 @router.delete("/{progress_id}", summary="删除进度项")
-async def delete_progress_item(
+def delete_progress_item(
     progress_id: int,
     db: Session = Depends(get_db)
 ):
@@ -285,6 +263,7 @@ async def delete_progress_item(
             )
         
         db.delete(progress)
+        refresh_split_counters(db, [progress.split_id])
         db.commit()
         
         return {"message": "进度项删除成功"}
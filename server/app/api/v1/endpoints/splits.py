@@ -1,21 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 import math
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from urllib.parse import unquote
 
 from app.core.database import get_db
-from app.models.user import User, UserRole
 from app.models.split import Split
 from app.models.order import Order
 from app.models.production import Production
 from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
 from app.models.progress import Progress
 from app.models.split_progress import SplitProgress, ItemType
-from app.models.category import Category, CategoryType
+from app.models.category import CategoryType
 from app.schemas.split import (
     SplitListQuery,
     SplitListResponse,
@@ -23,24 +22,143 @@ from app.schemas.split import (
     SplitUpdate,
     SplitProgressUpdate,
     SplitStatusUpdate,
+    SplitPlaceOrdersRequest,
     ProductionItem
 )
 from app.core.response import success_response, error_response
+from app.utils.batch import chunked
+from app.utils.cache import UserInfo, get_category_type, get_user_info
+from app.utils.dates import days_between, parse_date, today, today_str
+from app.utils.export import iter_query_batches, stream_export
+from app.utils.completion import (
+    SPLIT_COMPLETION,
+    completion_filter,
+    refresh_production_counters,
+    refresh_split_counters,
+)
+from app.utils.pagination import SortKey, cursor_date, cursor_int, paginate_by_cursor
 
 router = APIRouter()
 
+# 游标分页的排序键：下单日期降序（空值在后），订单编号降序，ID降序
+SPLIT_CURSOR_KEYS = [
+    SortKey(Split.order_date, nullable=True, parser=cursor_date),
+    SortKey(Split.order_number),
+    SortKey(Split.id, parser=cursor_int),
+]
+
 
-def get_current_user(username: Optional[str] = Header(None, alias="X-Username"), db: Session = Depends(get_db)) -> Optional[User]:
-    """获取当前用户信息"""
+def get_current_user(username: Optional[str] = Header(None, alias="X-Username"), db: Session = Depends(get_db)) -> Optional[UserInfo]:
+    """获取当前用户信息（按用户名缓存）"""
     if not username:
         return None
     # 解码URL编码的用户名
     username = unquote(username)
-    return db.query(User).filter(User.username == username).first()
+    return get_user_info(db, username)
+
+
+def _load_split_progress_map(db: Session, split_ids: List[int]) -> Dict[int, List[SplitProgress]]:
+    """批量查询拆单进度记录，按split_id分组返回"""
+    progress_map: Dict[int, List[SplitProgress]] = {}
+    if not split_ids:
+        return progress_map
+
+    for chunk in chunked(split_ids):
+        progress_items = db.query(SplitProgress).filter(
+            SplitProgress.split_id.in_(chunk)
+        ).order_by(SplitProgress.id).all()
+
+        for item in progress_items:
+            progress_map.setdefault(item.split_id, []).append(item)
+    return progress_map
+
+
+def _build_split_progress_items(split: Split, progress_items: List[SplitProgress]):
+    """
+    根据拆单进度记录构建厂内生产项和外购项列表
+
+    格式："类目:实际时间:拆单周期"，拆单周期 = 实际时间 - 拆单下单日期
+    """
+    internal_items = []
+    external_items = []
+
+    for item in progress_items:
+        if item.item_type == ItemType.INTERNAL:
+            actual_date = item.split_date
+        elif item.item_type == ItemType.EXTERNAL:
+            actual_date = item.purchase_date
+        else:
+            continue
+
+        if actual_date:
+            if not isinstance(actual_date, str):
+                actual_date = actual_date.strftime('%Y-%m-%d')
+            # 动态计算拆单周期：实际时间 - order_date（缺少下单日期或格式错误时为0）
+            cycle_days = days_between(actual_date, split.order_date) or 0
+        else:
+            actual_date = ''
+            cycle_days = 0  # 没有实际时间时为0
+
+        item_str = f"{item.category_name}:{actual_date}:{cycle_days}"
+        if item.item_type == ItemType.INTERNAL:
+            internal_items.append(item_str)
+        else:
+            external_items.append(item_str)
+
+    return internal_items, external_items
+
+
+def _apply_split_filters(query, query_data: SplitListQuery):
+    """按列表查询条件过滤拆单（列表和导出共用）"""
+    # 基础字段过滤
+    if query_data.order_number:
+        query = query.filter(
+            Split.order_number.contains(query_data.order_number))
+    if query_data.customer_name:
+        query = query.filter(
+            Split.customer_name.contains(query_data.customer_name))
+    if query_data.designer:
+        query = query.filter(Split.designer.contains(query_data.designer))
+    if query_data.salesperson:
+        query = query.filter(
+            Split.salesperson.contains(query_data.salesperson))
+    if query_data.splitter:
+        query = query.filter(Split.splitter.contains(query_data.splitter))
+    if query_data.order_type:
+        query = query.filter(Split.order_type == query_data.order_type)
+
+    # 多选状态过滤
+    if query_data.order_status:
+        query = query.filter(
+            Split.order_status.in_(query_data.order_status))
+    if query_data.quote_status:
+        query = query.filter(
+            Split.quote_status.in_(query_data.quote_status))
+
+    # 类目和完成状态组合过滤（按拆单分组一次聚合 split_progress）
+    completion_condition = completion_filter(
+        SPLIT_COMPLETION, query_data.completion_status, query_data.category_names)
+    if completion_condition is not None:
+        query = query.filter(completion_condition)
+
+    # 日期区间过滤
+    if query_data.order_date_start:
+        query = query.filter(Split.order_date >=
+                             query_data.order_date_start)
+    if query_data.order_date_end:
+        query = query.filter(Split.order_date <= query_data.order_date_end)
+    if query_data.completion_date_start:
+        query = query.filter(Split.completion_date >=
+                             query_data.completion_date_start)
+    if query_data.completion_date_end:
+        query = query.filter(Split.completion_date <=
+                             query_data.completion_date_end)
+
+    return query
 
 
 @router.post("/list", response_model=SplitListResponse, summary="获取拆单列表")
-async def get_splits(
+def get_splits(
     query_data: SplitListQuery,
     db: Session = Depends(get_db)
 ):
@@ -54,240 +172,46 @@ async def get_splits(
     """
     try:
         # 构建查询条件
-        query = db.query(Split)
-
-        # 基础字段过滤
-        if query_data.order_number:
-            query = query.filter(
-                Split.order_number.contains(query_data.order_number))
-        if query_data.customer_name:
-            query = query.filter(
-                Split.customer_name.contains(query_data.customer_name))
-        if query_data.designer:
-            query = query.filter(Split.designer.contains(query_data.designer))
-        if query_data.salesperson:
-            query = query.filter(
-                Split.salesperson.contains(query_data.salesperson))
-        if query_data.splitter:
-            query = query.filter(Split.splitter.contains(query_data.splitter))
-        if query_data.order_type:
-            query = query.filter(Split.order_type == query_data.order_type)
-
-        # 多选状态过滤
-        if query_data.order_status:
-            query = query.filter(
-                Split.order_status.in_(query_data.order_status))
-        if query_data.quote_status:
-            query = query.filter(
-                Split.quote_status.in_(query_data.quote_status))
-
-        # 类目和完成状态组合过滤（从split_progress表中查询）
-        if query_data.completion_status:
-            # 根据完成状态筛选
-            if query_data.completion_status == "completed":
-                # 查询完成的：所有类目都有下单日期
-                if query_data.category_names:
-                    # 如果指定了类目，查询这些类目都完成的订单
-                    # 对于厂内生产项（INTERNAL），检查 split_date 不为空
-                    # 对于外购项（EXTERNAL），检查 purchase_date 不为空
-                    completed_internal = db.query(SplitProgress.split_id).filter(
-                        SplitProgress.category_name.in_(query_data.category_names),
-                        SplitProgress.item_type == ItemType.INTERNAL,
-                        SplitProgress.split_date.isnot(None),
-                        SplitProgress.split_date != ""
-                    ).distinct()
-                    
-                    completed_external = db.query(SplitProgress.split_id).filter(
-                        SplitProgress.category_name.in_(query_data.category_names),
-                        SplitProgress.item_type == ItemType.EXTERNAL,
-                        SplitProgress.purchase_date.isnot(None),
-                        SplitProgress.purchase_date != ""
-                    ).distinct()
-                    
-                    # 合并两个查询结果
-                    completed_split_ids = completed_internal.union(completed_external).subquery()
-                    query = query.filter(Split.id.in_(completed_split_ids))
-                else:
-                    # 如果没有指定类目，查询所有类目都完成的订单
-                    # 需要确保订单的所有类目都有下单日期
-                    # 获取所有拆单ID
-                    all_split_ids = db.query(Split.id).subquery()
-                    
-                    # 对于每个拆单，检查是否所有类目都有下单日期
-                    # 查询有下单日期的类目数量
-                    completed_counts = db.query(
-                        SplitProgress.split_id,
-                        func.count(SplitProgress.id).label('completed_count')
-                    ).filter(
-                        or_(
-                            and_(
-                                SplitProgress.item_type == ItemType.INTERNAL,
-                                SplitProgress.split_date.isnot(None),
-                                SplitProgress.split_date != ""
-                            ),
-                            and_(
-                                SplitProgress.item_type == ItemType.EXTERNAL,
-                                SplitProgress.purchase_date.isnot(None),
-                                SplitProgress.purchase_date != ""
-                            )
-                        )
-                    ).group_by(SplitProgress.split_id).subquery()
-                    
-                    # 查询总类目数量
-                    total_counts = db.query(
-                        SplitProgress.split_id,
-                        func.count(SplitProgress.id).label('total_count')
-                    ).group_by(SplitProgress.split_id).subquery()
-                    
-                    # 查询完成数量等于总数量的拆单ID
-                    fully_completed = db.query(total_counts.c.split_id).join(
-                        completed_counts,
-                        total_counts.c.split_id == completed_counts.c.split_id
-                    ).filter(
-                        total_counts.c.total_count == completed_counts.c.completed_count
-                    ).subquery()
-                    
-                    query = query.filter(Split.id.in_(fully_completed))
-            elif query_data.completion_status == "incomplete":
-                # 查询未完成的：至少有一个类目没有下单日期
-                if query_data.category_names:
-                    # 如果指定了类目，查询这些类目未完成的订单
-                    incomplete_internal = db.query(SplitProgress.split_id).filter(
-                        SplitProgress.category_name.in_(query_data.category_names),
-                        SplitProgress.item_type == ItemType.INTERNAL,
-                        or_(
-                            SplitProgress.split_date.is_(None),
-                            SplitProgress.split_date == ""
-                        )
-                    ).distinct()
-                    
-                    incomplete_external = db.query(SplitProgress.split_id).filter(
-                        SplitProgress.category_name.in_(query_data.category_names),
-                        SplitProgress.item_type == ItemType.EXTERNAL,
-                        or_(
-                            SplitProgress.purchase_date.is_(None),
-                            SplitProgress.purchase_date == ""
-                        )
-                    ).distinct()
-                    
-                    # 合并两个查询结果
-                    incomplete_split_ids = incomplete_internal.union(incomplete_external).subquery()
-                    query = query.filter(Split.id.in_(incomplete_split_ids))
-                else:
-                    # 如果没有指定类目，查询至少有一个类目未完成的订单
-                    incomplete_internal = db.query(SplitProgress.split_id).filter(
-                        SplitProgress.item_type == ItemType.INTERNAL,
-                        or_(
-                            SplitProgress.split_date.is_(None),
-                            SplitProgress.split_date == ""
-                        )
-                    ).distinct()
-                    
-                    incomplete_external = db.query(SplitProgress.split_id).filter(
-                        SplitProgress.item_type == ItemType.EXTERNAL,
-                        or_(
-                            SplitProgress.purchase_date.is_(None),
-                            SplitProgress.purchase_date == ""
-                        )
-                    ).distinct()
-                    
-                    # 合并两个查询结果
-                    incomplete_split_ids = incomplete_internal.union(incomplete_external).subquery()
-                    query = query.filter(Split.id.in_(incomplete_split_ids))
-        elif query_data.category_names:
-            # 如果只选择了类目，没有选择完成状态，查询包含指定类目的拆单ID
-            split_ids_with_categories = db.query(SplitProgress.split_id).filter(
-                SplitProgress.category_name.in_(query_data.category_names)
-            ).distinct().subquery()
-
-            query = query.filter(Split.id.in_(split_ids_with_categories))
-
-        # 日期区间过滤
-        if query_data.order_date_start:
-            query = query.filter(Split.order_date >=
-                                 query_data.order_date_start)
-        if query_data.order_date_end:
-            query = query.filter(Split.order_date <= query_data.order_date_end)
-        if query_data.completion_date_start:
-            query = query.filter(Split.completion_date >=
-                                 query_data.completion_date_start)
-        if query_data.completion_date_end:
-            query = query.filter(Split.completion_date <=
-                                 query_data.completion_date_end)
+        query = _apply_split_filters(db.query(Split), query_data)
 
         # 按下单日期降序排序，再按订单编号降序排序
         query = query.order_by(Split.order_date.desc(), Split.order_number.desc())
 
-        # 获取总数
-        total = query.count()
-
-        # 分页处理
-        if query_data.no_pagination:
+        next_cursor = None
+        if query_data.cursor_mode or query_data.cursor:
+            # 游标分页：默认不查询总数
+            total = query.order_by(None).count() if query_data.include_total else None
+            try:
+                splits, next_cursor = paginate_by_cursor(
+                    query, SPLIT_CURSOR_KEYS, query_data.cursor, query_data.page_size)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            page = query_data.page
+            page_size = query_data.page_size
+        elif query_data.no_pagination:
             # 不分页，获取所有数据
+            total = query.count()
             splits = query.all()
             page = 1
             page_size = total
             total_pages = 1
         else:
             # 分页
+            total = query.count()
             offset = (query_data.page - 1) * query_data.page_size
             splits = query.offset(offset).limit(query_data.page_size).all()
             page = query_data.page
             page_size = query_data.page_size
             total_pages = (total + page_size - 1) // page_size
 
+        # 批量查询本页拆单的进度记录（一次查询），再在内存中按拆单分组
+        progress_map = _load_split_progress_map(db, [split.id for split in splits])
+
         # 为每个拆单构建internal_production_items和external_purchase_items字段
         split_responses = []
         for split in splits:
-            # 查询该拆单的进度记录
-            progress_items = db.query(SplitProgress).filter(
-                SplitProgress.split_id == split.id
-            ).all()
-
-            # 构建厂内生产项字符串
-            internal_items = []
-            external_items = []
-
-            for item in progress_items:
-                if item.item_type == ItemType.INTERNAL:
-                    # 格式："类目:实际时间:拆单周期"
-                    if item.split_date:
-                        if isinstance(item.split_date, str):
-                            split_date = item.split_date
-                        else:
-                            split_date = item.split_date.strftime('%Y-%m-%d')
-                         # 动态计算拆单周期：split_date - order_date
-                        try:
-                            split_dt = datetime.strptime(split_date, '%Y-%m-%d')
-                            order_dt = datetime.strptime(split.order_date, '%Y-%m-%d')
-                            cycle_days = (split_dt - order_dt).days
-                        except ValueError:
-                            cycle_days = 0
-                    else:
-                        split_date = ''
-                        cycle_days = 0  # 没有split_date时为0
-                    item_str = f"{item.category_name}:{split_date}:{cycle_days}"
-                    internal_items.append(item_str)
-                elif item.item_type == ItemType.EXTERNAL:
-                    # 格式："类目:实际时间:拆单周期"
-                    if item.purchase_date:
-                        if isinstance(item.purchase_date, str):
-                            purchase_date = item.purchase_date
-                        else:
-                            purchase_date = item.purchase_date.strftime(
-                                '%Y-%m-%d')
-                        # 动态计算拆单周期：purchase_date - order_date
-                        try:
-                            purchase_dt = datetime.strptime(purchase_date, '%Y-%m-%d')
-                            order_dt = datetime.strptime(split.order_date, '%Y-%m-%d')
-                            cycle_days = (purchase_dt - order_dt).days
-                        except ValueError:
-                            cycle_days = 0
-                    else:
-                        purchase_date = ''
-                        cycle_days = 0  # 没有purchase_date时为0
-                    item_str = f"{item.category_name}:{purchase_date}:{cycle_days}"
-                    external_items.append(item_str)
+            internal_items, external_items = _build_split_progress_items(
+                split, progress_map.get(split.id, []))
             # 创建响应对象
             split_dict = {
                 "id": split.id,
@@ -315,7 +239,9 @@ async def get_splits(
             split_responses.append(split_dict)
 
         # 计算总页数
-        if query_data.no_pagination:
+        if total is None:
+            total_pages = None
+        elif query_data.no_pagination:
             total_pages = 1
         else:
             total_pages = math.ceil(
@@ -326,9 +252,12 @@ async def get_splits(
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -336,8 +265,54 @@ async def get_splits(
         )
 
 
+SPLIT_EXPORT_HEADERS = [
+    "订单编号", "客户名称", "地址", "下单日期", "设计师", "销售员", "订单金额", "柜体面积", "墙板面积",
+    "订单类型", "订单状态", "拆单员", "厂内生产项", "外购项", "报价状态", "实际打款日期", "完成日期", "备注",
+]
+
+
+def _iter_split_export_rows(query_data: SplitListQuery, bind) -> Iterator[list]:
+    """按批读取导出的拆单行；使用独立会话，生命周期与流式响应一致"""
+    with Session(bind=bind) as db:
+        query = _apply_split_filters(db.query(Split), query_data)
+        query = query.order_by(Split.order_date.desc(), Split.order_number.desc(), Split.id.desc())
+
+        for splits in iter_query_batches(query):
+            # 每批一次查询进度记录
+            progress_map = _load_split_progress_map(db, [split.id for split in splits])
+            rows = []
+            for split in splits:
+                internal_items, external_items = _build_split_progress_items(
+                    split, progress_map.get(split.id, []))
+                rows.append((
+                    split.order_number, split.customer_name, split.address, split.order_date,
+                    split.designer, split.salesperson, split.order_amount, split.cabinet_area,
+                    split.wall_panel_area, split.order_type, split.order_status, split.splitter,
+                    ",".join(internal_items), ",".join(external_items), split.quote_status,
+                    split.actual_payment_date, split.completion_date, split.remarks,
+                ))
+            yield rows
+
+
+@router.post("/export", summary="导出拆单列表")
+def export_splits(
+    query_data: SplitListQuery,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    按列表查询条件导出全部拆单（忽略分页参数），以 CSV 或 XLSX 流式返回
+    """
+    return stream_export(
+        SPLIT_EXPORT_HEADERS,
+        _iter_split_export_rows(query_data, db.get_bind()),
+        f"拆单列表_{today_str()}",
+        export_format
+    )
+
+
 @router.get("/{split_id}", response_model=SplitResponse, summary="获取拆单详情")
-async def get_split(
+def get_split(
     split_id: int,
     db: Session = Depends(get_db)
 ):
@@ -351,54 +326,10 @@ async def get_split(
             detail="拆单不存在"
         )
 
-    # 查询该拆单的进度记录
-    progress_items = db.query(SplitProgress).filter(
-        SplitProgress.split_id == split.id
-    ).all()
-
-    # 构建厂内生产项和外购项字符串
-    internal_items = []
-    external_items = []
-
-    for item in progress_items:
-        if item.item_type == ItemType.INTERNAL:
-            # 格式："类目:实际时间:拆单周期"
-            if item.split_date:
-                if isinstance(item.split_date, str):
-                    split_date = item.split_date
-                else:
-                    split_date = item.split_date.strftime('%Y-%m-%d')
-                # 动态计算拆单周期：split_date - order_date
-                try:
-                    split_dt = datetime.strptime(split_date, '%Y-%m-%d')
-                    order_dt = datetime.strptime(split.order_date, '%Y-%m-%d')
-                    cycle_days = (split_dt - order_dt).days
-                except ValueError:
-                    cycle_days = 0
-            else:
-                split_date = ''
-                cycle_days = 0  # 没有split_date时为0
-            item_str = f"{item.category_name}:{split_date}:{cycle_days}"
-            internal_items.append(item_str)
-        elif item.item_type == ItemType.EXTERNAL:
-            # 格式："类目:实际时间:拆单周期"
-            if item.purchase_date:
-                if isinstance(item.purchase_date, str):
-                    purchase_date = item.purchase_date
-                else:
-                    purchase_date = item.purchase_date.strftime('%Y-%m-%d')
-                # 动态计算拆单周期：purchase_date - order_date
-                try:
-                    purchase_dt = datetime.strptime(purchase_date, '%Y-%m-%d')
-                    order_dt = datetime.strptime(split.order_date, '%Y-%m-%d')
-                    cycle_days = (purchase_dt - order_dt).days
-                except ValueError:
-                    cycle_days = 0
-            else:
-                purchase_date = ''
-                cycle_days = 0  # 没有purchase_date时为0
-            item_str = f"{item.category_name}:{purchase_date}:{cycle_days}"
-            external_items.append(item_str)
+    # 查询该拆单的进度记录并构建厂内生产项和外购项字符串
+    progress_map = _load_split_progress_map(db, [split.id])
+    internal_items, external_items = _build_split_progress_items(
+        split, progress_map.get(split.id, []))
 
     # 创建响应对象
     split_dict = {
@@ -429,11 +360,11 @@ async def get_split(
 
 
 @router.put("/{split_id}", summary="编辑拆单")
-async def update_split(
+def update_split(
     split_id: int,
     split_data: SplitUpdate,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[UserInfo] = Depends(get_current_user)
 ):
     """
     编辑拆单信息
@@ -479,12 +410,11 @@ async def update_split(
                 item_type = item.get('item_type')
                 if not item_type:
                     # 查询类目表获取正确的类型
-                    category = db.query(Category).filter(
-                        Category.name == category_name).first()
-                    if category:
-                        if category.category_type == CategoryType.INTERNAL_PRODUCTION:
+                    category_type = get_category_type(db, category_name)
+                    if category_type is not None:
+                        if category_type == CategoryType.INTERNAL_PRODUCTION:
                             item_type = 'internal'
-                        elif category.category_type == CategoryType.EXTERNAL_PURCHASE:
+                        elif category_type == CategoryType.EXTERNAL_PURCHASE:
                             item_type = 'external'
                         else:
                             item_type = 'internal'  # 默认为厂内项
@@ -636,12 +566,14 @@ async def update_split(
         if 'splitter' in update_data and update_data['splitter'] and update_data['splitter'].strip():
             split.order_status = "拆单中"
 
+        refresh_split_counters(db, [split_id])
+
         split.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(split)
 
         # 返回更新后的拆单信息（包含从split_progress表构建的字段）
-        split_data = await get_split(split_id, db)
+        split_data = get_split(split_id, db)
         return success_response(
             data=split_data,
             message="拆单订单更新成功"
@@ -656,7 +588,7 @@ async def update_split(
 
 
 @router.put("/{split_id}/progress", response_model=SplitResponse, summary="更新拆单进度")
-async def update_split_progress(
+def update_split_progress(
     split_id: int,
     progress_data: SplitProgressUpdate,
     db: Session = Depends(get_db)
@@ -738,7 +670,7 @@ async def update_split_progress(
         db.refresh(split)
 
         # 获取完整的拆单信息
-        split_data = await get_split(split_id, db)
+        split_data = get_split(split_id, db)
         return success_response(
             data=split_data,
             message="拆单状态更新成功"
@@ -755,7 +687,7 @@ async def update_split_progress(
 
 
 @router.put("/{split_id}/status", summary="修改拆单状态")
-async def update_split_status(
+def update_split_status(
     split_id: int,
     status_data: SplitStatusUpdate,
     db: Session = Depends(get_db)
@@ -815,7 +747,7 @@ async def update_split_status(
         db.refresh(split)
 
         # 获取完整的拆单信息
-        split_data = await get_split(split_id, db)
+        split_data = get_split(split_id, db)
         return success_response(
             data=split_data,
             message="拆单状态更新成功"
@@ -829,8 +761,228 @@ async def update_split_status(
         )
 
 
+# 生产进度中默认添加的厂内类目
+DEFAULT_HARDWARE_CATEGORY = "五金"
+
+
+def _production_progress_values(production_id: int, order_number: str, item_type: ProductionItemType,
+                                category_name: str, order_date: Optional[str]) -> dict:
+    """新建生产进度记录的插入参数（各行字段一致，便于批量插入）"""
+    return {
+        "production_id": production_id,
+        "order_number": order_number,
+        "item_type": item_type,
+        "category_name": category_name,
+        "order_date": order_date,
+    }
+
+
+def _split_category_map(split_items: List[SplitProgress]) -> Dict[str, tuple]:
+    """拆单类目映射：{类目: (生产进度类型, 参考日期)}，厂内参考拆单日期，外购参考采购日期（允许为空）"""
+    category_map = {}
+    for item in split_items:
+        if item.item_type == ItemType.INTERNAL:
+            category_map[item.category_name] = (ProductionItemType.INTERNAL, item.split_date or None)
+        elif item.item_type == ItemType.EXTERNAL:
+            category_map[item.category_name] = (ProductionItemType.EXTERNAL, item.purchase_date or None)
+    return category_map
+
+
+def _new_production_values(split: Split, order: Order, category_map: Dict[str, tuple]) -> dict:
+    """根据拆单和订单构建新生产记录的插入参数"""
+    # 计算预计交货日期（实际打款日期往后推迟20天）和下单天数（拆单日期 - 打款日期）
+    customer_payment_date = split.actual_payment_date or getattr(order, 'customer_payment_date', None)
+    payment_date = parse_date(customer_payment_date)
+    expected_delivery_date = None
+    order_days = 0
+    if payment_date:
+        expected_delivery_date = (payment_date + timedelta(days=20)).strftime('%Y-%m-%d')
+        order_days = (today() - payment_date).days
+
+    return {
+        "order_id": order.id,
+        "order_number": split.order_number,
+        "customer_name": split.customer_name,
+        "address": order.address,
+        "splitter": split.splitter,
+        "is_installation": order.is_installation or False,
+        "customer_payment_date": customer_payment_date,
+        "split_order_date": split.completion_date or today_str(),
+        "internal_production_items": ','.join(
+            name for name, (item_type, _) in category_map.items() if item_type == ProductionItemType.INTERNAL),
+        "external_purchase_items": ','.join(
+            name for name, (item_type, _) in category_map.items() if item_type == ProductionItemType.EXTERNAL),
+        "order_days": order_days,
+        "expected_delivery_date": expected_delivery_date,
+        "board_18": "",
+        "board_09": "",
+        "order_status": "未齐料",
+        "remarks": split.remarks,
+        "designer": split.designer,  # 同步设计师字段
+    }
+
+
+def _sync_production_progress(db: Session, split: Split, production: Production,
+                              category_map: Dict[str, tuple], progresses: List[ProductionProgress]) -> List[dict]:
+    """
+    已有生产记录时，按拆单类目同步生产进度（在内存中修改，由调用方 flush）
+
+    Returns:
+        List[dict]: 需要新增的生产进度插入参数
+    """
+    progress_map: Dict[str, List[ProductionProgress]] = {}
+    for progress in progresses:
+        progress_map.setdefault(progress.category_name, []).append(progress)
+
+    # 删除不在拆单中的类目（保留“五金”默认项）
+    for category, entries in progress_map.items():
+        if category != DEFAULT_HARDWARE_CATEGORY and category not in category_map:
+            for entry in entries:
+                db.delete(entry)
+
+    new_rows = []
+    for category, (target_type, ref_date) in category_map.items():
+        if category not in progress_map:
+            new_rows.append(_production_progress_values(
+                production.id, split.order_number, target_type, category, ref_date))
+            continue
+
+        # 更新所有同类目的条目为目标类型，并清理无关字段
+        for entry in progress_map[category]:
+            if entry.item_type != target_type:
+                entry.item_type = target_type
+                if target_type == ProductionItemType.INTERNAL:
+                    # 切换为厂内时清理外采字段，厂内字段保留现值
+                    entry.expected_arrival_date = None
+                    entry.actual_arrival_date = None
+                else:
+                    # 切换为外采时清理厂内字段
+                    entry.expected_material_date = None
+                    entry.actual_storage_date = None
+                    entry.storage_time = None
+                    entry.quantity = None
+            # 补齐参考日期（仅在原为空时）
+            if not entry.order_date and ref_date:
+                entry.order_date = ref_date
+
+    # 保留并补齐默认“五金”类目
+    if DEFAULT_HARDWARE_CATEGORY not in progress_map and DEFAULT_HARDWARE_CATEGORY not in category_map:
+        new_rows.append(_production_progress_values(
+            production.id, split.order_number, ProductionItemType.INTERNAL, DEFAULT_HARDWARE_CATEGORY,
+            split.completion_date or today_str()))
+
+    # 同步生产单的类目字符串字段
+    production.internal_production_items = ','.join(
+        name for name, (item_type, _) in category_map.items() if item_type == ProductionItemType.INTERNAL)
+    production.external_purchase_items = ','.join(
+        name for name, (item_type, _) in category_map.items() if item_type == ProductionItemType.EXTERNAL)
+    return new_rows
+
+
+def _place_split_orders(db: Session, split_ids: List[int]) -> Dict[int, dict]:
+    """
+    拆单下单：拆单和关联订单改为已下单，没有生产记录时创建生产记录和生产进度，已有时同步生产进度
+
+    拆单（连同订单、生产记录）一次查询，拆单进度一次查询，已有生产记录时再一次查询其生产进度；
+    新建的生产记录和生产进度批量插入，其余修改在内存中完成，由 flush 合并为批量 UPDATE/DELETE。
+    在调用方的事务内执行，由调用方提交。
+
+    Returns:
+        Dict[int, dict]: {拆单ID: 下单结果}，失败的拆单结果中包含 error
+    """
+    split_ids = list(dict.fromkeys(split_ids))
+    loaded = {}
+    for chunk in chunked(split_ids):
+        rows = db.query(Split, Order, Production).outerjoin(
+            Order, Order.order_number == Split.order_number
+        ).outerjoin(
+            Production, Production.order_number == Split.order_number
+        ).filter(Split.id.in_(chunk)).all()
+        loaded.update((split.id, (split, order, production)) for split, order, production in rows)
+
+    results: Dict[int, dict] = {}
+    placing = []
+    placing_orders = set()
+    for split_id in split_ids:
+        if split_id not in loaded:
+            results[split_id] = {"split_id": split_id, "error": "拆单不存在"}
+            continue
+        split, order, production = loaded[split_id]
+        if split.order_number in placing_orders:
+            # 同一订单的生产记录只能由一个拆单创建/同步
+            results[split_id] = {"split_id": split_id, "order_number": split.order_number,
+                                 "error": "同一订单的拆单重复下单"}
+            continue
+        placing_orders.add(split.order_number)
+        placing.append((split, order, production))
+
+    if not placing:
+        return results
+
+    split_progress_map = _load_split_progress_map(db, [split.id for split, _, _ in placing])
+    existing_progress_map: Dict[int, List[ProductionProgress]] = {}
+    for chunk in chunked([production.id for _, _, production in placing if production]):
+        for progress in db.query(ProductionProgress).filter(
+            ProductionProgress.production_id.in_(chunk)
+        ).order_by(ProductionProgress.id):
+            existing_progress_map.setdefault(progress.production_id, []).append(progress)
+
+    completion_date = today_str()
+    progress_rows = []
+    new_productions = []
+    production_ids = []
+    for split, order, production in placing:
+        # 更新拆单状态和完成时间，以及关联的订单状态
+        split.order_status = "已下单"
+        split.completion_date = completion_date
+        if order:
+            order.order_status = "已下单"
+
+        category_map = _split_category_map(split_progress_map.get(split.id, []))
+        if production:
+            progress_rows.extend(_sync_production_progress(
+                db, split, production, category_map, existing_progress_map.get(production.id, [])))
+            production_ids.append(production.id)
+        elif order:
+            new_productions.append((split, category_map, _new_production_values(split, order, category_map)))
+
+        results[split.id] = {
+            "split_id": split.id,
+            "order_number": split.order_number,
+            "order_status": split.order_status,
+            "completion_date": split.completion_date,
+            "production_created": production is None and order is not None
+        }
+
+    if new_productions:
+        # render_nulls：空值也写入语句，各行参数一致才能合并为一次 executemany
+        db.execute(insert(Production).execution_options(render_nulls=True),
+                   [values for _, _, values in new_productions])
+        created_ids = {}
+        for chunk in chunked([split.order_number for split, _, _ in new_productions]):
+            created_ids.update(db.query(Production.order_number, Production.id).filter(
+                Production.order_number.in_(chunk)).all())
+
+        for split, category_map, _ in new_productions:
+            production_id = created_ids[split.order_number]
+            production_ids.append(production_id)
+            # 下单日期取拆单参考日期（允许为空，供页面录入）
+            for category, (item_type, ref_date) in category_map.items():
+                progress_rows.append(_production_progress_values(
+                    production_id, split.order_number, item_type, category, ref_date))
+            # 默认为厂内生产添加五金类目
+            progress_rows.append(_production_progress_values(
+                production_id, split.order_number, ProductionItemType.INTERNAL, DEFAULT_HARDWARE_CATEGORY,
+                split.completion_date))
+
+    if progress_rows:
+        db.execute(insert(ProductionProgress).execution_options(render_nulls=True), progress_rows)
+    refresh_production_counters(db, production_ids)
+    return results
+
+
 @router.put("/{split_id}/place-order", summary="拆单下单")
-async def place_split_order(
+def place_split_order(
     split_id: int,
     db: Session = Depends(get_db)
 ):
@@ -840,270 +992,53 @@ async def place_split_order(
     根据订单编号修改订单状态为下单
     """
     try:
-        split = db.query(Split).filter(Split.id == split_id).first()
-        if not split:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="拆单不存在"
-            )
+        result = _place_split_orders(db, [split_id])[split_id]
+        if "error" in result:
+            db.rollback()
+            return error_response(message=result["error"], code=404)
 
-        # 更新拆单状态
-        split.order_status = "已下单"
-        # 设置完成时间
-        split.completion_date = datetime.now().strftime('%Y-%m-%d')
+        db.commit()
+        return success_response(
+            data=result,
+            message="拆单下单成功，生产管理订单已创建"
+        )
 
-        # 更新关联的订单状态
-        order = db.query(Order).filter(
-            Order.order_number == split.order_number).first()
-        if order:
-            order.order_status = "已下单"
+    except Exception as e:
+        db.rollback()
+        return error_response(
+            message=f"拆单下单失败: {str(e)}",
+            code=500
+        )
 
-        # 检查是否已存在生产记录，如果不存在则创建
-        existing_production = db.query(Production).filter(
-            Production.order_number == split.order_number
-        ).first()
-
-        # 获取拆单进度项（无论是否存在生产记录都需要）
-        split_progress_items = db.query(SplitProgress).filter(
-            SplitProgress.split_id == split.id
-        ).all()
-
-        if not existing_production and order:
-            # 计算预计交货日期（实际打款日期往后推迟20天）
-            expected_delivery_date = None
-            payment_date = None
-            if split.actual_payment_date:
-                if isinstance(split.actual_payment_date, str):
-                    payment_date = datetime.strptime(split.actual_payment_date, '%Y-%m-%d')
-                else:
-                    payment_date = split.actual_payment_date
-            elif hasattr(order, 'customer_payment_date') and order.customer_payment_date:
-                if isinstance(order.customer_payment_date, str):
-                    payment_date = datetime.strptime(order.customer_payment_date, '%Y-%m-%d')
-                else:
-                    payment_date = order.customer_payment_date
-            
-            if payment_date:
-                from datetime import timedelta
-                expected_delivery_date = (payment_date + timedelta(days=20)).strftime('%Y-%m-%d')
-            
-            # 计算下单天数（拆单日期 - 打款日期）
-            order_days = 0
-            if payment_date:
-                split_order_date = datetime.now()
-                order_days = (split_order_date - payment_date).days
-            
-            # 拆单进度项已在上面获取
-            
-            # 构建生产项字符串
-            internal_items = []
-            external_items = []
-            for item in split_progress_items:
-                if item.item_type == ItemType.INTERNAL:
-                    internal_items.append(item.category_name)
-                elif item.item_type == ItemType.EXTERNAL:
-                    external_items.append(item.category_name)
-            
-            internal_production_items = ','.join(internal_items)
-            external_purchase_items = ','.join(external_items)
-            
-            # 创建生产记录
-            production = Production(
-                order_id=order.id,
-                order_number=split.order_number,
-                customer_name=split.customer_name,
-                address=getattr(order, 'address', ''),
-                splitter=split.splitter,
-                is_installation=getattr(order, 'is_installation', False),
-                customer_payment_date=split.actual_payment_date if split.actual_payment_date else getattr(order, 'customer_payment_date', None),
-                split_order_date=split.completion_date if split.completion_date else datetime.now().strftime('%Y-%m-%d'),
-                internal_production_items=internal_production_items,
-                external_purchase_items=external_purchase_items,
-                order_days=order_days,
-                expected_delivery_date=expected_delivery_date,
-                board_18="",
-                board_09="",
-                order_status="未齐料",
-                actual_delivery_date=None,
-                cutting_date=None,
-                expected_shipping_date=None,
-                remarks=getattr(split, 'remarks', ''),
-                designer=split.designer  # 同步设计师字段
-            )
-            db.add(production)
-            db.flush()  # 获取生产记录ID
-            
-            # 创建生产进度记录
-            # 处理厂内生产项（下单日期允许为空，供页面录入）
-            for item in split_progress_items:
-                if item.item_type == ItemType.INTERNAL:
-                    split_date = item.split_date if item.split_date else None
-                    
-                    progress_item = ProductionProgress(
-                         production_id=production.id,
-                         order_number=split.order_number,
-                         item_type=ProductionItemType.INTERNAL,
-                         category_name=item.category_name,
-                         order_date=split_date,
-                         expected_material_date=None,
-                         actual_storage_date=None,
-                         storage_time=None,
-                         quantity=None
-                     )
-                    db.add(progress_item)
-                elif item.item_type == ItemType.EXTERNAL:
-                    purchase_date = item.purchase_date if item.purchase_date else None
-                    
-                    progress_item = ProductionProgress(
-                         production_id=production.id,
-                         order_number=split.order_number,
-                         item_type=ProductionItemType.EXTERNAL,
-                         category_name=item.category_name,
-                         order_date=purchase_date,
-                         expected_arrival_date=None,
-                         actual_arrival_date=None
-                     )
-                    db.add(progress_item)
-            
-            # 默认为厂内生产添加五金类目
-            default_date = split.completion_date if split.completion_date else datetime.now().strftime('%Y-%m-%d')
-            hardware_progress_item = ProductionProgress(
-                production_id=production.id,
-                order_number=split.order_number,
-                item_type=ProductionItemType.INTERNAL,
-                category_name="五金",
-                order_date=default_date,
-                expected_material_date=None,
-                actual_storage_date=None,
-                storage_time=None,
-                quantity=None
-            )
-            db.add(hardware_progress_item)
-        
-        # 如果生产记录已存在，需要同步生产进度记录与类目类型
-        elif existing_production:
-            # 1) 构建当前拆单类目映射：{category_name: (目标类型, 参考日期)}
-            split_map = {}
-            internal_items = []
-            external_items = []
-            for item in split_progress_items:
-                if item.item_type == ItemType.INTERNAL:
-                    # 厂内生产参考拆单日期（允许为空）
-                    ref_date = item.split_date if item.split_date else None
-                    split_map[item.category_name] = (ProductionItemType.INTERNAL, ref_date)
-                    internal_items.append(item.category_name)
-                elif item.item_type == ItemType.EXTERNAL:
-                    # 外采参考采购日期
-                    ref_date = item.purchase_date if item.purchase_date else None
-                    split_map[item.category_name] = (ProductionItemType.EXTERNAL, ref_date)
-                    external_items.append(item.category_name)
-
-            # 2) 读取现有生产进度，按类目分组
-            existing_progresses = db.query(ProductionProgress).filter(
-                ProductionProgress.production_id == existing_production.id
-            ).all()
-            progress_map = {}
-            for p in existing_progresses:
-                progress_map.setdefault(p.category_name, []).append(p)
-
-            # 3) 删除不在拆单中的类目（保留“五金”默认项）
-            for category, entries in list(progress_map.items()):
-                if category == "五金":
-                    continue
-                if category not in split_map:
-                    for entry in entries:
-                        db.delete(entry)
-                    del progress_map[category]
-
-            # 4) 更新或新增拆单中的类目到生产进度
-            for category, (target_type, ref_date) in split_map.items():
-                if category in progress_map:
-                    # 更新所有同类目的条目为目标类型，并清理无关字段
-                    for entry in progress_map[category]:
-                        if entry.item_type != target_type:
-                            entry.item_type = target_type
-                            # 切换为厂内时清理外采字段
-                            if target_type == ProductionItemType.INTERNAL:
-                                entry.expected_arrival_date = None
-                                entry.actual_arrival_date = None
-                                # 厂内字段保留现值，不强制覆盖
-                            else:
-                                # 切换为外采时清理厂内字段
-                                entry.expected_material_date = None
-                                entry.actual_storage_date = None
-                                entry.storage_time = None
-                                entry.quantity = None
-                        # 补齐参考日期（仅在原为空时）
-                        if not entry.order_date and ref_date:
-                            entry.order_date = ref_date
-                else:
-                    # 新增生产进度记录
-                    if target_type == ProductionItemType.INTERNAL:
-                        progress_item = ProductionProgress(
-                            production_id=existing_production.id,
-                            order_number=split.order_number,
-                            item_type=ProductionItemType.INTERNAL,
-                            category_name=category,
-                            order_date=ref_date,
-                            expected_material_date=None,
-                            actual_storage_date=None,
-                            storage_time=None,
-                            quantity=None
-                        )
-                    else:
-                        progress_item = ProductionProgress(
-                            production_id=existing_production.id,
-                            order_number=split.order_number,
-                            item_type=ProductionItemType.EXTERNAL,
-                            category_name=category,
-                            order_date=ref_date,
-                            expected_arrival_date=None,
-                            actual_arrival_date=None
-                        )
-                    db.add(progress_item)
-                    progress_map.setdefault(category, []).append(progress_item)
-
-            # 5) 保留并补齐默认“五金”类目
-            existing_hardware = db.query(ProductionProgress).filter(
-                ProductionProgress.production_id == existing_production.id,
-                ProductionProgress.category_name == "五金"
-            ).first()
-            if not existing_hardware:
-                default_date = split.completion_date if split.completion_date else datetime.now().strftime('%Y-%m-%d')
-                hardware_progress_item = ProductionProgress(
-                    production_id=existing_production.id,
-                    order_number=split.order_number,
-                    item_type=ProductionItemType.INTERNAL,
-                    category_name="五金",
-                    order_date=default_date,
-                    expected_material_date=None,
-                    actual_storage_date=None,
-                    storage_time=None,
-                    quantity=None
-                )
-                db.add(hardware_progress_item)
-
-            # 6) 同步生产单的类目字符串字段
-            existing_production.internal_production_items = ','.join(internal_items)
-            existing_production.external_purchase_items = ','.join(external_items)
 
+@router.post("/place-orders", summary="拆单批量下单")
+def place_split_orders(
+    request: SplitPlaceOrdersRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    拆单批量下单
+
+    在同一事务中下单多个拆单，返回每个拆单的下单结果；不存在或重复的拆单单独标记失败，不影响其他拆单
+    """
+    try:
+        results = _place_split_orders(db, request.split_ids)
         db.commit()
-        db.refresh(split)
 
+        items = [results[split_id] for split_id in dict.fromkeys(request.split_ids)]
+        failed = sum(1 for item in items if "error" in item)
         return success_response(
             data={
-                "split_id": split.id,
-                "order_number": split.order_number,
-                "order_status": split.order_status,
-                "completion_date": split.completion_date,
-                "production_created": not existing_production
+                "results": items,
+                "placed": len(items) - failed,
+                "failed": failed
             },
-            message="拆单下单成功，生产管理订单已创建"
+            message=f"拆单批量下单完成，成功{len(items) - failed}条，失败{failed}条"
         )
 
     except Exception as e:
         db.rollback()
         return error_response(
-            message=f"拆单下单失败: {str(e)}",
+            message=f"拆单批量下单失败: {str(e)}",
             code=500
         )
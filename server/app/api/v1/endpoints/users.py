@@ -11,6 +11,7 @@ from app.schemas.user import (
     DeleteUserResponse
 )
 from app.utils.auth import hash_password
+from app.utils.cache import invalidate_users
 
 # 设置日志
 logger = logging.getLogger(__name__)
@@ -19,7 +20,7 @@ router = APIRouter()
 
 
 @router.post("/", response_model=dict)
-async def create_user(
+def create_user(
     user_create: UserCreate,
     db: Session = Depends(get_db)
 ):
@@ -70,6 +71,7 @@ async def create_user(
         db.add(new_user)
         logger.info(f"准备提交事务")
         db.commit()
+        invalidate_users(new_user.username)
         logger.info(f"事务提交成功，准备刷新用户对象")
         db.refresh(new_user)
         logger.info(f"用户创建成功: id={new_user.id}, username={new_user.username}")
@@ -108,7 +110,7 @@ async def create_user(
 
 
 @router.put("/{username}/reset-password", response_model=dict)
-async def reset_password(
+def reset_password(
     username: str,
     db: Session = Depends(get_db)
 ):
@@ -154,7 +156,7 @@ async def reset_password(
 
 
 @router.delete("/{username}", response_model=dict)
-async def delete_user(
+def delete_user(
     username: str,
     db: Session = Depends(get_db)
 ):
@@ -191,6 +193,7 @@ async def delete_user(
         # 真删除用户
         db.delete(user)
         db.commit()
+        invalidate_users(username)
         
         return {
             "code": 200,
@@ -209,7 +212,7 @@ async def delete_user(
 
 
 @router.get("/", response_model=dict)
-async def get_users(
+def get_users(
     db: Session = Depends(get_db)
 ):
     """
@@ -18,7 +18,7 @@ router = APIRouter()
 
 
 @router.post("/", summary="新增进度")
-async def create_progress(
+def create_progress(
     progress_data: ProgressCreate,
     db: Session = Depends(get_db)
 ):
@@ -68,7 +68,7 @@ async def create_progress(
 
 
 @router.post("/list", summary="获取进度列表")
-async def get_progress_list(
+def get_progress_list(
     request_data: dict,
     db: Session = Depends(get_db)
 ):
@@ -131,7 +131,7 @@ async def get_progress_list(
 
 
 @router.put("/{progress_id}", summary="编辑进度")
-async def update_progress(
+def update_progress(
     progress_id: int,
     progress_data: ProgressUpdate,
     db: Session = Depends(get_db)
@@ -181,7 +181,7 @@ async def update_progress(
 
 
 @router.get("/{progress_id}", summary="获取进度详情")
-async def get_progress(
+def get_progress(
     progress_id: int,
     db: Session = Depends(get_db)
 ):
@@ -209,7 +209,7 @@ async def get_progress(
         return error_response(message=f"获取进度详情失败: {str(e)}")
 
 @router.delete("/{progress_id}", summary="删除进度")
-async def delete_progress(
+def delete_progress(
     progress_id: int,
     db: Session = Depends(get_db)
 ):
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Literal, Union
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 import os
@@ -30,6 +30,24 @@ class Settings(BaseSettings):
     DATABASE_NAME: str = "order_system"
     DATABASE_USER: str = "root"
     DATABASE_PASSWORD: str = ""
+    # 数据库连接池配置
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # SQLite 连接参数方案（见 app/core/database.py 的 SQLITE_PROFILES）：
+    # default 为不做调优的原配置；production 为 WAL + synchronous=NORMAL；durable 为 WAL + synchronous=FULL
+    SQLITE_PROFILE: str = "production"
+    
+    # 接口执行方式：数据库相关接口为同步函数，由线程池执行，避免阻塞事件循环
+    # threadpool：最多 THREADPOOL_SIZE 个请求并发执行，线程数应与数据库连接池容量（DB_POOL_SIZE + DB_MAX_OVERFLOW）相匹配
+    # serial：同一时间只执行一个数据库接口，与改造前在事件循环中逐个执行的行为一致，用于排查并发问题
+    EXECUTION_MODE: Literal["threadpool", "serial"] = "threadpool"
+    THREADPOOL_SIZE: int = 40
+    
+    # 小程序订单详情快照的ETag在进程内缓存的秒数（多进程部署时其他进程的缓存靠过期失效）
+    ORDER_TIMELINE_ETAG_TTL: int = 60
+    
+    # 类目、用户查询结果在进程内缓存的秒数（写接口会主动失效，多进程部署时其他进程的缓存靠过期失效）
+    LOOKUP_CACHE_TTL: int = 300
     
     # CORS配置
     BACKEND_CORS_ORIGINS: str = os.getenv("BACKEND_CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000,http://localhost:3001,http://127.0.0.1:3001,http://localhost:8080,http://127.0.0.1:8080")
@@ -37,6 +55,10 @@ class Settings(BaseSettings):
     def get_cors_origins(self) -> List[str]:
         """获取CORS源列表"""
         return [origin.strip() for origin in self.BACKEND_CORS_ORIGINS.split(",")]
+
+    def get_worker_threads(self) -> int:
+        """同步接口可同时执行的线程数"""
+        return self.THREADPOOL_SIZE if self.EXECUTION_MODE == "threadpool" else 1
     
     # JWT配置
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
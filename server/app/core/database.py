@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import StaticPool
+from typing import Dict, Generator, Optional
 import logging
 from datetime import datetime
 
@@ -9,21 +11,105 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# SQLite 每个连接建立时执行的 PRAGMA
+# - journal_mode=WAL：读写互不阻塞，多个线程可同时读
+# - synchronous=NORMAL：WAL 下只在检查点时同步写盘，断电最多丢失最近提交的事务，不会损坏数据库
+# - busy_timeout：写锁被占用时等待而不是立即报 database is locked
+# - cache_size（负数为 KB）和 mmap_size 按每个连接计算，连接池中每个连接都会占用
+SQLITE_PROFILES: Dict[str, Dict[str, object]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 134217728,
+        "temp_store": "MEMORY",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 134217728,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def _apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, object]):
+    """在每个新连接上执行 PRAGMA"""
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(database_url: Optional[str] = None, sqlite_profile: Optional[str] = None) -> Engine:
+    """
+    按数据库类型创建引擎
+
+    - SQLite 文件库：使用连接池（同进程内可并发读），连接时按 SQLITE_PROFILE 执行 PRAGMA；
+      pool_pre_ping / pool_recycle 对本地文件没有意义，不启用
+    - SQLite 内存库：所有会话共用一个连接（StaticPool），否则每个连接都是一个新的空库
+    - 其他数据库（PostgreSQL 等）：连接池 + 断线检测 + 定期回收连接
+    """
+    database_url = database_url or settings.DATABASE_URL
+    url = make_url(database_url)
+
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            database_url,
+            pool_pre_ping=True,
+            pool_recycle=300,  # 连接回收时间
+            pool_size=settings.DB_POOL_SIZE,        # 连接池大小
+            max_overflow=settings.DB_MAX_OVERFLOW,  # 最大溢出连接数
+            echo=settings.DEBUG  # 开发环境下打印SQL语句
+        )
+
+    profile_name = sqlite_profile or settings.SQLITE_PROFILE
+    if profile_name not in SQLITE_PROFILES:
+        raise ValueError(f"未知的 SQLite 配置方案: {profile_name}，可选: {', '.join(SQLITE_PROFILES)}")
+
+    if url.database in (None, "", ":memory:"):
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=settings.DEBUG
+        )
+        # 内存库不支持 WAL
+        pragmas = {name: value for name, value in SQLITE_PROFILES[profile_name].items() if name != "journal_mode"}
+    else:
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            echo=settings.DEBUG
+        )
+        pragmas = SQLITE_PROFILES[profile_name]
+
+    if pragmas:
+        _apply_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
 # 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    # SQLite特定配置
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    # 连接池配置（PostgreSQL等）
-    pool_pre_ping=True,
-    pool_recycle=300,  # 连接回收时间
-    pool_size=10,      # 连接池大小
-    max_overflow=20,   # 最大溢出连接数
-    echo=settings.DEBUG  # 开发环境下打印SQL语句
-)
+engine = create_db_engine()
+
+class AppSession(Session):
+    """应用会话：订单快照失效等会话事件只注册在此类上，脚本、导出等自建的普通 Session 不受影响"""
+
 
 # 创建会话工厂
 SessionLocal = sessionmaker(
+    class_=AppSession,
     autocommit=False,
     autoflush=False,
     bind=engine
@@ -10,6 +10,10 @@ from .split_progress import SplitProgress, ItemType
 # from .design import Design
 from .production import Production
 from .production_progress import ProductionProgress, ItemType as ProductionItemType
+from .order_timeline import OrderTimeline
+
+# 注册订单时间线快照的失效监听
+from app.utils import order_timeline  # noqa: E402,F401
 
 # 导出Base供其他模块使用
 __all__ = ["Base"]
\ No newline at end of file
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, Index
 from sqlalchemy.types import Numeric
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from .base import Base
+from .types import IsoDate
 
 
 
@@ -19,6 +20,9 @@ class DesignCycle(enum.Enum):
 class Order(Base):
     """订单模型"""
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_status_assignment_date", "order_status", "assignment_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), unique=True, index=True, nullable=False, comment="订单编号")
@@ -26,8 +30,8 @@ class Order(Base):
     address = Column(Text, nullable=False, comment="地址")
     designer = Column(String(50), nullable=True, comment="设计师")
     salesperson = Column(String(50), nullable=True, comment="销售员")
-    assignment_date = Column(String(50), nullable=False, comment="分单日期")
-    order_date = Column(String(50), nullable=True, comment="下单日期")
+    assignment_date = Column(IsoDate, nullable=False, comment="分单日期")
+    order_date = Column(IsoDate, nullable=True, comment="下单日期")
     
     # 类目名称
     category_name = Column(String(100), nullable=False, comment="类目名称")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from .base import Base
+from .types import IsoDate
+
+
+class OrderTimeline(Base):
+    """订单时间线快照模型（小程序订单详情的预计算结果）"""
+    __tablename__ = "order_timelines"
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_number = Column(String(50), nullable=False, unique=True, index=True, comment="订单编号")
+    payload = Column(JSON, nullable=False, comment="订单详情快照")
+    etag = Column(String(64), nullable=False, comment="快照内容摘要")
+    snapshot_date = Column(IsoDate, nullable=False, comment="快照生成日期（设计周期、下单天数按该日期计算）")
+
+    created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
+
+    def __repr__(self):
+        return f"<OrderTimeline(order_number='{self.order_number}', etag='{self.etag}')>"
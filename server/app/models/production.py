@@ -1,12 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
+from .types import IsoDate
 
 
 class Production(Base):
     """生产管理模型"""
     __tablename__ = "productions"
+    __table_args__ = (
+        Index("ix_productions_status_shipping_date", "order_status", "expected_shipping_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey('orders.id'), nullable=False, comment="关联订单ID")
@@ -17,24 +21,29 @@ class Production(Base):
     address = Column(String(200), nullable=True, comment="地址")
     splitter = Column(String(50), nullable=True, comment="拆单员")
     is_installation = Column(Boolean, default=False, comment="是否安装")
-    customer_payment_date = Column(String(50), nullable=True, comment="客户打款日期")
-    split_order_date = Column(String(50), nullable=True, comment="拆单下单日期")
+    customer_payment_date = Column(IsoDate, nullable=True, comment="客户打款日期")
+    split_order_date = Column(IsoDate, nullable=True, comment="拆单下单日期")
     internal_production_items = Column(Text, nullable=True, comment="厂内生产项")
     external_purchase_items = Column(Text, nullable=True, comment="外购项")
     
     # 新增字段
     order_days = Column(String(20), nullable=True, comment="下单天数")
-    expected_delivery_date = Column(String(50), nullable=True, comment="预计交货日期")
+    expected_delivery_date = Column(IsoDate, nullable=True, comment="预计交货日期")
     board_18 = Column(String(50), nullable=True, comment="18板")
     board_09 = Column(String(50), nullable=True, comment="09板")
     order_status = Column(String(20), default="未齐料", comment="订单状态")
-    actual_delivery_date = Column(String(50), nullable=True, comment="实际出货日期")
-    cutting_date = Column(String(50), nullable=True, comment="下料日期")
-    expected_shipping_date = Column(String(50), nullable=True, comment="预计出货日期")
+    actual_delivery_date = Column(IsoDate, nullable=True, comment="实际出货日期")
+    cutting_date = Column(IsoDate, nullable=True, comment="下料日期")
+    expected_shipping_date = Column(IsoDate, nullable=True, comment="预计出货日期")
     remarks = Column(Text, nullable=True, comment="备注")
     special_notes = Column(Text, nullable=True, comment="特殊情况")
     designer = Column(String(50), nullable=True, comment="设计师")
     
+    # 进度完成情况计数（随进度写入同步维护，见 app/utils/completion.py）
+    total_items = Column(Integer, nullable=False, default=0, server_default="0", comment="进度项总数")
+    completed_internal_items = Column(Integer, nullable=False, default=0, server_default="0", comment="已完成厂内项数量")
+    completed_external_items = Column(Integer, nullable=False, default=0, server_default="0", comment="已完成外购项数量")
+    
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
     
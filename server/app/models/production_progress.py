@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
+from .types import IsoDate
 import enum
 
 
@@ -14,6 +15,9 @@ class ItemType(enum.Enum):
 class ProductionProgress(Base):
     """生产进度管理模型"""
     __tablename__ = "production_progress"
+    __table_args__ = (
+        Index("ix_production_progress_category_type", "category_name", "item_type", "production_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     production_id = Column(Integer, ForeignKey("productions.id"), nullable=False, index=True, comment="生产管理ID")
@@ -24,17 +28,17 @@ class ProductionProgress(Base):
     category_name = Column(String(100), nullable=False, comment="类目名称")
     
     # 共同字段
-    order_date = Column(String(50), nullable=True, comment="下单日期（实际拆单日期）")
+    order_date = Column(IsoDate, nullable=True, comment="下单日期（实际拆单日期）")
     
     # 厂内生产项字段
-    expected_material_date = Column(String(50), nullable=True, comment="预计齐料日期")
-    actual_storage_date = Column(String(50), nullable=True, comment="实际入库日期")
+    expected_material_date = Column(IsoDate, nullable=True, comment="预计齐料日期")
+    actual_storage_date = Column(IsoDate, nullable=True, comment="实际入库日期")
     storage_time = Column(String(50), nullable=True, comment="入库时间")
     quantity = Column(String(20), nullable=True, comment="件数")
     
     # 外购项字段
-    expected_arrival_date = Column(String(50), nullable=True, comment="预计到厂日期")
-    actual_arrival_date = Column(String(50), nullable=True, comment="实际到厂日期")
+    expected_arrival_date = Column(IsoDate, nullable=True, comment="预计到厂日期")
+    actual_arrival_date = Column(IsoDate, nullable=True, comment="实际到厂日期")
     
     # 时间戳
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
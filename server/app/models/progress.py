@@ -1,12 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
+from .types import IsoDate
 
 
 class Progress(Base):
     """订单进度模型"""
     __tablename__ = "progresses"
+    __table_args__ = (
+        Index("ix_progresses_order_planned_date", "order_id", "planned_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -15,8 +19,8 @@ class Progress(Base):
     order = relationship("Order", back_populates="progresses")
     
     task_item = Column(String(200), nullable=False, comment="进行事项")
-    planned_date = Column(String(20), nullable=False, comment="计划日期")
-    actual_date = Column(String(20), nullable=True, comment="实际日期")
+    planned_date = Column(IsoDate, nullable=False, comment="计划日期")
+    actual_date = Column(IsoDate, nullable=True, comment="实际日期")
     remarks = Column(Text, nullable=True, comment="备注")
     
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Index
 from sqlalchemy.types import Numeric
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
+from .types import IsoDate
 
 
 class Split(Base):
     """拆单管理模型"""
     __tablename__ = "splits"
+    __table_args__ = (
+        Index("ix_splits_status_order_date", "order_status", "order_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), ForeignKey("orders.order_number"), nullable=False, index=True, comment="订单编号")
@@ -15,7 +19,7 @@ class Split(Base):
     # 基本信息（从订单复制）
     customer_name = Column(String(100), nullable=False, comment="客户名称")
     address = Column(Text, nullable=False, comment="地址")
-    order_date = Column(String(50), nullable=True, comment="下单日期")
+    order_date = Column(IsoDate, nullable=True, comment="下单日期")
     designer = Column(String(50), nullable=True, comment="设计师")
     salesperson = Column(String(50), nullable=True, comment="销售员")
     order_amount = Column(Numeric(12, 2), nullable=True, comment="订单金额")
@@ -27,10 +31,15 @@ class Split(Base):
     # 拆单特有字段
     splitter = Column(String(50), nullable=True, comment="拆单员")
     quote_status = Column(String(20), default="未打款", comment="报价状态")
-    actual_payment_date = Column(String(50), nullable=True, comment="实际打款日期")
-    completion_date = Column(String(50), nullable=True, comment="完成日期")
+    actual_payment_date = Column(IsoDate, nullable=True, comment="实际打款日期")
+    completion_date = Column(IsoDate, nullable=True, comment="完成日期")
     remarks = Column(Text, nullable=True, comment="备注")
     
+    # 进度完成情况计数（随进度写入同步维护，见 app/utils/completion.py）
+    total_items = Column(Integer, nullable=False, default=0, server_default="0", comment="进度项总数")
+    completed_internal_items = Column(Integer, nullable=False, default=0, server_default="0", comment="已完成厂内项数量")
+    completed_external_items = Column(Integer, nullable=False, default=0, server_default="0", comment="已完成外购项数量")
+    
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
     
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
+from .types import IsoDate
 import enum
 
 
@@ -14,6 +15,9 @@ class ItemType(enum.Enum):
 class SplitProgress(Base):
     """拆单进度管理模型"""
     __tablename__ = "split_progress"
+    __table_args__ = (
+        Index("ix_split_progress_category_type", "category_name", "item_type", "split_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     split_id = Column(Integer, ForeignKey("splits.id"), nullable=False, index=True, comment="拆单ID")
@@ -22,9 +26,9 @@ class SplitProgress(Base):
     # 进度信息
     item_type = Column(SQLEnum(ItemType), nullable=False, comment="项目类型")
     category_name = Column(String(100), nullable=False, comment="类目名称")
-    planned_date = Column(String(50), nullable=True, comment="计划日期")
-    split_date = Column(String(50), nullable=True, comment="拆单日期（厂内项）")
-    purchase_date = Column(String(50), nullable=True, comment="采购日期（外购项）")
+    planned_date = Column(IsoDate, nullable=True, comment="计划日期")
+    split_date = Column(IsoDate, nullable=True, comment="拆单日期（厂内项）")
+    purchase_date = Column(IsoDate, nullable=True, comment="采购日期（外购项）")
     cycle_days = Column(String(20), nullable=True, comment="周期天数")
     status = Column(String(20), default="待处理", comment="状态")
     remarks = Column(Text, nullable=True, comment="备注")
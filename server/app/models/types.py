@@ -0,0 +1,33 @@
+from datetime import date
+
+from sqlalchemy import Date
+from sqlalchemy.types import TypeDecorator
+
+from app.utils.dates import parse_iso_date
+
+
+class IsoDate(TypeDecorator):
+    """
+    日期列类型
+
+    数据库中使用原生 DATE 类型存储（可走索引、按日期比较和排序），
+    Python 侧仍以 'YYYY-MM-DD' 字符串读写，与现有接口和 schema 保持兼容
+    """
+
+    impl = Date
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return parse_iso_date(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, date):
+            return value.isoformat()
+        # 尚未迁移为 DATE 类型的列会返回字符串，尽量规范化
+        try:
+            parsed = parse_iso_date(value)
+        except ValueError:
+            return value
+        return parsed.isoformat() if parsed else None
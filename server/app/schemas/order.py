@@ -5,6 +5,7 @@ from decimal import Decimal
 
 # from app.schemas.category import CategoryResponse  # 不再需要
 from app.schemas.progress import ProgressResponse
+from app.schemas.types import IsoDateStr
 from app.utils.scheduler import calculate_design_cycle_days
 
 
@@ -28,7 +29,8 @@ class OrderBase(BaseModel):
 
 class OrderCreate(OrderBase):
     """创建订单模型"""
-    pass
+    assignment_date: IsoDateStr = Field(..., description="分单日期")
+    order_date: Optional[IsoDateStr] = Field(None, description="下单日期")
 
 
 class OrderUpdate(BaseModel):
@@ -38,8 +40,8 @@ class OrderUpdate(BaseModel):
     address: Optional[str] = Field(None, description="地址")
     designer: Optional[str] = Field(None, description="设计师")
     salesperson: Optional[str] = Field(None, description="销售员")
-    assignment_date: Optional[str] = Field(None, description="分单日期")
-    order_date: Optional[str] = Field(None, description="下单日期")
+    assignment_date: Optional[IsoDateStr] = Field(None, description="分单日期")
+    order_date: Optional[IsoDateStr] = Field(None, description="下单日期")
     category_name: Optional[str] = Field(None, description="类目名称")
     order_type: Optional[str] = Field(None, description="订单类型")
     cabinet_area: Optional[Decimal] = Field(None, description="柜体面积")
@@ -54,6 +56,27 @@ class OrderStatusUpdate(BaseModel):
     order_status: str = Field(..., description="订单状态")
 
 
+class OrderStatusBatchGroup(BaseModel):
+    """一组订单及其目标状态"""
+    order_ids: List[int] = Field(..., min_length=1, description="订单ID列表")
+    order_status: str = Field(..., description="订单状态")
+
+
+class OrderStatusBatchUpdate(BaseModel):
+    """订单状态批量更新模型"""
+    updates: List[OrderStatusBatchGroup] = Field(..., min_length=1, description="按目标状态分组的订单")
+
+
+class OrderPurgeRequest(BaseModel):
+    """订单批量清理条件：订单ID列表和筛选条件至少指定一项，同时指定时取交集"""
+    order_ids: Optional[List[int]] = Field(None, description="订单ID列表")
+    order_status: Optional[List[str]] = Field(None, description="订单状态（多选）")
+    assignment_date_start: Optional[IsoDateStr] = Field(None, description="分单日期开始")
+    assignment_date_end: Optional[IsoDateStr] = Field(None, description="分单日期结束")
+    order_date_start: Optional[IsoDateStr] = Field(None, description="下单日期开始")
+    order_date_end: Optional[IsoDateStr] = Field(None, description="下单日期结束")
+
+
 class OrderResponse(OrderBase):
     """订单响应模型"""
     id: int = Field(..., description="订单ID")
@@ -135,6 +158,10 @@ class OrderListQuery(BaseModel):
     page: int = Field(1, ge=1, description="页码")
     page_size: int = Field(10, ge=1, le=100, description="每页数量")
     no_pagination: Optional[bool] = Field(False, description="是否不分页，获取所有数据")
+    # 游标分页：按（分单日期, ID）定位，忽略 page
+    cursor_mode: Optional[bool] = Field(False, description="是否使用游标分页")
+    cursor: Optional[str] = Field(None, description="分页游标（上一页返回的 next_cursor，为空时查询第一页）")
+    include_total: Optional[bool] = Field(False, description="游标分页时是否返回总数")
     order_number: Optional[str] = Field(None, description="订单编号")
     customer_name: Optional[str] = Field(None, description="客户名称")
     designer: Optional[str] = Field(None, description="设计师")
@@ -145,13 +172,13 @@ class OrderListQuery(BaseModel):
     quote_status: Optional[List[str]] = Field(None, description="报价状态（多选）")
     design_cycle_filter: Optional[str] = Field(None, description="设计周期筛选：lte20(小于等于20天)、gt20(大于20天)、lt50(小于50天)")
     category_names: Optional[List[str]] = Field(None, description="类目名称（多选）")
-    assignment_date_start: Optional[str] = Field(None, description="分单日期开始")
-    assignment_date_end: Optional[str] = Field(None, description="分单日期结束")
-    order_date_start: Optional[str] = Field(None, description="下单日期开始")
-    order_date_end: Optional[str] = Field(None, description="下单日期结束")
+    assignment_date_start: Optional[IsoDateStr] = Field(None, description="分单日期开始")
+    assignment_date_end: Optional[IsoDateStr] = Field(None, description="分单日期结束")
+    order_date_start: Optional[IsoDateStr] = Field(None, description="下单日期开始")
+    order_date_end: Optional[IsoDateStr] = Field(None, description="下单日期结束")
     # 新增：计划日期筛选
-    planned_date_start: Optional[str] = Field(None, description="计划日期开始（设计过程中的计划日期）")
-    planned_date_end: Optional[str] = Field(None, description="计划日期结束（设计过程中的计划日期）")
+    planned_date_start: Optional[IsoDateStr] = Field(None, description="计划日期开始（设计过程中的计划日期）")
+    planned_date_end: Optional[IsoDateStr] = Field(None, description="计划日期结束（设计过程中的计划日期）")
     # 新增：订单进度筛选（小程序使用）
     order_progress: Optional[List[str]] = Field(None, description="订单进度筛选（多选）：设计、拆单、生产，为空或包含全部时查询所有表并去重")
     # 新增：订单状态详情筛选（小程序使用，根据订单进度筛选对应的状态）
@@ -161,7 +188,8 @@ class OrderListQuery(BaseModel):
 class OrderListResponse(BaseModel):
     """订单列表响应模型"""
     items: List[OrderListItem] = Field(..., description="订单列表")
-    total: int = Field(..., description="总数量")
+    total: Optional[int] = Field(..., description="总数量（游标分页且未要求总数时为空）")
     page: int = Field(..., description="当前页码")
     page_size: int = Field(..., description="每页数量")
-    total_pages: int = Field(..., description="总页数")
\ No newline at end of file
+    total_pages: Optional[int] = Field(..., description="总页数（游标分页且未要求总数时为空）")
+    next_cursor: Optional[str] = Field(None, description="下一页游标（游标分页时返回，没有下一页时为空）")
\ No newline at end of file
@@ -2,12 +2,18 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+from app.schemas.types import IsoDateStr
+
 
 class ProductionListQuery(BaseModel):
     """生产管理列表查询参数"""
     page: int = Field(default=1, ge=1, description="页码")
     page_size: int = Field(default=10, ge=1, le=100, description="每页数量")
     no_pagination: Optional[bool] = Field(default=False, description="是否不分页，返回全部数据")
+    # 游标分页：按（排序字段, 订单编号）定位，忽略 page
+    cursor_mode: Optional[bool] = Field(default=False, description="是否使用游标分页")
+    cursor: Optional[str] = Field(default=None, description="分页游标（上一页返回的 next_cursor，为空时查询第一页）")
+    include_total: Optional[bool] = Field(default=False, description="游标分页时是否返回总数")
     
     # 搜索条件
     order_number: Optional[str] = Field(default=None, description="订单编号")
@@ -21,14 +27,14 @@ class ProductionListQuery(BaseModel):
     sort_order: Optional[str] = Field(default="desc", description="排序规则：asc（升序）或 desc（降序）")
     
     # 日期区间搜索
-    expected_delivery_start: Optional[str] = Field(default=None, description="预计交货日期开始")
-    expected_delivery_end: Optional[str] = Field(default=None, description="预计交货日期结束")
-    cutting_date_start: Optional[str] = Field(default=None, description="下料日期开始")
-    cutting_date_end: Optional[str] = Field(default=None, description="下料日期结束")
-    expected_shipment_start: Optional[str] = Field(default=None, description="预计出货日期开始")
-    expected_shipment_end: Optional[str] = Field(default=None, description="预计出货日期结束")
-    actual_shipment_start: Optional[str] = Field(default=None, description="实际出货日期开始")
-    actual_shipment_end: Optional[str] = Field(default=None, description="实际出货日期结束")
+    expected_delivery_start: Optional[IsoDateStr] = Field(default=None, description="预计交货日期开始")
+    expected_delivery_end: Optional[IsoDateStr] = Field(default=None, description="预计交货日期结束")
+    cutting_date_start: Optional[IsoDateStr] = Field(default=None, description="下料日期开始")
+    cutting_date_end: Optional[IsoDateStr] = Field(default=None, description="下料日期结束")
+    expected_shipment_start: Optional[IsoDateStr] = Field(default=None, description="预计出货日期开始")
+    expected_shipment_end: Optional[IsoDateStr] = Field(default=None, description="预计出货日期结束")
+    actual_shipment_start: Optional[IsoDateStr] = Field(default=None, description="实际出货日期开始")
+    actual_shipment_end: Optional[IsoDateStr] = Field(default=None, description="实际出货日期结束")
 
 
 class ProductionListItem(BaseModel):
@@ -77,10 +83,11 @@ class ProductionListResponse(BaseModel):
     code: int = 200
     message: str = "success"
     data: List[ProductionListItem]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class ProductionEdit(BaseModel):
@@ -89,18 +96,18 @@ class ProductionEdit(BaseModel):
     address: Optional[str] = Field(default=None, description="地址")
     splitter: Optional[str] = Field(default=None, description="拆单员")
     is_installation: Optional[bool] = Field(default=None, description="是否安装")
-    customer_payment_date: Optional[str] = Field(default=None, description="客户打款日期")
-    split_order_date: Optional[str] = Field(default=None, description="拆单下单日期")
+    customer_payment_date: Optional[IsoDateStr] = Field(default=None, description="客户打款日期")
+    split_order_date: Optional[IsoDateStr] = Field(default=None, description="拆单下单日期")
     internal_production_items: Optional[str] = Field(default=None, description="厂内生产项")
     external_purchase_items: Optional[str] = Field(default=None, description="外购项")
     order_days: Optional[str] = Field(default=None, description="下单天数")
-    expected_delivery_date: Optional[str] = Field(default=None, description="预计交货日期")
+    expected_delivery_date: Optional[IsoDateStr] = Field(default=None, description="预计交货日期")
     board_18: Optional[str] = Field(default=None, description="18板")
     board_09: Optional[str] = Field(default=None, description="09板")
     order_status: Optional[str] = Field(default=None, description="订单状态")
-    actual_delivery_date: Optional[str] = Field(default=None, description="实际出货日期")
-    cutting_date: Optional[str] = Field(default=None, description="下料日期")
-    expected_shipping_date: Optional[str] = Field(default=None, description="预计出货日期")
+    actual_delivery_date: Optional[IsoDateStr] = Field(default=None, description="实际出货日期")
+    cutting_date: Optional[IsoDateStr] = Field(default=None, description="下料日期")
+    expected_shipping_date: Optional[IsoDateStr] = Field(default=None, description="预计出货日期")
     remarks: Optional[str] = Field(default=None, description="备注")
     special_notes: Optional[str] = Field(default=None, description="特殊情况")
 
@@ -118,18 +125,27 @@ class ProductionProgressBase(BaseModel):
     actual_arrival_date: Optional[str] = None
 
 
+class ProductionProgressUpdate(ProductionProgressBase):
+    """单个生产进度更新模型"""
+    order_date: Optional[IsoDateStr] = None
+    expected_material_date: Optional[IsoDateStr] = None
+    actual_storage_date: Optional[IsoDateStr] = None
+    expected_arrival_date: Optional[IsoDateStr] = None
+    actual_arrival_date: Optional[IsoDateStr] = None
+
+
 class ProductionProgressBatchUpdate(BaseModel):
     """生产进度批量更新模型"""
     id: Optional[int] = None  # 可选ID，用于更新现有记录
     item_type: Optional[str] = None
     category_name: Optional[str] = None
-    order_date: Optional[str] = None
-    expected_material_date: Optional[str] = None
-    actual_storage_date: Optional[str] = None
+    order_date: Optional[IsoDateStr] = None
+    expected_material_date: Optional[IsoDateStr] = None
+    actual_storage_date: Optional[IsoDateStr] = None
     storage_time: Optional[str] = None
     quantity: Optional[str] = None
-    expected_arrival_date: Optional[str] = None
-    actual_arrival_date: Optional[str] = None
+    expected_arrival_date: Optional[IsoDateStr] = None
+    actual_arrival_date: Optional[IsoDateStr] = None
 
 
 class ProductionProgressResponse(ProductionProgressBase):
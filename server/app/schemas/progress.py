@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+from app.schemas.types import IsoDateStr
+
 
 class ProgressBase(BaseModel):
     """进度基础模型"""
@@ -13,13 +15,15 @@ class ProgressBase(BaseModel):
 
 class ProgressCreate(ProgressBase):
     """创建进度模型"""
+    planned_date: IsoDateStr = Field(..., description="计划日期")
+    actual_date: Optional[IsoDateStr] = Field(None, description="实际日期")
     order_id: str = Field(..., description="订单编号")
 
 
 class ProgressUpdate(BaseModel):
     """更新进度模型"""
-    planned_date: Optional[str] = Field(None, description="计划日期")
-    actual_date: Optional[str] = Field(None, description="实际日期")
+    planned_date: Optional[IsoDateStr] = Field(None, description="计划日期")
+    actual_date: Optional[IsoDateStr] = Field(None, description="实际日期")
     remarks: Optional[str] = Field(None, description="备注")
 
 
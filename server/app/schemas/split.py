@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from app.schemas.types import IsoDateStr
+
 
 class ProductionItem(BaseModel):
     """生产项模型"""
@@ -20,7 +22,7 @@ class SplitBase(BaseModel):
     internal_production_items: Optional[str] = Field(None, description="厂内生产项")
     external_purchase_items: Optional[str] = Field(None, description="外购项")
     quote_status: Optional[str] = Field("未打款", description="报价状态")
-    completion_date: Optional[str] = Field(None, description="完成日期")
+    completion_date: Optional[IsoDateStr] = Field(None, description="完成日期")
     remarks: Optional[str] = Field(None, description="备注")
 
 
@@ -55,7 +57,12 @@ class SplitStatusUpdate(BaseModel):
     """拆单状态更新模型"""
     order_status: Optional[str] = Field(None, description="订单状态")
     quote_status: Optional[str] = Field(None, description="报价状态")
-    actual_payment_date: Optional[str] = Field(None, description="实际打款日期")
+    actual_payment_date: Optional[IsoDateStr] = Field(None, description="实际打款日期")
+
+
+class SplitPlaceOrdersRequest(BaseModel):
+    """拆单批量下单模型"""
+    split_ids: List[int] = Field(..., min_length=1, description="拆单ID列表")
 
 
 class SplitListQuery(BaseModel):
@@ -63,6 +70,10 @@ class SplitListQuery(BaseModel):
     page: int = Field(1, ge=1, description="页码")
     page_size: int = Field(10, ge=1, le=100, description="每页数量")
     no_pagination: Optional[bool] = Field(False, description="是否不分页，获取所有数据")
+    # 游标分页：按（下单日期, 订单编号, ID）定位，忽略 page
+    cursor_mode: Optional[bool] = Field(False, description="是否使用游标分页")
+    cursor: Optional[str] = Field(None, description="分页游标（上一页返回的 next_cursor，为空时查询第一页）")
+    include_total: Optional[bool] = Field(False, description="游标分页时是否返回总数")
     order_number: Optional[str] = Field(None, description="订单编号")
     customer_name: Optional[str] = Field(None, description="客户名称")
     designer: Optional[str] = Field(None, description="设计师")
@@ -73,10 +84,10 @@ class SplitListQuery(BaseModel):
     quote_status: Optional[List[str]] = Field(None, description="报价状态（多选）")
     category_names: Optional[List[str]] = Field(None, description="下单类目（多选）")
     completion_status: Optional[str] = Field(None, description="完成状态：completed（完成）或 incomplete（未完成），与下单类目组合查询")
-    order_date_start: Optional[str] = Field(None, description="下单日期开始")
-    order_date_end: Optional[str] = Field(None, description="下单日期结束")
-    completion_date_start: Optional[str] = Field(None, description="完成日期开始")
-    completion_date_end: Optional[str] = Field(None, description="完成日期结束")
+    order_date_start: Optional[IsoDateStr] = Field(None, description="下单日期开始")
+    order_date_end: Optional[IsoDateStr] = Field(None, description="下单日期结束")
+    completion_date_start: Optional[IsoDateStr] = Field(None, description="完成日期开始")
+    completion_date_end: Optional[IsoDateStr] = Field(None, description="完成日期结束")
 
 
 class SplitResponse(BaseModel):
@@ -110,7 +121,8 @@ class SplitResponse(BaseModel):
 class SplitListResponse(BaseModel):
     """拆单列表响应模型"""
     items: List[SplitResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
\ No newline at end of file
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
\ No newline at end of file
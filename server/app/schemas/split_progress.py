@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from enum import Enum
 
+from app.schemas.types import IsoDateStr
+
 
 class ItemType(str, Enum):
     """项目类型枚举"""
@@ -14,9 +16,9 @@ class SplitProgressBase(BaseModel):
     """拆单进度基础模型"""
     item_type: ItemType = Field(..., description="项目类型")
     category_name: str = Field(..., description="类目名称")
-    planned_date: Optional[str] = Field(None, description="计划日期")
-    split_date: Optional[str] = Field(None, description="拆单日期（厂内项）")
-    purchase_date: Optional[str] = Field(None, description="采购日期（外购项）")
+    planned_date: Optional[IsoDateStr] = Field(None, description="计划日期")
+    split_date: Optional[IsoDateStr] = Field(None, description="拆单日期（厂内项）")
+    purchase_date: Optional[IsoDateStr] = Field(None, description="采购日期（外购项）")
     cycle_days: Optional[str] = Field(None, description="周期天数")
     status: Optional[str] = Field("待处理", description="状态")
     remarks: Optional[str] = Field(None, description="备注")
@@ -30,9 +32,9 @@ class SplitProgressCreate(SplitProgressBase):
 
 class SplitProgressUpdate(BaseModel):
     """更新拆单进度模型"""
-    planned_date: Optional[str] = Field(None, description="计划日期")
-    split_date: Optional[str] = Field(None, description="拆单日期（厂内项）")
-    purchase_date: Optional[str] = Field(None, description="采购日期（外购项）")
+    planned_date: Optional[IsoDateStr] = Field(None, description="计划日期")
+    split_date: Optional[IsoDateStr] = Field(None, description="拆单日期（厂内项）")
+    purchase_date: Optional[IsoDateStr] = Field(None, description="采购日期（外购项）")
     cycle_days: Optional[str] = Field(None, description="周期天数")
     status: Optional[str] = Field(None, description="状态")
     remarks: Optional[str] = Field(None, description="备注")
@@ -40,8 +42,10 @@ class SplitProgressUpdate(BaseModel):
 
 class SplitProgressBatchUpdate(BaseModel):
     """批量更新拆单进度模型"""
-    internal_items: Optional[dict] = Field(None, alias="internalItems", description="厂内生产项")
-    external_items: Optional[dict] = Field(None, alias="externalItems", description="外购项")
+    internal_items: Optional[Dict[str, Dict[str, Optional[IsoDateStr]]]] = Field(
+        None, alias="internalItems", description="厂内生产项：{类目: {plannedDate, splitDate}}")
+    external_items: Optional[Dict[str, Dict[str, Optional[IsoDateStr]]]] = Field(
+        None, alias="externalItems", description="外购项：{类目: {plannedDate, purchaseDate}}")
     remarks: Optional[str] = Field(None, description="备注")
     
     class Config:
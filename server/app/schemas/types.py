@@ -0,0 +1,15 @@
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+from app.utils.dates import parse_iso_date
+
+
+def _normalize_iso_date(value: str) -> str:
+    """校验日期并规范化为 'YYYY-MM-DD'，格式错误时抛出 ValueError（接口返回 422）；空字符串原样保留"""
+    parsed = parse_iso_date(value)
+    return parsed.isoformat() if parsed else value
+
+
+# 日期字符串字段：在请求校验阶段拒绝无法解析的日期，不留到写库或查询时才报错
+IsoDateStr = Annotated[str, AfterValidator(_normalize_iso_date)]
@@ -0,0 +1,27 @@
+"""
+批量查询工具
+用于将大批量ID拆分为多个IN查询，避免超出数据库绑定参数数量限制（SQLite默认999）
+"""
+
+from typing import Iterator, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# 单次IN查询的最大参数数量
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
+def chunked(values: Sequence[T], size: int = IN_CLAUSE_CHUNK_SIZE) -> Iterator[List[T]]:
+    """
+    按固定大小切分序列
+
+    Args:
+        values: 待切分的序列
+        size: 每批数量
+
+    Returns:
+        Iterator[List[T]]: 分批后的列表迭代器
+    """
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
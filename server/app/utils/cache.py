@@ -0,0 +1,131 @@
+"""
+类目、用户查询的进程内缓存
+
+类目和用户很少变更，但下单、编辑订单/拆单时会按类目名称逐个查询类目类型，
+拆单接口每次请求都会按 X-Username 查询用户。这里按 TTL 缓存查询结果：
+
+- 类目：首次查询时一次加载全部类目（名称 -> 类目分类），表很小
+- 用户：按用户名缓存用户信息快照（不含密码），不存在的用户名同样缓存
+- 类目、用户写接口提交后显式失效；多进程部署时其他进程的缓存依赖过期时间
+  （LOOKUP_CACHE_TTL）失效
+- 缓存的是普通值而不是 ORM 对象，不依赖某个数据库会话
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.category import Category, CategoryType
+from app.models.user import User, UserRole
+
+_MISSING = object()
+
+# 类目缓存只有一个条目：全部类目的名称 -> 类目分类映射
+_ALL_CATEGORIES = "__all__"
+
+
+class UserInfo(NamedTuple):
+    """缓存的用户信息"""
+    id: int
+    username: str
+    role: UserRole
+
+
+class TTLCache:
+    """带过期时间和命中统计的进程内缓存"""
+
+    def __init__(self, name: str, ttl_seconds: int):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """获取缓存值，没有或已过期时返回 default 并计为未命中"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, keys: Iterable):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+category_cache = TTLCache("categories", settings.LOOKUP_CACHE_TTL)
+user_cache = TTLCache("users", settings.LOOKUP_CACHE_TTL)
+
+
+def get_category_types(db: Session) -> Dict[str, CategoryType]:
+    """全部类目的名称 -> 类目分类映射"""
+    category_types = category_cache.get(_ALL_CATEGORIES)
+    if category_types is None:
+        category_types = dict(db.query(Category.name, Category.category_type).all())
+        category_cache.set(_ALL_CATEGORIES, category_types)
+    return category_types
+
+
+def get_category_type(db: Session, name: str) -> Optional[CategoryType]:
+    """按类目名称获取类目分类，类目不存在时返回 None"""
+    return get_category_types(db).get(name)
+
+
+def invalidate_categories():
+    """类目新增、删除后调用"""
+    category_cache.clear()
+
+
+def get_user_info(db: Session, username: str) -> Optional[UserInfo]:
+    """按用户名获取用户信息，用户不存在时返回 None"""
+    user_info = user_cache.get(username, _MISSING)
+    if user_info is _MISSING:
+        row = db.query(User.id, User.username, User.role).filter(User.username == username).first()
+        user_info = UserInfo(*row) if row else None
+        user_cache.set(username, user_info)
+    return user_info
+
+
+def invalidate_users(*usernames: str):
+    """用户新增、修改、删除后调用"""
+    user_cache.invalidate(usernames)
+
+
+def cache_stats() -> dict:
+    """各缓存的命中统计"""
+    return {cache.name: cache.stats() for cache in (category_cache, user_cache)}
@@ -0,0 +1,211 @@
+"""
+拆单/生产完成状态筛选
+
+厂内项以拆单日期（拆单）或实际入库日期（生产）为完成标志，外购项以采购日期（拆单）
+或实际到厂日期（生产）为完成标志。按拆单/生产分组一次聚合出完成数量和总数量：
+
+- 指定类目：已完成 = 所选类目中至少一项完成；未完成 = 所选类目中至少一项未完成
+- 未指定类目：已完成 = 全部事项完成；未完成 = 至少一项未完成
+- 只指定类目、没有完成状态：包含所选类目中任一事项
+
+拆单/生产表上维护了进度项总数和完成数量（total_items / completed_internal_items /
+completed_external_items），不指定类目时直接按计数列筛选，不再聚合进度表。
+写入进度的接口在提交前调用 refresh_split_counters / refresh_production_counters。
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.split import Split
+from app.models.production import Production
+from app.models.split_progress import SplitProgress, ItemType as SplitItemType
+from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
+from app.utils.batch import chunked
+
+
+class CompletionSpec(NamedTuple):
+    """进度表中用于判断完成状态的字段"""
+    parent: Any
+    parent_id: Any
+    item_type: Any
+    category_name: Any
+    internal_type: Any
+    external_type: Any
+    internal_done: Any
+    external_done: Any
+
+
+SPLIT_COMPLETION = CompletionSpec(
+    parent=Split,
+    parent_id=SplitProgress.split_id,
+    item_type=SplitProgress.item_type,
+    category_name=SplitProgress.category_name,
+    internal_type=SplitItemType.INTERNAL,
+    external_type=SplitItemType.EXTERNAL,
+    internal_done=SplitProgress.split_date,
+    external_done=SplitProgress.purchase_date,
+)
+
+PRODUCTION_COMPLETION = CompletionSpec(
+    parent=Production,
+    parent_id=ProductionProgress.production_id,
+    item_type=ProductionProgress.item_type,
+    category_name=ProductionProgress.category_name,
+    internal_type=ProductionItemType.INTERNAL,
+    external_type=ProductionItemType.EXTERNAL,
+    internal_done=ProductionProgress.actual_storage_date,
+    external_done=ProductionProgress.actual_arrival_date,
+)
+
+
+# 拆单/生产表上的计数列
+COUNTER_FIELDS = ("total_items", "completed_internal_items", "completed_external_items")
+
+
+def _internal_done(spec: CompletionSpec):
+    return and_(spec.item_type == spec.internal_type, spec.internal_done.isnot(None))
+
+
+def _external_done(spec: CompletionSpec):
+    return and_(spec.item_type == spec.external_type, spec.external_done.isnot(None))
+
+
+def done_flag(spec: CompletionSpec):
+    """单个进度事项是否完成（1/0）"""
+    return case((_internal_done(spec), 1), (_external_done(spec), 1), else_=0)
+
+
+def completion_filter(spec: CompletionSpec, completion_status: Optional[str],
+                      category_names: Optional[List[str]]):
+    """
+    构建拆单/生产列表的完成状态和类目筛选条件
+
+    Args:
+        spec: 进度表字段定义（SPLIT_COMPLETION / PRODUCTION_COMPLETION）
+        completion_status: completed / incomplete，为空时只按类目筛选
+        category_names: 类目名称列表
+
+    Returns:
+        筛选条件，没有需要应用的筛选时返回 None
+    """
+    if completion_status not in ("completed", "incomplete"):
+        # 传入了无法识别的完成状态时不做筛选
+        if completion_status or not category_names:
+            return None
+
+    parent = spec.parent
+    if not category_names:
+        completed = parent.completed_internal_items + parent.completed_external_items
+        if completion_status == "completed":
+            return and_(parent.total_items > 0, completed == parent.total_items)
+        return completed < parent.total_items
+
+    query = select(spec.parent_id).where(
+        spec.category_name.in_(category_names)
+    ).group_by(spec.parent_id)
+
+    done_count = func.sum(done_flag(spec))
+    if completion_status == "completed":
+        query = query.having(done_count >= 1)
+    elif completion_status == "incomplete":
+        query = query.having(done_count < func.count())
+    return parent.id.in_(query)
+
+
+def _count_progress(db: Session, spec: CompletionSpec, parent_ids: List[int]) -> Dict[int, Tuple[int, int, int]]:
+    """统计进度项数量，返回 {ID: (总数, 已完成厂内项, 已完成外购项)}，没有进度项的为 (0, 0, 0)"""
+    counts = {parent_id: (0, 0, 0) for parent_id in parent_ids}
+    rows = db.execute(
+        select(
+            spec.parent_id,
+            func.count(),
+            func.sum(case((_internal_done(spec), 1), else_=0)),
+            func.sum(case((_external_done(spec), 1), else_=0)),
+        ).where(spec.parent_id.in_(parent_ids)).group_by(spec.parent_id)
+    )
+    for parent_id, total, internal, external in rows:
+        counts[parent_id] = (total, internal or 0, external or 0)
+    return counts
+
+
+def _write_counters(db: Session, spec: CompletionSpec, counts: Dict[int, Tuple[int, int, int]]):
+    if not counts:
+        return
+    table = spec.parent.__table__
+    statement = update(table).where(table.c.id == bindparam("b_id")).values(
+        total_items=bindparam("b_total"),
+        completed_internal_items=bindparam("b_internal"),
+        completed_external_items=bindparam("b_external"),
+        # 计数变化不算作记录更新，保持 updated_at 不变
+        updated_at=table.c.updated_at,
+    )
+    db.execute(statement, [
+        {"b_id": parent_id, "b_total": total, "b_internal": internal, "b_external": external}
+        for parent_id, (total, internal, external) in counts.items()
+    ])
+
+    # 会话中已加载的记录重新读取计数
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, spec.parent) and obj.id in counts:
+            db.expire(obj, list(COUNTER_FIELDS))
+
+
+def _refresh_counters(db: Session, spec: CompletionSpec, parent_ids: Iterable[int]):
+    ids = sorted({parent_id for parent_id in parent_ids if parent_id})
+    if not ids:
+        return
+
+    # 先写入会话中未刷新的进度变更
+    db.flush()
+    for chunk in chunked(ids):
+        _write_counters(db, spec, _count_progress(db, spec, chunk))
+
+
+def refresh_split_counters(db: Session, split_ids: Iterable[int]):
+    """按 split_progress 重新计算拆单的进度项计数（在同一事务内，由调用方提交）"""
+    _refresh_counters(db, SPLIT_COMPLETION, split_ids)
+
+
+def refresh_production_counters(db: Session, production_ids: Iterable[int]):
+    """按 production_progress 重新计算生产记录的进度项计数（在同一事务内，由调用方提交）"""
+    _refresh_counters(db, PRODUCTION_COMPLETION, production_ids)
+
+
+def rebuild_completion_counters(db: Session, batch_size: int = 1000, dry_run: bool = False) -> Dict[str, Tuple[int, int]]:
+    """
+    按进度表全量校正拆单和生产记录的计数，按主键分批提交
+
+    Args:
+        db: 数据库会话
+        batch_size: 每批处理的记录数
+        dry_run: 只统计不一致的记录，不写入
+
+    Returns:
+        {表名: (检查数量, 修正数量)}
+    """
+    result = {}
+    for spec in (SPLIT_COMPLETION, PRODUCTION_COMPLETION):
+        parent = spec.parent
+        checked = fixed = 0
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(parent.id, *[getattr(parent, field) for field in COUNTER_FIELDS])
+                .where(parent.id > last_id).order_by(parent.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            counts = _count_progress(db, spec, [row[0] for row in rows])
+            drifted = {row[0]: counts[row[0]] for row in rows if tuple(row[1:]) != counts[row[0]]}
+            if drifted and not dry_run:
+                _write_counters(db, spec, drifted)
+                db.commit()
+
+            checked += len(rows)
+            fixed += len(drifted)
+            last_id = rows[-1][0]
+        result[parent.__tablename__] = (checked, fixed)
+    return result
@@ -0,0 +1,113 @@
+"""
+日期工具
+
+- parse_iso_date: 严格解析日期，格式错误时抛出 ValueError（日期列类型 IsoDate 使用）
+- parse_date: 带缓存的日期解析，列表中大量重复的日期字符串只解析一次
+- today / today_str: 当前日期。请求期间由 RequestTodayMiddleware 固定为请求开始时的日期，
+  同一响应内所有周期计算使用同一个“今天”，跨零点的请求也不会前后不一致
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_request_today: ContextVar[Optional[date]] = ContextVar("request_today", default=None)
+
+
+def parse_iso_date(value) -> Optional[date]:
+    """
+    将日期值解析为 date 对象
+
+    支持 date/datetime 对象以及 'YYYY-MM-DD'、'YYYY-MM-DD HH:MM:SS'、
+    'YYYY-MM-DDTHH:MM:SS' 等格式的字符串，空值返回 None
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+
+    text = str(value).strip()
+    if not text:
+        return None
+    text = text.replace("T", " ").split(" ")[0].replace("/", "-")
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"日期格式错误: {value}，应为 YYYY-MM-DD")
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_text(value: str) -> Optional[date]:
+    try:
+        return parse_iso_date(value)
+    except ValueError as e:
+        logger.error(f"日期格式错误: {value}, 错误: {e}")
+        return None
+
+
+def parse_date(value) -> Optional[date]:
+    """
+    解析日期，支持 date/datetime 对象以及 'YYYY-MM-DD' 等格式的字符串
+
+    Returns:
+        date 对象，空值或格式错误时返回 None
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    return _parse_date_text(value)
+
+
+def days_between(end, start) -> Optional[int]:
+    """两个日期相差的天数（end - start），任一日期为空或格式错误时返回 None"""
+    end_date = parse_date(end)
+    start_date = parse_date(start)
+    if end_date is None or start_date is None:
+        return None
+    return (end_date - start_date).days
+
+
+def today() -> date:
+    """当前日期，请求期间固定为请求开始时的日期"""
+    return _request_today.get() or date.today()
+
+
+def today_str() -> str:
+    """当前日期，格式为 'YYYY-MM-DD'"""
+    return today().isoformat()
+
+
+@contextmanager
+def today_scope(value: Optional[date] = None):
+    """在上下文内固定当前日期（默认取进入时的日期），用于请求、脚本和测试"""
+    token = _request_today.set(value or date.today())
+    try:
+        yield
+    finally:
+        _request_today.reset(token)
+
+
+class RequestTodayMiddleware:
+    """为每个HTTP请求固定当前日期"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with today_scope():
+            await self.app(scope, receive, send)
@@ -0,0 +1,415 @@
+"""
+订单批量导入
+
+支持 CSV、XLSX 和 JSON Lines 文件，每行按 OrderCreate 校验，与逐条新增订单的规则一致：
+- 生产单的初始状态为“已下单”，并自动创建拆单和拆单进度（按类目表区分厂内/外购，
+  类目不存在时默认为厂内生产项）
+- 其他订单的初始状态为“进行中”
+
+数据按块（默认1000行）写入，每块一个事务：先一次查询已存在的订单编号，再批量
+INSERT 订单、拆单和拆单进度；新建拆单的进度完成计数在写入时直接给出，无需再统计。
+校验失败或与已有订单重复的行不写入，并在导入报告中给出行号和原因。
+
+CSV/XLSX 表头可以是字段名（order_number）或订单导出文件中的中文列名（订单编号），
+导出文件中与新增订单无关的列会被忽略。
+"""
+
+import csv
+import io
+import json
+import re
+import time
+import zipfile
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.category import CategoryType
+from app.models.order import Order
+from app.models.split import Split
+from app.models.split_progress import ItemType, SplitProgress
+from app.schemas.order import OrderCreate
+from app.utils.cache import get_category_types
+from app.utils.dates import parse_iso_date
+
+IMPORT_CHUNK_SIZE = 1000
+
+# 订单导出文件的中文列名 -> 字段名
+_HEADER_ALIASES = {
+    "订单编号": "order_number",
+    "客户名称": "customer_name",
+    "地址": "address",
+    "设计师": "designer",
+    "销售员": "salesperson",
+    "分单日期": "assignment_date",
+    "下单日期": "order_date",
+    "下单类目": "category_name",
+    "类目名称": "category_name",
+    "订单类型": "order_type",
+    "是否安装": "is_installation",
+    "柜体面积": "cabinet_area",
+    "墙板面积": "wall_panel_area",
+    "订单金额": "order_amount",
+    "备注": "remarks",
+}
+
+_ORDER_FIELDS = set(OrderCreate.model_fields)
+
+_BOOLEAN_TEXT = {"是": True, "否": False}
+
+_DATE_FIELDS = ("assignment_date", "order_date")
+
+# XLSX 中未设为文本格式的日期以序列号（1899-12-30 起的天数）存储
+_EXCEL_SERIAL = re.compile(r"\d{5}(\.0+)?")
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+_XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+class OrderImportReport:
+    """导入报告"""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.total_rows = 0
+        self.created_orders = 0
+        self.created_splits = 0
+        self.created_split_progress = 0
+        self.errors: List[dict] = []
+        self.elapsed_seconds = 0.0
+
+    def add_error(self, row: int, order_number: Optional[str], error: str):
+        self.errors.append({"row": row, "order_number": order_number, "error": error})
+
+    def to_dict(self) -> dict:
+        rows_per_second = self.total_rows / self.elapsed_seconds if self.elapsed_seconds else None
+        return {
+            "dry_run": self.dry_run,
+            "total_rows": self.total_rows,
+            "created_orders": self.created_orders,
+            "created_splits": self.created_splits,
+            "created_split_progress": self.created_split_progress,
+            "failed_rows": len(self.errors),
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(rows_per_second) if rows_per_second else None,
+        }
+
+
+def _normalize_header(header) -> str:
+    header = str(header or "").strip().lstrip("\ufeff")
+    return _HEADER_ALIASES.get(header, header)
+
+
+def _iter_csv_rows(content: bytes) -> Iterator[Tuple[int, dict]]:
+    reader = csv.reader(io.StringIO(content.decode("utf-8-sig")))
+    headers = [_normalize_header(header) for header in next(reader, [])]
+    for row_number, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        yield row_number, dict(zip(headers, values))
+
+
+def _iter_jsonl_rows(content: bytes) -> Iterator[Tuple[int, dict]]:
+    for row_number, line in enumerate(content.decode("utf-8-sig").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"第{row_number}行不是有效的JSON: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"第{row_number}行不是JSON对象")
+        yield row_number, {_normalize_header(key): value for key, value in record.items()}
+
+
+def _column_index(cell_ref: str) -> int:
+    """Excel 单元格引用（如 AB12）转为列序号（从0开始）"""
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+
+def _iter_xlsx_rows(content: bytes) -> Iterator[Tuple[int, dict]]:
+    """读取工作簿第一个工作表（共享字符串、内联字符串、数字和布尔单元格）"""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        raise ValueError("XLSX 文件格式错误")
+
+    with archive:
+        names = set(archive.namelist())
+        shared_strings = []
+        if "xl/sharedStrings.xml" in names:
+            root = ElementTree.fromstring(archive.read("xl/sharedStrings.xml"))
+            for item in root.iter(f"{_XLSX_NS}si"):
+                shared_strings.append("".join(text.text or "" for text in item.iter(f"{_XLSX_NS}t")))
+
+        sheets = sorted(name for name in names if name.startswith("xl/worksheets/sheet"))
+        if not sheets:
+            raise ValueError("XLSX 文件中没有工作表")
+
+        headers = None
+        with archive.open(sheets[0]) as sheet:
+            for _, element in ElementTree.iterparse(sheet):
+                if element.tag != f"{_XLSX_NS}row":
+                    continue
+                values = {}
+                for position, cell in enumerate(element.iter(f"{_XLSX_NS}c")):
+                    ref = cell.get("r")
+                    column = _column_index(ref) if ref else position
+                    cell_type = cell.get("t")
+                    if cell_type == "inlineStr":
+                        value = "".join(text.text or "" for text in cell.iter(f"{_XLSX_NS}t"))
+                    else:
+                        raw = cell.findtext(f"{_XLSX_NS}v")
+                        if raw is None:
+                            continue
+                        if cell_type == "s":
+                            value = shared_strings[int(raw)]
+                        elif cell_type == "b":
+                            value = raw == "1"
+                        else:
+                            value = raw
+                    values[column] = value
+                row_number = int(element.get("r") or 0)
+                element.clear()
+
+                if headers is None:
+                    headers = {column: _normalize_header(value) for column, value in values.items()}
+                    continue
+                if not any(str(value).strip() for value in values.values()):
+                    continue
+                yield row_number, {
+                    headers[column]: value for column, value in values.items() if column in headers
+                }
+
+
+def iter_import_rows(content: bytes, filename: str) -> Iterator[Tuple[int, dict]]:
+    """
+    按文件扩展名解析导入文件
+
+    Yields:
+        (行号, 字段字典)，行号与文件中的行一致，用于错误报告
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension == "csv":
+        return _iter_csv_rows(content)
+    if extension == "xlsx":
+        return _iter_xlsx_rows(content)
+    if extension in ("jsonl", "ndjson"):
+        return _iter_jsonl_rows(content)
+    raise ValueError(f"不支持的文件类型: {filename}，仅支持 csv、xlsx、jsonl")
+
+
+def _clean_record(record: dict) -> dict:
+    """只保留订单字段；空字符串视为未填写，“是/否”转为布尔值，XLSX 日期序列号转为日期"""
+    cleaned = {}
+    for key, value in record.items():
+        if key not in _ORDER_FIELDS:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                continue
+            if key == "is_installation" and value in _BOOLEAN_TEXT:
+                value = _BOOLEAN_TEXT[value]
+            elif key in _DATE_FIELDS and _EXCEL_SERIAL.fullmatch(value):
+                value = (_EXCEL_EPOCH + timedelta(days=int(float(value)))).isoformat()
+        cleaned[key] = value
+    return cleaned
+
+
+def _validate_row(record: dict) -> OrderCreate:
+    """按 OrderCreate 校验并规范化日期，失败时抛出 ValueError"""
+    try:
+        order_data = OrderCreate.model_validate(_clean_record(record))
+    except ValidationError as e:
+        messages = [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+        raise ValueError("; ".join(messages))
+
+    order_data.assignment_date = parse_iso_date(order_data.assignment_date).isoformat()
+    if order_data.order_date:
+        order_data.order_date = parse_iso_date(order_data.order_date).isoformat()
+    return order_data
+
+
+def _split_category_names(category_name: str) -> List[str]:
+    return [name.strip() for name in category_name.split(",") if name.strip()]
+
+
+def _insert_values(db: Session, table, rows: List[dict]):
+    """
+    批量 INSERT：同一条编译好的语句配多组参数执行（executemany）
+
+    PostgreSQL（psycopg2）下 SQLAlchemy 会将其改写为分页的多值 INSERT；
+    不直接用 insert().values(列表)，因为多值语句每次都要重新编译，数据量大时编译比写入还慢。
+    """
+    if rows:
+        db.execute(insert(table), rows)
+
+
+def _write_chunk(db: Session, orders: List[OrderCreate], category_types: Dict[str, CategoryType]) -> Tuple[int, int]:
+    """写入一块订单，返回（拆单数, 拆单进度数）"""
+    _insert_values(db, Order.__table__, [
+        {
+            "order_number": order.order_number,
+            "customer_name": order.customer_name,
+            "address": order.address,
+            "designer": order.designer,
+            "salesperson": order.salesperson,
+            "assignment_date": order.assignment_date,
+            "order_date": order.order_date,
+            "category_name": order.category_name,
+            "order_type": order.order_type,
+            "cabinet_area": order.cabinet_area,
+            "wall_panel_area": order.wall_panel_area,
+            "order_amount": order.order_amount,
+            "is_installation": order.is_installation,
+            "remarks": order.remarks,
+            "order_status": "已下单" if order.order_type == "生产单" else "进行中",
+        }
+        for order in orders
+    ])
+
+    production_orders = [order for order in orders if order.order_type == "生产单"]
+    if not production_orders:
+        return 0, 0
+
+    # 生产单自动创建拆单，拆单的下单日期与分单日期一致
+    categories_by_order = {
+        order.order_number: _split_category_names(order.category_name)
+        for order in production_orders
+    }
+    _insert_values(db, Split.__table__, [
+        {
+            "order_number": order.order_number,
+            "customer_name": order.customer_name,
+            "address": order.address,
+            "order_date": order.assignment_date,
+            "designer": order.designer,
+            "salesperson": order.salesperson,
+            "order_amount": order.order_amount,
+            "cabinet_area": order.cabinet_area,
+            "wall_panel_area": order.wall_panel_area,
+            "order_type": order.order_type,
+            "order_status": "未开始",
+            "quote_status": "未打款",
+            "total_items": len(categories_by_order[order.order_number]),
+            "completed_internal_items": 0,
+            "completed_external_items": 0,
+        }
+        for order in production_orders
+    ])
+
+    # 新订单各只有一条拆单，按订单编号一次查回拆单ID
+    split_ids = dict(db.execute(
+        select(Split.order_number, Split.id).where(Split.order_number.in_(list(categories_by_order)))
+    ).all())
+
+    progress_rows = [
+        {
+            "split_id": split_ids[order_number],
+            "order_number": order_number,
+            "category_name": category_name,
+            "item_type": ItemType.EXTERNAL
+            if category_types.get(category_name) == CategoryType.EXTERNAL_PURCHASE else ItemType.INTERNAL,
+            "status": "待处理",
+        }
+        for order_number, category_names in categories_by_order.items()
+        for category_name in category_names
+    ]
+    _insert_values(db, SplitProgress.__table__, progress_rows)
+    return len(production_orders), len(progress_rows)
+
+
+def import_orders(
+    db: Session,
+    rows: Iterator[Tuple[int, dict]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    dry_run: bool = False
+) -> OrderImportReport:
+    """
+    批量导入订单
+
+    Args:
+        db: 数据库会话
+        rows: iter_import_rows 产生的（行号, 字段字典）
+        chunk_size: 每个事务写入的行数
+        dry_run: 只校验（包括订单编号是否已存在），不写入
+
+    Returns:
+        导入报告，包含每个失败行的行号和原因
+    """
+    report = OrderImportReport(dry_run=dry_run)
+    start = time.perf_counter()
+    category_types = get_category_types(db)
+    seen_numbers = set()
+
+    pending: List[Tuple[int, OrderCreate]] = []
+
+    def flush_pending():
+        if not pending:
+            return
+        numbers = [order.order_number for _, order in pending]
+        existing = set(db.execute(
+            select(Order.order_number).where(Order.order_number.in_(numbers))
+        ).scalars())
+        accepted = []
+        for row_number, order in pending:
+            if order.order_number in existing:
+                report.add_error(row_number, order.order_number, "订单编号已存在")
+            else:
+                accepted.append((row_number, order))
+        pending.clear()
+        if not accepted:
+            return
+        if dry_run:
+            report.created_orders += len(accepted)
+            return
+
+        try:
+            splits, progress_items = _write_chunk(db, [order for _, order in accepted], category_types)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for row_number, order in accepted:
+                report.add_error(row_number, order.order_number, f"写入失败: {e}")
+            return
+        report.created_orders += len(accepted)
+        report.created_splits += splits
+        report.created_split_progress += progress_items
+
+    for row_number, record in rows:
+        report.total_rows += 1
+        try:
+            order = _validate_row(record)
+        except ValueError as e:
+            order_number = record.get("order_number")
+            report.add_error(row_number, str(order_number) if order_number else None, str(e))
+            continue
+        if order.order_number in seen_numbers:
+            report.add_error(row_number, order.order_number, "订单编号在导入文件中重复")
+            continue
+        seen_numbers.add(order.order_number)
+
+        pending.append((row_number, order))
+        if len(pending) >= chunk_size:
+            flush_pending()
+    flush_pending()
+
+    if dry_run:
+        db.rollback()
+    report.errors.sort(key=lambda error: error["row"])
+    report.elapsed_seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,116 @@
+"""
+订单批量清理
+
+按订单ID列表或筛选条件（订单状态、分单/下单日期范围）删除订单及其关联数据：
+设计进度、拆单及拆单进度、生产及生产进度、订单详情快照。
+
+匹配的订单按ID分块（默认500个），每块一个事务，按外键顺序执行集合 DELETE 后提交，
+控制单个事务持有锁的时间；中途失败时已提交的块保留，未提交的块回滚，可按相同条件重新执行。
+dry_run 时按相同条件统计各表将删除的行数，不写入。
+"""
+
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.order_timeline import OrderTimeline
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress
+from app.models.progress import Progress
+from app.models.split import Split
+from app.models.split_progress import SplitProgress
+from app.schemas.order import OrderPurgeRequest
+from app.utils.batch import chunked
+from app.utils.order_timeline import etag_cache
+
+PURGE_CHUNK_SIZE = 500
+
+
+def _matched_orders(db: Session, criteria: OrderPurgeRequest) -> List[Tuple[int, str]]:
+    """按清理条件查询订单（ID, 订单编号），未指定任何条件时拒绝执行"""
+    conditions = []
+    if criteria.order_status:
+        conditions.append(Order.order_status.in_(criteria.order_status))
+    if criteria.assignment_date_start:
+        conditions.append(Order.assignment_date >= criteria.assignment_date_start)
+    if criteria.assignment_date_end:
+        conditions.append(Order.assignment_date <= criteria.assignment_date_end)
+    if criteria.order_date_start:
+        conditions.append(Order.order_date >= criteria.order_date_start)
+    if criteria.order_date_end:
+        conditions.append(Order.order_date <= criteria.order_date_end)
+    if not conditions and not criteria.order_ids:
+        raise ValueError("请指定订单ID或筛选条件")
+
+    query = select(Order.id, Order.order_number).where(*conditions).order_by(Order.id)
+    if not criteria.order_ids:
+        return [tuple(row) for row in db.execute(query).all()]
+
+    orders = []
+    for chunk in chunked(sorted(set(criteria.order_ids))):
+        orders.extend(tuple(row) for row in db.execute(query.where(Order.id.in_(chunk))).all())
+    return orders
+
+
+def _purge_targets(order_ids: List[int], order_numbers: List[str]) -> list:
+    """一块订单在各表中的删除条件，按外键顺序（子表在前）排列"""
+    split_ids = select(Split.__table__.c.id).where(Split.__table__.c.order_number.in_(order_numbers))
+    production_ids = select(Production.__table__.c.id).where(Production.__table__.c.order_id.in_(order_ids))
+    return [
+        (Progress.__table__, Progress.__table__.c.order_id.in_(order_ids)),
+        (SplitProgress.__table__, SplitProgress.__table__.c.split_id.in_(split_ids)),
+        (Split.__table__, Split.__table__.c.order_number.in_(order_numbers)),
+        (ProductionProgress.__table__, ProductionProgress.__table__.c.production_id.in_(production_ids)),
+        (Production.__table__, Production.__table__.c.order_id.in_(order_ids)),
+        (OrderTimeline.__table__, OrderTimeline.__table__.c.order_number.in_(order_numbers)),
+        (Order.__table__, Order.__table__.c.id.in_(order_ids)),
+    ]
+
+
+def purge_orders(
+    db: Session,
+    criteria: OrderPurgeRequest,
+    chunk_size: int = PURGE_CHUNK_SIZE,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    批量删除订单及其关联数据
+
+    Args:
+        db: 数据库会话
+        criteria: 清理条件
+        chunk_size: 每个事务处理的订单数
+        dry_run: 只统计将删除的行数，不写入
+
+    Returns:
+        Dict[str, int]: {表名: 删除（dry_run 时为将删除）的行数}
+
+    Raises:
+        ValueError: 未指定任何清理条件
+    """
+    orders = _matched_orders(db, criteria)
+    counts = {table.name: 0 for table, _ in _purge_targets([], [])}
+
+    try:
+        for chunk in chunked(orders, chunk_size):
+            order_ids = [order_id for order_id, _ in chunk]
+            order_numbers = [order_number for _, order_number in chunk]
+            # 在会话的连接上直接执行，不经过会话的快照失效钩子，快照在本块内一并删除
+            connection = db.connection()
+            for table, condition in _purge_targets(order_ids, order_numbers):
+                if dry_run:
+                    counts[table.name] += connection.execute(
+                        select(func.count()).select_from(table).where(condition)).scalar()
+                else:
+                    counts[table.name] += connection.execute(delete(table).where(condition)).rowcount
+
+            if not dry_run:
+                db.commit()
+                etag_cache.invalidate(order_numbers)
+    except Exception:
+        db.rollback()
+        raise
+
+    return counts
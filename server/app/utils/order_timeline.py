@@ -0,0 +1,445 @@
+"""
+订单时间线快照
+
+小程序订单详情需要综合设计、拆单、生产三个表的数据。这里把详情预先计算为快照
+（order_timelines 表），详情接口直接读取快照，并通过 ETag 支持 304 响应：
+
+- 订单、拆单、生产及其进度数据在应用会话（AppSession）中变更时（包括 query.update/delete
+  和按主键的批量插入/更新/删除），在同一事务内删除对应订单的快照，下次访问时重新生成
+- 快照中的设计周期、下单天数与当天日期相关，快照生成日期不是今天时重新生成
+- 进程内缓存各订单最新的 ETag，If-None-Match 命中时无需访问数据库；
+  多进程部署时其他进程的缓存依赖过期时间（ORDER_TIMELINE_ETAG_TTL）失效
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.database import AppSession
+from app.models.order import Order
+from app.models.progress import Progress
+from app.models.split import Split
+from app.models.production import Production
+from app.models.split_progress import SplitProgress
+from app.models.production_progress import ProductionProgress
+from app.models.order_timeline import OrderTimeline
+from app.utils.batch import chunked
+from app.utils.dates import days_between, today, today_str
+from app.utils.scheduler import calculate_design_cycle_days
+
+# 带有 order_number 字段、变更后需要刷新快照的模型
+_TRACKED_MODELS = (Order, Split, Production, SplitProgress, ProductionProgress)
+
+# 会话中待失效的订单编号（提交后清理进程内 ETag 缓存）
+_SESSION_INFO_KEY = "order_timeline_invalidated"
+
+
+class TimelineEtagCache:
+    """进程内的订单快照 ETag 缓存"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[str, str, float]] = {}
+
+    def get(self, order_number: str) -> Optional[str]:
+        """获取订单当天快照的 ETag，没有或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(order_number)
+            if not entry:
+                return None
+            etag, snapshot_date, expires_at = entry
+            if snapshot_date != today_str() or expires_at < time.monotonic():
+                self._entries.pop(order_number, None)
+                return None
+            return etag
+
+    def set(self, order_number: str, etag: str, snapshot_date: str):
+        with self._lock:
+            self._entries[order_number] = (etag, snapshot_date, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, order_numbers: Iterable[str]):
+        with self._lock:
+            for order_number in order_numbers:
+                self._entries.pop(order_number, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+etag_cache = TimelineEtagCache(settings.ORDER_TIMELINE_ETAG_TTL)
+
+
+def compute_etag(payload: dict) -> str:
+    """根据快照内容计算 ETag"""
+    content = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def build_order_timeline(db: Session, order_number: str) -> Optional[dict]:
+    """综合设计、拆单、生产三个表生成订单详情，订单不存在时返回 None"""
+    result = {}
+    split = None
+    production = None
+    
+    # 1. 查询设计表
+    order = db.query(Order).options(
+        joinedload(Order.progresses)
+    ).filter(Order.order_number == order_number).first()
+    
+    if order:
+        # 处理设计过程
+        design_process_items = []
+        if order.progresses:
+            sorted_progresses = sorted(
+                order.progresses, key=lambda p: p.created_at, reverse=True)
+            for p in sorted_progresses:
+                planned = p.planned_date if p.planned_date else "-"
+                actual = p.actual_date if p.actual_date else "-"
+                design_process_items.append(f"{p.task_item}:{planned}:{actual}")
+            design_process = ",".join(design_process_items)
+        else:
+            design_process = "暂无进度"
+        
+        calculated_design_cycle = str(calculate_design_cycle_days(
+            order.assignment_date, 
+            order.order_date, 
+            order.order_status
+        ))
+        
+        result['order_info'] = {
+            'order_number': order.order_number,
+            'order_status': order.order_status,
+            'customer_name': order.customer_name,
+            'address': order.address,
+            'order_type': order.order_type,
+            'category_name': order.category_name,
+            'is_installation': order.is_installation,
+            'designer': order.designer,
+            'salesperson': order.salesperson,
+            'cabinet_area': float(order.cabinet_area) if order.cabinet_area else None,
+            'wall_panel_area': float(order.wall_panel_area) if order.wall_panel_area else None,
+            'order_amount': float(order.order_amount) if order.order_amount else None,
+            'assignment_date': order.assignment_date
+        }
+        
+        result['design_progress'] = {
+            'order_date': order.order_date,
+            'design_cycle': calculated_design_cycle,
+            'design_process': design_process,
+            'design_remarks': order.remarks,
+        }
+    
+    # 2. 查询拆单表
+    split = db.query(Split).options(
+        joinedload(Split.progress_items)
+    ).filter(Split.order_number == order_number).first()
+    
+    if split:
+        if not result.get('order_info'):
+            result['order_info'] = {}
+        result['order_info']['splitter'] = split.splitter
+        result['order_info']['quote_status'] = split.quote_status
+        
+        # 处理拆单进度
+        internal_items = []
+        external_items = []
+        for item in split.progress_items:
+            item_data = {
+                'category_name': item.category_name,
+                'planned_date': item.planned_date,
+                'split_date': item.split_date if item.item_type.value == 'internal' else None,
+                'purchase_date': item.purchase_date if item.item_type.value == 'external' else None,
+                'cycle_days': item.cycle_days,
+                'status': item.status,
+                'remarks': item.remarks
+            }
+            if item.item_type.value == 'internal':
+                internal_items.append(item_data)
+            else:
+                external_items.append(item_data)
+        
+        result['split_progress'] = {
+            'order_date': split.order_date,
+            'completion_date': split.completion_date,
+            'internal_items': internal_items,
+            'external_items': external_items,
+            'split_remarks': split.remarks,
+        }
+    
+    # 3. 查询生产表
+    production = db.query(Production).options(
+        joinedload(Production.progress_items)
+    ).filter(Production.order_number == order_number).first()
+    
+    if production:
+        # 处理生产进度
+        production_progress_items = []
+        finished_goods_quantity = []  # 成品入库数量
+        for item in production.progress_items:
+            # 如果是厂内项，给名称后面添加"材料"
+            category_name = item.category_name
+            category_name_internal = category_name
+            if item.item_type.value == 'internal' and category_name:
+                category_name_internal = f"{category_name}材料"
+            
+            item_data = {
+                'category_name': category_name_internal,
+                'item_type': item.item_type.value,
+                'order_date': item.order_date,
+                'expected_material_date': item.expected_material_date if item.item_type.value == 'internal' else None,
+                'actual_storage_date': item.actual_storage_date if item.item_type.value == 'internal' else None,
+                'storage_time': item.storage_time if item.item_type.value == 'internal' else None,
+                'quantity': item.quantity if item.item_type.value == 'internal' else None,
+                'expected_arrival_date': item.expected_arrival_date if item.item_type.value == 'external' else None,
+                'actual_arrival_date': item.actual_arrival_date if item.item_type.value == 'external' else None
+            }
+            production_progress_items.append(item_data)
+            
+            # 生成成品入库数量信息：参考PC端逻辑，对所有 internal 和 external 类型都处理
+            if item.item_type.value == 'internal' or item.item_type.value == 'external':
+                finished_goods_quantity.append({
+                    'category_name': category_name,
+                    'quantity': item.quantity
+                })
+        
+        # 计算下单天数（从拆单下单日期到当前）
+        order_days = None
+        if production.split_order_date:
+            days = days_between(today(), production.split_order_date)
+            order_days = str(days) if days is not None else None
+        
+        result['production_progress'] = {
+            'customer_payment_date': production.customer_payment_date,
+            'split_order_date': production.split_order_date,
+            'order_days': order_days,
+            'expected_delivery_date': production.expected_delivery_date,
+            'purchase_status': production.order_status,  # 采购状态使用订单状态字段
+            'storage_count': len([item for item in production.progress_items if item.item_type.value == 'internal' and item.actual_storage_date]),
+            'material_count': len(production.progress_items),
+            'cutting_date': production.cutting_date,
+            'expected_shipping_date': production.expected_shipping_date,
+            'progress_items': production_progress_items,
+            'finished_goods_quantity': finished_goods_quantity,
+            'actual_delivery_date': production.actual_delivery_date,
+            "board_18": production.board_18,
+            "board_09": production.board_09,
+            "production_remarks": production.remarks,
+        }
+    
+    # 动态获取订单状态并添加前缀（与列表页逻辑一致）
+    if result.get('order_info'):
+        final_order_status = result['order_info'].get('order_status', '')
+        progress_prefix = "设计"  # 默认前缀
+        
+        # 如果设计阶段状态是"已下单"，查看拆单表的状态
+        if final_order_status == "已下单" and split:
+            # 如果拆单状态也是"已下单"，查看生产表的状态
+            if split.order_status == "已下单":
+                if production:
+                    final_order_status = production.order_status
+                    progress_prefix = "生产"
+                else:
+                    final_order_status = split.order_status
+                    progress_prefix = "拆单"
+            else:
+                final_order_status = split.order_status
+                progress_prefix = "拆单"
+        elif production:
+            # 如果有生产进度，说明已进入生产阶段
+            final_order_status = production.order_status
+            progress_prefix = "生产"
+        elif split:
+            # 如果有拆单进度，说明已进入拆单阶段
+            final_order_status = split.order_status
+            progress_prefix = "拆单"
+        
+        # 添加进度前缀
+        if final_order_status and not final_order_status.startswith(('设计-', '拆单-', '生产-')):
+            final_order_status = f"{progress_prefix}-{final_order_status}"
+            result['order_info']['order_status'] = final_order_status
+
+    return result or None
+
+
+def get_order_timeline(db: Session, order_number: str) -> Optional[Tuple[dict, str]]:
+    """
+    获取订单详情快照
+
+    快照不存在或不是今天生成的，重新生成并保存
+
+    Returns:
+        Optional[Tuple[dict, str]]: (详情数据, ETag)，订单不存在时返回 None
+    """
+    current_date = today_str()
+    timeline = db.query(OrderTimeline).filter(
+        OrderTimeline.order_number == order_number
+    ).first()
+    if timeline and timeline.snapshot_date == current_date:
+        etag_cache.set(order_number, timeline.etag, current_date)
+        return timeline.payload, timeline.etag
+
+    payload = build_order_timeline(db, order_number)
+    if payload is None:
+        return None
+
+    etag = compute_etag(payload)
+    try:
+        if timeline:
+            timeline.payload = payload
+            timeline.etag = etag
+            timeline.snapshot_date = current_date
+        else:
+            db.add(OrderTimeline(
+                order_number=order_number,
+                payload=payload,
+                etag=etag,
+                snapshot_date=current_date
+            ))
+        db.commit()
+    except Exception:
+        # 并发生成或快照刚被失效时保存失败，不影响本次返回，下次访问重新生成
+        db.rollback()
+
+    etag_cache.set(order_number, etag, current_date)
+    return payload, etag
+
+
+def _invalidate(session: Session, order_numbers: set, order_ids: set):
+    """在当前事务中删除订单快照，并记录待清理的 ETag 缓存"""
+    connection = session.connection()
+    for chunk in chunked(list(order_ids)):
+        order_numbers.update(connection.execute(
+            select(Order.order_number).where(Order.id.in_(chunk))
+        ).scalars())
+    order_numbers.discard(None)
+    if not order_numbers:
+        return
+
+    for chunk in chunked(list(order_numbers)):
+        connection.execute(
+            delete(OrderTimeline.__table__).where(OrderTimeline.__table__.c.order_number.in_(chunk))
+        )
+    session.info.setdefault(_SESSION_INFO_KEY, set()).update(order_numbers)
+
+
+@event.listens_for(AppSession, "before_flush")
+def _load_order_keys(session: Session, flush_context, instances):
+    """flush前确保变更记录的订单编号/订单ID已加载（记录可能已过期），flush后只读取已加载的值"""
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _TRACKED_MODELS):
+            obj.order_number
+        elif isinstance(obj, Progress):
+            obj.order_id
+
+
+def _loaded_values(obj, attr: str) -> set:
+    """记录中已加载的字段值（含本次修改前的旧值），不触发数据库查询"""
+    state = inspect(obj)
+    values = set(state.attrs[attr].history.deleted or ())
+    values.add(state.dict.get(attr))
+    return values
+
+
+@event.listens_for(AppSession, "after_flush")
+def _invalidate_flushed(session: Session, flush_context):
+    """会话flush时，删除变更记录所属订单的快照"""
+    order_numbers = set()
+    order_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _TRACKED_MODELS):
+            # 订单编号被修改时，旧编号的快照同样失效
+            order_numbers.update(_loaded_values(obj, "order_number"))
+        elif isinstance(obj, Progress):
+            order_ids.update(_loaded_values(obj, "order_id"))
+    order_ids.discard(None)
+    order_numbers.discard(None)
+    if order_numbers or order_ids:
+        _invalidate(session, order_numbers, order_ids)
+
+
+# 表 -> 模型：session.execute(update(表)/delete(表)) 等 Core 语句没有 bind_mapper，按表识别
+_TABLE_MODELS = {model.__table__: model for model in (*_TRACKED_MODELS, Progress)}
+
+
+def _bulk_entity(orm_execute_state):
+    """批量语句操作的需跟踪的模型，其他表返回 None"""
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        entity = mapper.class_
+    else:
+        entity = _TABLE_MODELS.get(getattr(orm_execute_state.statement, "table", None))
+    if entity in _TRACKED_MODELS or entity is Progress:
+        return entity
+    return None
+
+
+@event.listens_for(AppSession, "do_orm_execute")
+def _invalidate_bulk(orm_execute_state):
+    """
+    不经过flush的批量语句，执行前确定受影响的订单并删除快照：
+
+    - 带多组参数的语句（批量插入，按主键批量更新/删除）：按各行参数中的订单编号/订单ID，
+      以及主键 id 对应记录当前所属的订单失效；参数中没有这些字段（如进度计数的回写）时不失效
+    - 其他 update/delete（query.update()/delete() 等）：按语句的条件查出受影响的订单编号
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    entity = _bulk_entity(orm_execute_state)
+    if entity is None:
+        return
+
+    session = orm_execute_state.session
+    rows = orm_execute_state.parameters
+    if isinstance(rows, dict):
+        rows = [rows] if orm_execute_state.is_insert else None
+    if rows:
+        key = "order_id" if entity is Progress else "order_number"
+        values = {row.get(key) for row in rows}
+        row_ids = {row["id"] for row in rows if row.get("id") is not None}
+        if row_ids and not orm_execute_state.is_insert:
+            # 按主键更新/删除：修改前的所属订单同样失效
+            column = Progress.order_id if entity is Progress else entity.order_number
+            connection = session.connection()
+            for chunk in chunked(list(row_ids)):
+                values.update(connection.execute(select(column).where(entity.id.in_(chunk))).scalars())
+        values.discard(None)
+        if values:
+            if entity is Progress:
+                _invalidate(session, set(), values)
+            else:
+                _invalidate(session, values, set())
+        return
+    if orm_execute_state.is_insert:
+        return
+
+    if entity in _TRACKED_MODELS:
+        affected = select(entity.order_number)
+    else:
+        affected = select(Order.order_number).join(Progress, Progress.order_id == Order.id)
+
+    # 没有条件的 update/delete 作用于整张表，受影响的就是表中全部记录所属的订单
+    whereclause = orm_execute_state.statement.whereclause
+    if whereclause is not None:
+        affected = affected.where(whereclause)
+    order_numbers = set(session.execute(affected).scalars())
+    _invalidate(session, order_numbers, set())
+
+
+@event.listens_for(AppSession, "after_commit")
+def _clear_committed_etags(session: Session):
+    order_numbers = session.info.pop(_SESSION_INFO_KEY, None)
+    if order_numbers:
+        etag_cache.invalidate(order_numbers)
+
+
+@event.listens_for(AppSession, "after_rollback")
+def _discard_rolled_back(session: Session):
+    session.info.pop(_SESSION_INFO_KEY, None)
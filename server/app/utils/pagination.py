@@ -0,0 +1,143 @@
+"""
+游标（keyset）分页工具
+
+按排序键记录上一页最后一行的值，下一页用 WHERE 条件直接定位，
+避免 OFFSET 随页数增大而变慢，也不会因为翻页期间新增数据而重复或漏掉记录
+"""
+
+import base64
+import json
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.utils.dates import parse_iso_date
+
+
+def cursor_str(value: Any) -> str:
+    """字符串排序键的游标值"""
+    if not isinstance(value, str):
+        raise ValueError("无效的分页游标")
+    return value
+
+
+def cursor_int(value: Any) -> int:
+    """整数排序键的游标值"""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("无效的分页游标")
+    return value
+
+
+def cursor_date(value: Any) -> str:
+    """日期排序键的游标值，规范化为 'YYYY-MM-DD'"""
+    try:
+        parsed = parse_iso_date(value) if isinstance(value, str) else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError("无效的分页游标")
+    return parsed.isoformat()
+
+
+class SortKey(NamedTuple):
+    """排序键"""
+    column: Any
+    descending: bool = True
+    # 可为空的排序键，空值排在最后（只允许第一个排序键可为空）
+    nullable: bool = False
+    # 游标值的解析函数（cursor_str / cursor_int / cursor_date），值类型不符时抛出 ValueError
+    parser: Callable[[Any], Any] = cursor_str
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """将排序键的值编码为游标"""
+    content = json.dumps(values, ensure_ascii=False, default=str)
+    return base64.urlsafe_b64encode(content.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, keys: List[SortKey]) -> List[Any]:
+    """解析游标并按排序键校验各个值，格式或类型不正确时抛出 ValueError"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        raise ValueError("无效的分页游标")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("无效的分页游标")
+    return [
+        None if value is None and key.nullable else key.parser(value)
+        for key, value in zip(keys, values)
+    ]
+
+
+def keyset_order_by(keys: List[SortKey]) -> list:
+    """排序键对应的 ORDER BY 子句"""
+    clauses = []
+    for key in keys:
+        clause = key.column.desc() if key.descending else key.column.asc()
+        if key.nullable:
+            clause = clause.nulls_last()
+        clauses.append(clause)
+    return clauses
+
+
+def _beyond(key: SortKey, value):
+    return key.column < value if key.descending else key.column > value
+
+
+def _after_non_null(keys: List[SortKey], values: List[Any]):
+    """非空排序键的字典序“在游标之后”条件"""
+    key, value = keys[0], values[0]
+    if len(keys) == 1:
+        return _beyond(key, value)
+    return or_(
+        _beyond(key, value),
+        and_(key.column == value, _after_non_null(keys[1:], values[1:]))
+    )
+
+
+def keyset_after(keys: List[SortKey], values: List[Any]):
+    """位于游标所在行之后的记录的筛选条件"""
+    first, first_value = keys[0], values[0]
+    rest = _after_non_null(keys[1:], values[1:]) if len(keys) > 1 else None
+
+    if not first.nullable:
+        return _after_non_null(keys, values)
+
+    # 空值排在最后：游标在空值区间时只在空值中继续，否则空值都在游标之后
+    if first_value is None:
+        conditions = [first.column.is_(None)]
+        if rest is not None:
+            conditions.append(rest)
+        return and_(*conditions)
+
+    tie = and_(first.column == first_value, rest) if rest is not None else None
+    conditions = [_beyond(first, first_value), first.column.is_(None)]
+    if tie is not None:
+        conditions.insert(1, tie)
+    return or_(*conditions)
+
+
+def paginate_by_cursor(query, keys: List[SortKey], cursor: Optional[str], page_size: int) -> Tuple[list, Optional[str]]:
+    """
+    游标分页
+
+    Args:
+        query: 已应用筛选条件的查询（原有排序会被替换为排序键）
+        keys: 排序键，最后一个必须能唯一确定一行
+        cursor: 上一页返回的游标，为空时查询第一页
+        page_size: 每页数量
+
+    Returns:
+        Tuple[list, Optional[str]]: (当前页记录, 下一页游标)，没有下一页时游标为 None
+    """
+    if cursor:
+        query = query.filter(keyset_after(keys, decode_cursor(cursor, keys)))
+
+    # 多取一行判断是否还有下一页
+    rows = query.order_by(None).order_by(*keyset_order_by(keys)).limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.column.key) for key in keys])
@@ -3,10 +3,14 @@
 根据生产进度数据自动判断并更新生产状态
 """
 
+import logging
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.models.production import Production
 from app.models.production_progress import ProductionProgress, ItemType
+from app.utils.batch import chunked
+
+logger = logging.getLogger(__name__)
 
 
 class ProductionStatusValidator:
@@ -23,17 +27,21 @@ class ProductionStatusValidator:
     }
     
     @classmethod
-    def validate_and_update_status(cls, db: Session, production_id: int) -> str:
+    def validate_and_update_status(cls, db: Session, production_id: int, commit: bool = True) -> str:
         """
         校验并更新生产状态
         
         Args:
             db: 数据库会话
             production_id: 生产记录ID
+            commit: 状态有变化时是否立即提交；为 False 时只写入会话，由调用方与其他修改一并提交
             
         Returns:
             str: 更新后的状态
         """
+        # 先写入会话中未刷新的进度变更，保证按最新数据计算
+        db.flush()
+
         # 获取生产记录
         production = db.query(Production).filter(Production.id == production_id).first()
         if not production:
@@ -50,10 +58,82 @@ class ProductionStatusValidator:
         # 更新状态（如果有变化）
         if production.order_status != new_status:
             production.order_status = new_status
-            db.commit()
+            if commit:
+                db.commit()
         
         return new_status
     
+    @classmethod
+    def bulk_validate_and_update_status(cls, db: Session, production_ids: Optional[List[int]] = None,
+                                        batch_size: int = 1000, dry_run: bool = False) -> Dict[int, str]:
+        """
+        批量校验并更新生产状态（单个事务）
+
+        每批生产记录只查询两次（生产记录、进度项），状态计算规则与 _calculate_status 相同，
+        最后按目标状态分组执行 UPDATE，统一提交一次
+
+        Args:
+            db: 数据库会话
+            production_ids: 生产记录ID列表，为 None 时校验全表
+            batch_size: 全表校验时每批读取的记录数
+            dry_run: 只计算状态，不写入
+
+        Returns:
+            Dict[int, str]: 生产ID到校验后状态的映射（不存在的ID不包含在内）
+        """
+        # 先写入会话中未刷新的进度变更，保证按最新数据计算
+        db.flush()
+
+        results: Dict[int, str] = {}
+        changes: Dict[str, List[int]] = {}
+        for productions in cls._iter_production_batches(db, production_ids, batch_size):
+            progress_map: Dict[int, list] = {}
+            progress_rows = db.query(
+                ProductionProgress.production_id,
+                ProductionProgress.item_type,
+                ProductionProgress.storage_time,
+                ProductionProgress.actual_storage_date
+            ).filter(
+                ProductionProgress.production_id.in_([production.id for production in productions])
+            ).all()
+            for item in progress_rows:
+                progress_map.setdefault(item.production_id, []).append(item)
+
+            for production in productions:
+                new_status = cls._calculate_status(production, progress_map.get(production.id, []))
+                results[production.id] = new_status
+                if production.order_status != new_status:
+                    changes.setdefault(new_status, []).append(production.id)
+
+        if dry_run:
+            return results
+
+        for new_status, ids in changes.items():
+            for chunk in chunked(ids):
+                db.query(Production).filter(Production.id.in_(chunk)).update(
+                    {Production.order_status: new_status}, synchronize_session="evaluate"
+                )
+        db.commit()
+        return results
+
+    @classmethod
+    def _iter_production_batches(cls, db: Session, production_ids: Optional[List[int]], batch_size: int):
+        """按批读取状态计算需要的生产记录字段"""
+        columns = (Production.id, Production.order_status, Production.actual_delivery_date, Production.cutting_date)
+        if production_ids is not None:
+            for chunk in chunked(list(dict.fromkeys(production_ids))):
+                yield db.query(*columns).filter(Production.id.in_(chunk)).all()
+            return
+
+        last_id = 0
+        while True:
+            rows = db.query(*columns).filter(Production.id > last_id).order_by(Production.id).limit(batch_size).all()
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1].id
+
     @classmethod
     def _calculate_status(cls, production: Production, progress_items: List[ProductionProgress]) -> str:
         """
@@ -116,18 +196,19 @@ class ProductionStatusValidator:
         return status1 if priority1 >= priority2 else status2
 
 
-def validate_production_status(db: Session, production_id: int) -> str:
+def validate_production_status(db: Session, production_id: int, commit: bool = True) -> str:
     """
     便捷函数：校验并更新生产状态
     
     Args:
         db: 数据库会话
         production_id: 生产记录ID
+        commit: 状态有变化时是否立即提交
         
     Returns:
         str: 更新后的状态
     """
-    return ProductionStatusValidator.validate_and_update_status(db, production_id)
+    return ProductionStatusValidator.validate_and_update_status(db, production_id, commit=commit)
 
 
 def batch_validate_production_status(db: Session, production_ids: List[int]) -> Dict[int, str]:
@@ -139,16 +220,13 @@ def batch_validate_production_status(db: Session, production_ids: List[int]) ->
         production_ids: 生产记录ID列表
         
     Returns:
-        Dict[int, str]: 生产ID到状态的映射
+        Dict[int, str]: 生产ID到状态的映射，不存在的记录为"校验失败"
     """
+    statuses = ProductionStatusValidator.bulk_validate_and_update_status(db, production_ids)
     results = {}
     for production_id in production_ids:
-        try:
-            status = ProductionStatusValidator.validate_and_update_status(db, production_id)
-            results[production_id] = status
-        except Exception as e:
-            # 记录错误但继续处理其他记录
-            print(f"校验生产状态失败 (ID: {production_id}): {e}")
-            results[production_id] = "校验失败"
+        if production_id not in statuses:
+            logger.warning(f"校验生产状态失败 (ID: {production_id}): 生产记录不存在")
+        results[production_id] = statuses.get(production_id, "校验失败")
     
-    return results
\ No newline at end of file
+    return results
@@ -1,6 +1,11 @@
-from datetime import datetime
+from datetime import date
+from typing import List, Optional, Sequence
 import logging
 
+from sqlalchemy import Date, Integer, and_, case, cast, func, literal
+
+from app.utils.dates import parse_date, today as current_date, today_str
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -9,6 +14,42 @@ logger = logging.getLogger(__name__)
 scheduler = None
 
 
+def calculate_design_cycle_days_batch(assignment_dates: Sequence[Optional[str]],
+                                      order_dates: Sequence[Optional[str]],
+                                      order_statuses: Sequence[Optional[str]],
+                                      today: Optional[date] = None) -> List[int]:
+    """
+    批量计算设计周期（天数），规则与 calculate_design_cycle_days 一致
+
+    当前日期只取一次，日期解析使用带缓存的 parse_date，适合列表接口一次计算整页订单
+
+    Args:
+        assignment_dates: 分单日期列表，格式为 'YYYY-MM-DD'，元素可以为 None
+        order_dates: 下单日期列表，格式为 'YYYY-MM-DD'，元素可以为 None
+        order_statuses: 订单状态列表
+        today: 当前日期，默认取请求的当前日期
+
+    Returns:
+        List[int]: 与输入顺序一致的设计周期天数，最少为1天
+    """
+    today = today or current_date()
+    results = []
+    for assignment_date, order_date, order_status in zip(assignment_dates, order_dates, order_statuses):
+        assignment = parse_date(assignment_date)
+        if assignment is None:
+            # 没有分单日期或格式错误
+            results.append(1)
+            continue
+
+        end = today
+        # 如果是已下单状态且有下单日期，计算下单日期减去分单日期（格式错误时回退到当前日期）
+        if order_status == "已下单" and order_date:
+            end = parse_date(order_date) or today
+        # 确保至少返回1天
+        results.append(max(1, (end - assignment).days))
+    return results
+
+
 def calculate_design_cycle_days(assignment_date: str, order_date: str = None, order_status: str = None) -> int:
     """
     计算设计周期（天数）
@@ -21,28 +62,47 @@ def calculate_design_cycle_days(assignment_date: str, order_date: str = None, or
     Returns:
         int: 设计周期天数，最少为1天
     """
-    if assignment_date is None:
-        return 1
+    return calculate_design_cycle_days_batch([assignment_date], [order_date], [order_status])[0]
 
-    try:
-        assignment = datetime.strptime(assignment_date, '%Y-%m-%d')
-        
-        # 如果是已下单状态且有下单日期，计算下单日期减去分单日期
-        if order_status == "已下单" and order_date:
-            try:
-                order_dt = datetime.strptime(order_date, '%Y-%m-%d')
-                days = (order_dt - assignment).days
-                return max(1, days)
-            except ValueError as e:
-                logger.error(f"下单日期格式错误: {order_date}, 错误: {e}")
-                # 如果下单日期格式错误，回退到当前日期计算
-                pass
-        
-        # 其他情况计算当前日期减去分单日期
-        today = datetime.now()
-        days = (today - assignment).days
-        # 确保至少返回1天
-        return max(1, days)
-    except ValueError as e:
-        logger.error(f"分单日期格式错误: {assignment_date}, 错误: {e}")
-        return 1
+
+def _days_between(end, start, dialect_name: str):
+    """SQL表达式：两个日期之间相差的天数（end - start）"""
+    if dialect_name == "postgresql":
+        return cast(end, Date) - cast(start, Date)
+    if dialect_name == "mysql":
+        return func.datediff(end, start)
+    return cast(func.julianday(end) - func.julianday(start), Integer)
+
+
+def design_cycle_days_expression(assignment_date, order_date, order_status, dialect_name: str, today: str = None):
+    """
+    构建设计周期（天数）的SQL表达式，规则与 calculate_design_cycle_days 一致，
+    使筛选、计数和分页都可以在数据库中完成
+
+    Args:
+        assignment_date: 分单日期列（DATE类型）
+        order_date: 下单日期列（DATE类型）
+        order_status: 订单状态列
+        dialect_name: 数据库方言名称（sqlite / postgresql / mysql）
+        today: 当前日期，格式为 'YYYY-MM-DD'，默认取请求的当前日期
+
+    Returns:
+        设计周期天数的SQL表达式，最少为1天
+    """
+    today = today or today_str()
+
+    # 已下单且有下单日期：下单日期 - 分单日期；否则：当前日期 - 分单日期
+    days = case(
+        (
+            and_(order_status == "已下单", order_date.isnot(None)),
+            _days_between(order_date, assignment_date, dialect_name)
+        ),
+        else_=_days_between(literal(today), assignment_date, dialect_name)
+    )
+
+    # 没有分单日期时为1天，其余情况确保至少1天
+    return case(
+        (assignment_date.is_(None), 1),
+        (days < 1, 1),
+        else_=days
+    )
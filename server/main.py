@@ -3,12 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 import os
+import anyio
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import engine, create_tables, create_initial_data
 from app.models import Base, User, UserRole
 from app.api.v1.api import api_router
+from app.utils.dates import RequestTodayMiddleware
 # 定时任务调度器已移除，拆单周期改为动态计算
 
 
@@ -18,6 +20,11 @@ async def lifespan(app: FastAPI):
     # 启动时执行
     print("🚀 启动订单管理系统后端服务...")
 
+    # 按执行方式设置同步接口线程池大小
+    worker_threads = settings.get_worker_threads()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = worker_threads
+    print(f"✅ 接口执行方式: {settings.EXECUTION_MODE}，线程数: {worker_threads}")
+
     # 创建数据库表
     try:
         create_tables()
@@ -77,6 +84,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 每个请求固定当前日期，同一响应内的周期计算使用同一天
+app.add_middleware(RequestTodayMiddleware)
+
 # 注册API路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
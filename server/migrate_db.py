@@ -9,8 +9,8 @@ python migrate_db.py
 
 import sys
 import os
+import re
 from pathlib import Path
-from datetime import datetime
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
@@ -18,6 +18,8 @@ sys.path.insert(0, str(project_root))
 
 from app.core.database import SessionLocal, engine
 from app.models import Base
+from app.models.types import parse_iso_date
+from app.utils.completion import COUNTER_FIELDS, rebuild_completion_counters
 from sqlalchemy import text, inspect
 import logging
 
@@ -28,6 +30,104 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 迁移为原生 DATE 类型的日期字段
+DATE_COLUMNS = {
+    'orders': ['assignment_date', 'order_date'],
+    'progresses': ['planned_date', 'actual_date'],
+    'splits': ['order_date', 'actual_payment_date', 'completion_date'],
+    'split_progress': ['planned_date', 'split_date', 'purchase_date'],
+    'productions': [
+        'customer_payment_date', 'split_order_date', 'expected_delivery_date',
+        'actual_delivery_date', 'cutting_date', 'expected_shipping_date'
+    ],
+    'production_progress': [
+        'order_date', 'expected_material_date', 'actual_storage_date',
+        'expected_arrival_date', 'actual_arrival_date'
+    ],
+}
+
+# 非空的日期字段
+NOT_NULL_DATE_COLUMNS = {('orders', 'assignment_date'), ('progresses', 'planned_date')}
+
+# 数据回填每批处理的行数
+MIGRATION_BATCH_SIZE = 1000
+
+# 列表筛选和排序使用的B-tree索引（与模型 __table_args__ 保持一致）
+LIST_BTREE_INDEXES = [
+    ('ix_orders_status_assignment_date', 'orders', ['order_status', 'assignment_date']),
+    ('ix_splits_status_order_date', 'splits', ['order_status', 'order_date']),
+    ('ix_productions_status_shipping_date', 'productions', ['order_status', 'expected_shipping_date']),
+    ('ix_progresses_order_planned_date', 'progresses', ['order_id', 'planned_date']),
+    ('ix_split_progress_category_type', 'split_progress', ['category_name', 'item_type', 'split_id']),
+    ('ix_production_progress_category_type', 'production_progress', ['category_name', 'item_type', 'production_id']),
+]
+
+# 默认排序使用的索引，仅PostgreSQL：
+# SQLite 无法估计 '%关键字%' 的选择性，有这些索引时会按排序索引逐行回表，模糊搜索反而变慢
+LIST_SORT_INDEXES = [
+    ('ix_orders_assignment_date', 'orders', ['assignment_date']),
+    ('ix_splits_order_date_number', 'splits', ['order_date', 'order_number']),
+    ('ix_productions_shipping_date_number', 'productions', ['expected_shipping_date', 'order_number']),
+]
+
+# 模糊搜索（LIKE/ILIKE '%关键字%'）使用的trigram索引，仅PostgreSQL
+LIST_TRIGRAM_INDEXES = {
+    'orders': ['order_number', 'customer_name', 'designer', 'salesperson'],
+    'splits': ['order_number', 'customer_name', 'designer', 'salesperson', 'splitter'],
+    'productions': ['order_number', 'customer_name', 'splitter'],
+}
+
+
+def _list_filter_index_statements(dialect_name: str, drop: bool = False):
+    """生成列表筛选索引的建立/删除语句"""
+    statements = []
+    concurrently = "CONCURRENTLY " if dialect_name == 'postgresql' else ""
+    btree_indexes = LIST_BTREE_INDEXES + (LIST_SORT_INDEXES if dialect_name == 'postgresql' else [])
+    for name, table_name, columns in btree_indexes:
+        if drop:
+            statements.append(f"DROP INDEX {concurrently}IF EXISTS {name}")
+        else:
+            statements.append(
+                f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table_name} ({', '.join(columns)})"
+            )
+    if dialect_name == 'postgresql':
+        for table_name, columns in LIST_TRIGRAM_INDEXES.items():
+            for column in columns:
+                name = f"ix_{table_name}_{column}_trgm"
+                if drop:
+                    statements.append(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                else:
+                    statements.append(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                        f"ON {table_name} USING gin ({column} gin_trgm_ops)"
+                    )
+    return statements
+
+
+def create_list_filter_indexes(bind_engine):
+    """
+    建立列表筛选索引
+
+    PostgreSQL 使用 CREATE INDEX CONCURRENTLY，建索引期间不阻塞读写；
+    SQLite 不支持trigram索引，只建立状态+日期的组合B-tree索引，
+    '%关键字%' 形式的模糊搜索仍需扫描
+    """
+    dialect_name = bind_engine.dialect.name
+    # CONCURRENTLY 不能在事务中执行，使用自动提交连接
+    with bind_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if dialect_name == 'postgresql':
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for statement in _list_filter_index_statements(dialect_name):
+            conn.execute(text(statement))
+            logger.info(f"✅ {statement}")
+
+
+def drop_list_filter_indexes(bind_engine):
+    """删除列表筛选索引（用于基准测试对比）"""
+    with bind_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for statement in _list_filter_index_statements(bind_engine.dialect.name, drop=True):
+            conn.execute(text(statement))
+
 
 class DatabaseMigrator:
     """数据库迁移器"""
@@ -271,6 +371,240 @@ class DatabaseMigrator:
         
         self.record_migration(version, description)
     
+    def _is_date_column(self, table_name: str, column_name: str) -> bool:
+        """检查列是否已经是 DATE 类型"""
+        for col in inspect(engine).get_columns(table_name):
+            if col['name'] == column_name:
+                return str(col['type']).upper() == 'DATE'
+        return False
+    
+    def _backfill_dates(self, table_name: str, source: str, target: str,
+                        only_missing: bool = False, commit: bool = True) -> int:
+        """
+        按主键分批把 source 列的日期字符串规范化为 'YYYY-MM-DD' 写入 target 列
+        
+        无法解析的值写入 NULL 并记录日志。每批单独提交，避免长事务锁表。
+        only_missing 时只处理 target 为空而 source 不为空的行（影子列迁移的增量补齐）。
+        
+        Returns:
+            int: 无法解析的值的数量
+        """
+        last_id = 0
+        invalid_count = 0
+        condition = f"AND {target} IS NULL AND {source} IS NOT NULL" if only_missing else ""
+        while True:
+            rows = self.db.execute(
+                text(f"SELECT id, {source} FROM {table_name} "
+                     f"WHERE id > :last_id {condition} ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": MIGRATION_BATCH_SIZE}
+            ).fetchall()
+            if not rows:
+                break
+            
+            updates = []
+            for row_id, value in rows:
+                try:
+                    parsed = parse_iso_date(value)
+                except ValueError:
+                    logger.warning(f"⚠️  无法解析的日期 {table_name}.{source} id={row_id}: {value!r}，置为空")
+                    invalid_count += 1
+                    parsed = None
+                normalized = parsed.isoformat() if parsed else None
+                if source != target or normalized != value:
+                    updates.append({"id": row_id, "value": normalized})
+            
+            if updates:
+                self.db.execute(
+                    text(f"UPDATE {table_name} SET {target} = :value WHERE id = :id"),
+                    updates
+                )
+            if commit:
+                self.db.commit()
+            last_id = rows[-1][0]
+        return invalid_count
+    
+    def _postgresql_column_definition(self, table_name: str, column_name: str) -> dict:
+        """读取列上的默认值、非空约束、注释，以及引用该列的约束和索引，用于替换列后重建"""
+        params = {"table": table_name, "column": column_name}
+        column = self.db.execute(text(
+            "SELECT a.attnum, a.attnotnull, pg_get_expr(d.adbin, d.adrelid), col_description(a.attrelid, a.attnum) "
+            "FROM pg_attribute a LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum "
+            "WHERE a.attrelid = CAST(:table AS regclass) AND a.attname = :column AND NOT a.attisdropped"
+        ), params).one()
+        params["attnum"] = column[0]
+        params["pattern"] = rf"\m{column_name}\M"
+        # 非空约束单独处理（PostgreSQL 18 起非空约束也出现在 pg_constraint 中）
+        constraints = self.db.execute(text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND :attnum = ANY(conkey) AND contype <> 'n'"
+        ), params).fetchall()
+        # 约束自带的索引随约束重建，这里只取独立索引（含表达式索引和部分索引）
+        indexes = self.db.execute(text(
+            "SELECT c.relname, pg_get_indexdef(ix.indexrelid) FROM pg_index ix "
+            "JOIN pg_class c ON c.oid = ix.indexrelid "
+            "WHERE ix.indrelid = CAST(:table AS regclass) "
+            "AND (:attnum = ANY(CAST(ix.indkey AS int2[])) "
+            "OR pg_get_expr(ix.indexprs, ix.indrelid) ~ :pattern "
+            "OR pg_get_expr(ix.indpred, ix.indrelid) ~ :pattern) "
+            "AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = ix.indexrelid)"
+        ), params).fetchall()
+        # 字符串默认值去掉原类型的转换，按 DATE 重新解析
+        default = re.sub(r"::(?:character varying|varchar|text)(?:\(\d+\))?$", "", column[2]) if column[2] else None
+        return {
+            "not_null": column[1],
+            "default": default,
+            "comment": column[3],
+            "constraints": constraints,
+            "indexes": indexes,
+        }
+    
+    def _restore_postgresql_column_definition(self, table_name: str, column_name: str, definition: dict):
+        """替换列后恢复默认值、非空约束、约束、索引和注释"""
+        if definition["default"]:
+            self.db.execute(text(
+                f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET DEFAULT {definition['default']}"))
+        if definition["not_null"] or (table_name, column_name) in NOT_NULL_DATE_COLUMNS:
+            has_null = self.db.execute(text(
+                f"SELECT EXISTS (SELECT 1 FROM {table_name} WHERE {column_name} IS NULL)")).scalar()
+            if has_null:
+                logger.warning(f"⚠️  {table_name}.{column_name} 存在无法解析而置空的日期，未恢复非空约束")
+            else:
+                self.db.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET NOT NULL"))
+        for name, constraint_definition in definition["constraints"]:
+            self.db.execute(text(f'ALTER TABLE {table_name} ADD CONSTRAINT "{name}" {constraint_definition}'))
+            logger.info(f"✅ 已重建约束 {name}")
+        for name, index_definition in definition["indexes"]:
+            self.db.execute(text(index_definition))
+            logger.info(f"✅ 已重建索引 {name}")
+        if definition["comment"]:
+            comment = definition["comment"].replace("'", "''")
+            self.db.execute(text(f"COMMENT ON COLUMN {table_name}.{column_name} IS '{comment}'"))
+    
+    def _migrate_date_column_postgresql(self, table_name: str, column_name: str):
+        """
+        PostgreSQL在线迁移：新增影子列并分批回填，最后在短事务内补齐增量并替换原列，
+        避免 ALTER COLUMN TYPE 在整表重写期间长时间持有排他锁
+        
+        回填期间由触发器在原列写入时清空影子列，不论是否经过应用、是否更新 updated_at，
+        变更过的行都会在锁表后的增量补齐中重新回填；替换后按原列定义重建索引、约束、默认值和注释
+        """
+        shadow = f"{column_name}_date_tmp"
+        trigger = f"{table_name}_{shadow}_reset"
+        
+        self.db.execute(text(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {shadow} DATE"))
+        self.db.execute(text(
+            f"CREATE OR REPLACE FUNCTION {trigger}() RETURNS trigger AS $$ "
+            f"BEGIN NEW.{shadow} := NULL; RETURN NEW; END $$ LANGUAGE plpgsql"))
+        self.db.execute(text(f"DROP TRIGGER IF EXISTS {trigger} ON {table_name}"))
+        self.db.execute(text(
+            f"CREATE TRIGGER {trigger} BEFORE INSERT OR UPDATE OF {column_name} ON {table_name} "
+            f"FOR EACH ROW EXECUTE PROCEDURE {trigger}()"))
+        self.db.commit()
+        self._backfill_dates(table_name, column_name, shadow)
+        
+        # 锁表后补齐回填期间新增或修改的行，再替换原列
+        self.db.execute(text(f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE"))
+        self._backfill_dates(table_name, column_name, shadow, only_missing=True, commit=False)
+        definition = self._postgresql_column_definition(table_name, column_name)
+        self.db.execute(text(f"DROP TRIGGER {trigger} ON {table_name}"))
+        self.db.execute(text(f"DROP FUNCTION {trigger}()"))
+        self.db.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {column_name}"))
+        self.db.execute(text(f"ALTER TABLE {table_name} RENAME COLUMN {shadow} TO {column_name}"))
+        self._restore_postgresql_column_definition(table_name, column_name, definition)
+        self.db.commit()
+    
+    def run_migration_v1_0_7(self):
+        """迁移 v1.0.7: 日期字段从字符串改为原生DATE类型"""
+        version = "v1.0.7"
+        description = "日期字段从VARCHAR改为DATE类型，并规范化历史数据为YYYY-MM-DD"
+        
+        if self.is_migration_applied(version):
+            logger.info(f"⏭️  迁移 {version} 已应用")
+            return
+        
+        logger.info(f"🔄 应用迁移 {version}: {description}")
+        
+        dialect_name = engine.dialect.name
+        for table_name, columns in DATE_COLUMNS.items():
+            if not self.table_exists(table_name):
+                continue
+            for column_name in columns:
+                if not self.column_exists(table_name, column_name):
+                    continue
+                try:
+                    if dialect_name == 'postgresql':
+                        if self._is_date_column(table_name, column_name):
+                            logger.info(f"⏭️  列已是DATE类型 {table_name}.{column_name}")
+                            continue
+                        self._migrate_date_column_postgresql(table_name, column_name)
+                    else:
+                        # 先原地规范化数据
+                        self._backfill_dates(table_name, column_name, column_name)
+                        if dialect_name == 'mysql':
+                            null_sql = "NOT NULL" if (table_name, column_name) in NOT_NULL_DATE_COLUMNS else "NULL"
+                            self.db.execute(text(f"ALTER TABLE {table_name} MODIFY COLUMN {column_name} DATE {null_sql}"))
+                            self.db.commit()
+                        # SQLite 的 DATE 以 'YYYY-MM-DD' 文本存储，规范化数据即可
+                    logger.info(f"✅ 日期字段迁移完成 {table_name}.{column_name}")
+                except Exception as e:
+                    logger.error(f"❌ 日期字段迁移失败 {table_name}.{column_name}: {e}")
+                    self.db.rollback()
+                    raise
+        
+        self.record_migration(version, description)
+    
+    def run_migration_v1_0_8(self):
+        """迁移 v1.0.8: 添加列表筛选和排序索引"""
+        version = "v1.0.8"
+        description = "添加列表筛选和排序索引（PostgreSQL额外添加trigram索引）"
+        
+        if self.is_migration_applied(version):
+            logger.info(f"⏭️  迁移 {version} 已应用")
+            return
+        
+        logger.info(f"🔄 应用迁移 {version}: {description}")
+        
+        if engine.dialect.name == 'mysql':
+            logger.info("⏭️  MySQL 暂不支持该索引方案，跳过")
+        else:
+            try:
+                create_list_filter_indexes(engine)
+            except Exception as e:
+                logger.error(f"❌ 添加索引失败: {e}")
+                raise
+        
+        self.record_migration(version, description)
+    
+    def run_migration_v1_0_9(self):
+        """迁移 v1.0.9: 拆单/生产表添加进度完成计数字段"""
+        version = "v1.0.9"
+        description = "splits/productions 添加 total_items、completed_internal_items、completed_external_items 并回填"
+        
+        if self.is_migration_applied(version):
+            logger.info(f"⏭️  迁移 {version} 已应用")
+            return
+        
+        logger.info(f"🔄 应用迁移 {version}: {description}")
+        
+        try:
+            for table_name in ('splits', 'productions'):
+                if not self.table_exists(table_name):
+                    continue
+                for column_name in COUNTER_FIELDS:
+                    # 常量默认值在 PostgreSQL 11+ 上只修改元数据，不重写整表
+                    self.add_column_if_not_exists(table_name, f"{column_name} INTEGER NOT NULL DEFAULT 0")
+            
+            if self.table_exists('splits') and self.table_exists('productions'):
+                result = rebuild_completion_counters(self.db, batch_size=MIGRATION_BATCH_SIZE)
+                for table_name, (checked, fixed) in result.items():
+                    logger.info(f"✅ 回填计数 {table_name}: 检查 {checked} 条，更新 {fixed} 条")
+        except Exception as e:
+            logger.error(f"❌ 添加计数字段失败: {e}")
+            self.db.rollback()
+            raise
+        
+        self.record_migration(version, description)
+    
     def run_all_migrations(self):
         """运行所有迁移"""
         logger.info("🚀 开始数据库迁移...")
@@ -286,6 +620,9 @@ class DatabaseMigrator:
             self.run_migration_v1_0_4,
             self.run_migration_v1_0_5,
             self.run_migration_v1_0_6,
+            self.run_migration_v1_0_7,
+            self.run_migration_v1_0_8,
+            self.run_migration_v1_0_9,
             # 在这里添加新的迁移方法
         ]
         
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+接口并发基准测试：并行发起列表和详情请求，统计不同并发度下的吞吐量。
+
+数据库相关接口在线程池中执行后，吞吐量应随并发度提升，而不是被单个慢查询串行阻塞。
+
+使用方法（需先启动服务）：
+python server/scripts/benchmark_concurrency.py --base-url http://localhost:8000/api/v1 --requests 200 --concurrency 1,4,8,16
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def build_calls(base_url: str):
+    """构造一组列表和详情请求，详情ID取自列表结果"""
+    session = requests.Session()
+    calls = [
+        ("POST", f"{base_url}/orders/list", {"page": 1, "page_size": 20}),
+        ("POST", f"{base_url}/splits/list", {"page": 1, "page_size": 20}),
+        ("POST", f"{base_url}/productions/list", {"page": 1, "page_size": 20}),
+        ("POST", f"{base_url}/miniprogram-orders/list", {"page": 1, "page_size": 20}),
+    ]
+
+    orders = session.post(f"{base_url}/orders/list", json={"page": 1, "page_size": 5}).json()
+    for item in orders.get("items", []):
+        calls.append(("GET", f"{base_url}/orders/{item['id']}", None))
+        calls.append(("GET", f"{base_url}/miniprogram-orders/detail/{item['order_number']}", None))
+
+    splits = session.post(f"{base_url}/splits/list", json={"page": 1, "page_size": 5}).json()
+    for item in splits.get("items", []):
+        calls.append(("GET", f"{base_url}/splits/{item['id']}", None))
+
+    return calls
+
+
+def run_level(calls, total_requests: int, concurrency: int):
+    """以指定并发度执行请求，返回 (吞吐量, 延迟列表)"""
+    latencies = []
+    # requests.Session 不是线程安全的，每个工作线程使用自己的会话和连接
+    local = threading.local()
+
+    def do_call(index: int):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        method, url, payload = calls[index % len(calls)]
+        start = time.perf_counter()
+        response = local.session.request(method, url, json=payload, timeout=60)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency in executor.map(do_call, range(total_requests)):
+            latencies.append(latency)
+    elapsed = time.perf_counter() - start
+    return total_requests / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表/详情接口并发吞吐量基准测试")
+    parser.add_argument('--base-url', default='http://localhost:8000/api/v1', help='API基础地址')
+    parser.add_argument('--requests', type=int, default=200, help='每个并发度的请求总数')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='并发度列表，逗号分隔')
+    args = parser.parse_args()
+
+    calls = build_calls(args.base_url.rstrip('/'))
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+
+    print(f"请求组合: {len(calls)} 个接口，每个并发度 {args.requests} 次请求")
+    print(f"{'并发度':>6} {'吞吐量(req/s)':>14} {'p50(ms)':>10} {'p95(ms)':>10}")
+    baseline = None
+    for level in levels:
+        throughput, latencies = run_level(calls, args.requests, level)
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        baseline = baseline or throughput
+        print(f"{level:>6} {throughput:>14.1f} {p50:>10.1f} {p95:>10.1f}  (x{throughput / baseline:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+设计周期计算微基准：对比逐条 strptime 的原实现与 calculate_design_cycle_days_batch。
+
+使用方法：
+python server/scripts/benchmark_design_cycle.py [--rows 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.dates import _parse_date_text  # noqa: E402
+from app.utils.scheduler import calculate_design_cycle_days_batch  # noqa: E402
+
+ORDER_STATUSES = ["进行中", "已下单", "暂停", "撤销中"]
+
+
+def legacy_calculate_design_cycle_days(assignment_date, order_date=None, order_status=None):
+    """原逐条计算实现（每次调用都解析日期、读取当前时间）"""
+    if assignment_date is None:
+        return 1
+    try:
+        assignment = datetime.strptime(assignment_date, '%Y-%m-%d')
+        if order_status == "已下单" and order_date:
+            try:
+                order_dt = datetime.strptime(order_date, '%Y-%m-%d')
+                return max(1, (order_dt - assignment).days)
+            except ValueError:
+                pass
+        return max(1, (datetime.now() - assignment).days)
+    except ValueError:
+        return 1
+
+
+def make_rows(count: int):
+    """生成模拟数据：日期分布在约三年内，与真实订单一样大量重复"""
+    rnd = random.Random(42)
+    base = date(2022, 1, 1)
+    assignment_dates, order_dates, statuses = [], [], []
+    for _ in range(count):
+        assignment = base + timedelta(days=rnd.randint(0, 1000))
+        assignment_dates.append(assignment.isoformat())
+        order_dates.append((assignment + timedelta(days=rnd.randint(1, 60))).isoformat() if rnd.random() < 0.7 else None)
+        statuses.append(rnd.choice(ORDER_STATUSES))
+    return assignment_dates, order_dates, statuses
+
+
+def measure(func, repeat: int) -> float:
+    """返回多次执行的中位耗时（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        # 每次都从空缓存开始，模拟单个请求
+        _parse_date_text.cache_clear()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="设计周期计算微基准")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="行数")
+    parser.add_argument("--repeat", type=int, default=5, help="每种实现执行次数")
+    args = parser.parse_args()
+
+    print(f"{'行数':>8}{'逐条计算':>14}{'批量计算':>14}{'加速比':>10}")
+    for count in args.rows:
+        assignment_dates, order_dates, statuses = make_rows(count)
+
+        legacy = [
+            legacy_calculate_design_cycle_days(a, o, s)
+            for a, o, s in zip(assignment_dates, order_dates, statuses)
+        ]
+        assert legacy == calculate_design_cycle_days_batch(assignment_dates, order_dates, statuses)
+
+        legacy_ms = measure(lambda: [
+            legacy_calculate_design_cycle_days(a, o, s)
+            for a, o, s in zip(assignment_dates, order_dates, statuses)
+        ], args.repeat)
+        batch_ms = measure(lambda: calculate_design_cycle_days_batch(
+            assignment_dates, order_dates, statuses
+        ), args.repeat)
+        print(f"{count:>8}{legacy_ms:>12.1f}ms{batch_ms:>12.1f}ms{legacy_ms / batch_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 引擎配置基准：多线程并发读写订单表，对比原引擎配置与各 SQLITE_PROFILE 的吞吐量。
+
+- legacy：原配置（仅 check_same_thread=False，连接池参数照搬 PostgreSQL，不执行 PRAGMA）
+- default / production / durable：create_db_engine 的各配置方案
+
+使用方法：
+python server/scripts/benchmark_sqlite_profile.py [--rows 20000] [--threads 8] [--seconds 5] [--write-ratio 0.2]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import SQLITE_PROFILES, create_db_engine  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.models.order import Order  # noqa: E402
+
+STATUSES = ["进行中", "已下单", "暂停", "量尺", "报价"]
+
+
+def legacy_engine(database_url: str):
+    """改造前 app/core/database.py 中的引擎配置"""
+    return create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+
+def seed(engine, rows: int):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Order), [
+            {
+                "order_number": f"BM{i:07d}",
+                "customer_name": f"客户{i}",
+                "address": "地址",
+                "assignment_date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                "category_name": "柜体",
+                "order_type": "设计单",
+                "order_status": STATUSES[i % len(STATUSES)],
+            }
+            for i in range(rows)
+        ])
+
+
+def run_workload(engine, rows: int, threads: int, seconds: float, write_ratio: float) -> dict:
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed_value: int):
+        rnd = random.Random(seed_value)
+        reads = writes = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                if rnd.random() < write_ratio:
+                    with engine.begin() as conn:
+                        conn.execute(
+                            update(Order)
+                            .where(Order.id == rnd.randint(1, rows))
+                            .values(remarks=f"备注{rnd.random()}")
+                        )
+                    writes += 1
+                else:
+                    with engine.connect() as conn:
+                        conn.execute(
+                            select(Order.id, Order.order_number, Order.customer_name)
+                            .where(Order.order_status == rnd.choice(STATUSES))
+                            .order_by(Order.assignment_date.desc())
+                            .limit(20)
+                        ).all()
+                    reads += 1
+            except OperationalError:
+                # database is locked
+                errors += 1
+        with lock:
+            counters["reads"] += reads
+            counters["writes"] += writes
+            counters["errors"] += errors
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 引擎配置并发读写基准")
+    parser.add_argument("--rows", type=int, default=20000, help="订单数量")
+    parser.add_argument("--threads", type=int, default=8, help="并发线程数")
+    parser.add_argument("--seconds", type=float, default=5, help="每种配置的运行秒数")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="写操作占比")
+    parser.add_argument("--profiles", nargs="+", default=["legacy", *SQLITE_PROFILES], help="参与对比的配置")
+    args = parser.parse_args()
+
+    print(f"{'配置':<12}{'读/秒':>10}{'写/秒':>10}{'锁冲突':>10}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = f"sqlite:///{Path(directory) / 'benchmark.db'}"
+            if profile == "legacy":
+                engine = legacy_engine(database_url)
+            else:
+                engine = create_db_engine(database_url, sqlite_profile=profile)
+            engine.echo = False
+            seed(engine, args.rows)
+            counters = run_workload(engine, args.rows, args.threads, args.seconds, args.write_ratio)
+            engine.dispose()
+
+        print(
+            f"{profile:<12}{counters['reads'] / args.seconds:>10.0f}"
+            f"{counters['writes'] / args.seconds:>10.0f}{counters['errors']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
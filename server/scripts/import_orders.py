@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入订单（CSV、XLSX 或 JSON Lines），规则与 POST /api/v1/orders/import 一致。
+
+使用方法：
+python server/scripts/import_orders.py orders.csv [--database-url sqlite:///./order_system.db] [--chunk-size 1000] [--dry-run] [--errors errors.csv]
+
+默认使用 .env / 环境变量中配置的数据库。
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import AppSession, SessionLocal  # noqa: E402
+from app.utils.order_import import IMPORT_CHUNK_SIZE, import_orders, iter_import_rows  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导入订单")
+    parser.add_argument("file", help="导入文件（.csv / .xlsx / .jsonl）")
+    parser.add_argument("--database-url", default=None, help="数据库连接，默认使用配置中的数据库")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="每个事务写入的行数")
+    parser.add_argument("--dry-run", action="store_true", help="只校验不写入")
+    parser.add_argument("--errors", default=None, help="失败行报告输出文件（CSV）")
+    args = parser.parse_args()
+
+    path = Path(args.file)
+    if args.database_url:
+        session = sessionmaker(class_=AppSession, bind=create_engine(args.database_url))()
+    else:
+        session = SessionLocal()
+
+    try:
+        rows = iter_import_rows(path.read_bytes(), path.name)
+        report = import_orders(session, rows, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"导入失败: {e}")
+        sys.exit(1)
+    finally:
+        session.close()
+
+    result = report.to_dict()
+    action = "可导入" if args.dry_run else "已导入"
+    print(
+        f"共 {result['total_rows']} 行，{action}订单 {result['created_orders']} 条"
+        f"（拆单 {result['created_splits']} 条，拆单进度 {result['created_split_progress']} 条），"
+        f"失败 {result['failed_rows']} 行，耗时 {result['elapsed_seconds']}s，"
+        f"{result['rows_per_second'] or 0} 行/秒"
+    )
+
+    if args.errors and report.errors:
+        with open(args.errors, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=["row", "order_number", "error"])
+            writer.writeheader()
+            writer.writerows(report.errors)
+        print(f"失败行已写入 {args.errors}")
+    else:
+        for error in report.errors[:20]:
+            print(f"  第{error['row']}行 {error['order_number'] or ''}: {error['error']}")
+        if len(report.errors) > 20:
+            print(f"  ……其余 {len(report.errors) - 20} 行请使用 --errors 导出")
+
+
+if __name__ == "__main__":
+    main()
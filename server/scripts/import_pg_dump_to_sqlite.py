@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-将从 PostgreSQL 导出的 pg_dump --inserts 文件导入到本地 SQLite 数据库。
+将从 PostgreSQL 导出的 pg_dump 文件导入到本地 SQLite 数据库。
 
 使用方法：
-python server/scripts/import_pg_dump_to_sqlite.py --dump ../pg_dump.sql --db ../order_system.db [--reset]
+python server/scripts/import_pg_dump_to_sqlite.py --dump ../pg_dump.sql --db ../order_system.db [--reset] [--mode bulk|statements] [--batch-size 10000]
+
+导入模式：
+- bulk（默认）：支持 COPY 格式（pg_dump 默认输出）和 --inserts / --column-inserts / --data-only 输出。
+  逐行解析数据，按表分批 executemany 写入；导入期间关闭同步写盘、日志放在内存中，
+  先删除普通索引，数据写完后再重建；最后按表输出行数和每秒行数
+- statements：逐条执行 INSERT 语句（原导入方式），仅支持 --inserts 输出
 
 默认：
 - dump 路径：server/pg_dump.sql
@@ -15,7 +21,9 @@ import argparse
 import os
 import re
 import sys
+import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy import create_engine, text
 
 
@@ -104,11 +112,307 @@ def import_dump_to_sqlite(dump_path: Path, sqlite_db_path: Path):
     print(f"✅ 导入完成：总语句 {total_statements}，成功 {applied_statements}，跳过 {skipped_statements}")
 
 
+# COPY public.orders (id, order_number, ...) FROM stdin;
+COPY_HEADER = re.compile(
+    r'^COPY\s+(?:"?\w+"?\.)?"?(\w+)"?\s*\(([^)]*)\)\s+FROM\s+stdin;', re.IGNORECASE)
+
+# INSERT INTO public.orders (id, order_number, ...) VALUES (...), (...);
+INSERT_HEADER = re.compile(
+    r'^INSERT\s+INTO\s+(?:"?\w+"?\.)?"?(\w+)"?\s*(?:\(([^)]*)\))?\s*VALUES\s*', re.IGNORECASE)
+
+# COPY 文本格式的反斜杠转义
+COPY_ESCAPE = re.compile(r'\\(?:x([0-9a-fA-F]{1,2})|([0-7]{1,3})|(.))')
+COPY_ESCAPE_CHARS = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+# INSERT 语句中的值：字符串（可带 E 前缀和 ::类型 转换）、NULL、true/false、数字
+SQL_VALUE = re.compile(
+    r"\s*(?:(E?)'([^']*(?:''[^']*)*)'|(NULL)|(true|false)|([-+0-9.eE]+))(?:::[\w\s\[\]\"]+?)?\s*(?=[,)])",
+    re.IGNORECASE)
+
+
+def _copy_unescape(match) -> str:
+    hex_code, octal_code, char = match.groups()
+    if hex_code:
+        return chr(int(hex_code, 16))
+    if octal_code:
+        return chr(int(octal_code, 8))
+    return COPY_ESCAPE_CHARS.get(char, char)
+
+
+def parse_copy_row(line: str) -> List[Optional[str]]:
+    """解析 COPY 文本格式的一行：制表符分隔，\\N 为空值"""
+    values = []
+    for field in line.split("\t"):
+        if field == "\\N":
+            values.append(None)
+        elif "\\" in field:
+            values.append(COPY_ESCAPE.sub(_copy_unescape, field))
+        else:
+            values.append(field)
+    return values
+
+
+def parse_insert_rows(values_text: str) -> List[list]:
+    """解析 INSERT 语句 VALUES 之后的部分，返回各行的值"""
+    rows = []
+    position = 0
+    length = len(values_text)
+    while position < length:
+        char = values_text[position]
+        if char in " \t\r\n,;":
+            position += 1
+            continue
+        if char != "(":
+            raise ValueError(f"无法解析的 VALUES: {values_text[position:position + 50]}")
+        position += 1
+        row = []
+        while True:
+            match = SQL_VALUE.match(values_text, position)
+            if not match:
+                raise ValueError(f"无法解析的值: {values_text[position:position + 50]}")
+            escape_prefix, string_value, null_value, bool_value, number_value = match.groups()
+            if string_value is not None:
+                value = string_value.replace("''", "'")
+                if escape_prefix:
+                    value = COPY_ESCAPE.sub(_copy_unescape, value)
+                row.append(value)
+            elif null_value:
+                row.append(None)
+            elif bool_value:
+                row.append(1 if bool_value.lower() == "true" else 0)
+            else:
+                row.append(number_value)
+            position = match.end()
+            if values_text[position] == ",":
+                position += 1
+                continue
+            position += 1  # 右括号
+            break
+        rows.append(row)
+    return rows
+
+
+def _split_columns(columns_text: Optional[str]) -> Optional[List[str]]:
+    if not columns_text:
+        return None
+    return [column.strip().strip('"') for column in columns_text.split(",")]
+
+
+class BulkLoader:
+    """按表分批写入 SQLite，并统计各表行数和耗时"""
+
+    def __init__(self, conn, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.stats: Dict[str, List[float]] = {}
+        self.failed_rows = 0
+        self._table_columns: Dict[str, Optional[Tuple[List[str], set]]] = {}
+        self._dropped_indexes: List[Tuple[str, str]] = []
+        self._table = None
+        self._source_columns = None
+        self._sql = None
+        self._keep = None
+        self._bool_indexes = ()
+        self._rows: List[list] = []
+        self._column_count = 0
+        self._started = 0.0
+
+    def _columns(self, table: str) -> Optional[Tuple[List[str], set]]:
+        """SQLite 中的表结构：（列名列表, 布尔列名集合），表不存在时返回 None，首次访问时删除该表的普通索引"""
+        if table not in self._table_columns:
+            info = self.conn.exec_driver_sql(f'PRAGMA table_info("{table}")').fetchall()
+            if not info:
+                print(f"⚠️ SQLite 中不存在表 {table}，跳过其数据")
+                self._table_columns[table] = None
+            else:
+                self._table_columns[table] = (
+                    [row[1] for row in info],
+                    {row[1] for row in info if "BOOL" in (row[2] or "").upper()},
+                )
+                # 普通索引在数据写完后重建（主键和唯一约束的自动索引无法删除）
+                indexes = self.conn.exec_driver_sql(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                    (table,)
+                ).fetchall()
+                for name, sql in indexes:
+                    self.conn.exec_driver_sql(f'DROP INDEX "{name}"')
+                    self._dropped_indexes.append((name, sql))
+        return self._table_columns[table]
+
+    def begin(self, table: str, columns: Optional[List[str]]) -> bool:
+        """开始写入一张表的数据（columns 为空时按 SQLite 表的列顺序），返回该表是否可导入"""
+        if table == self._table and columns == self._source_columns:
+            # 连续的同表 INSERT 语句继续累积到同一批
+            return True
+        self.end()
+
+        table_columns = self._columns(table)
+        if table_columns is None:
+            return False
+        sqlite_columns, bool_columns = table_columns
+        self._table = table
+        self._source_columns = columns
+        columns = columns or sqlite_columns
+        missing = [column for column in columns if column not in sqlite_columns]
+        if missing:
+            print(f"⚠️ 表 {table} 在 SQLite 中缺少列 {', '.join(missing)}，这些列的数据不导入")
+
+        self._column_count = len(columns)
+        self._keep = [index for index, column in enumerate(columns) if column in sqlite_columns]
+        kept = [columns[index] for index in self._keep]
+        self._bool_indexes = [position for position, column in enumerate(kept) if column in bool_columns]
+        self._sql = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+            table, ", ".join(f'"{column}"' for column in kept), ", ".join("?" * len(kept)))
+        self._started = time.perf_counter()
+        self.stats.setdefault(table, [0, 0.0])
+        return True
+
+    def add(self, values: list):
+        if len(values) != self._column_count:
+            self.failed_rows += 1
+            print(f"⚠️ 表 {self._table} 的数据列数不匹配，已跳过: {values[:5]}...")
+            return
+        row = [values[index] for index in self._keep]
+        for index in self._bool_indexes:
+            value = row[index]
+            if value in ("t", "f"):
+                row[index] = 1 if value == "t" else 0
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        # 每批一个保存点：整批失败时回滚该批，再逐行写入，只跳过出错的行
+        self.conn.exec_driver_sql("SAVEPOINT bulk_batch")
+        try:
+            self.conn.exec_driver_sql(self._sql, self._rows)
+            self.stats[self._table][0] += len(self._rows)
+        except Exception:
+            self.conn.exec_driver_sql("ROLLBACK TO bulk_batch")
+            for row in self._rows:
+                try:
+                    self.conn.exec_driver_sql(self._sql, tuple(row))
+                    self.stats[self._table][0] += 1
+                except Exception as e:
+                    self.failed_rows += 1
+                    print(f"⚠️ 表 {self._table} 导入失败，已跳过: {e}\n数据: {str(row)[:200]}...")
+        self.conn.exec_driver_sql("RELEASE bulk_batch")
+        self._rows.clear()
+
+    def end(self):
+        """结束当前表，累计耗时"""
+        if self._table is None:
+            return
+        self.flush()
+        self.stats[self._table][1] += time.perf_counter() - self._started
+        self._table = None
+        self._source_columns = None
+
+    def rebuild_indexes(self) -> float:
+        start = time.perf_counter()
+        for _, sql in self._dropped_indexes:
+            self.conn.exec_driver_sql(sql)
+        return time.perf_counter() - start
+
+
+def _statement_complete(buffer: List[str]) -> bool:
+    """以分号结尾且单引号成对（分号不在字符串中）时语句结束"""
+    return buffer[-1].rstrip().endswith(";") and sum(line.count("'") for line in buffer) % 2 == 0
+
+
+def bulk_import_dump_to_sqlite(dump_path: Path, sqlite_db_path: Path, batch_size: int = 10000):
+    if not dump_path.exists():
+        raise FileNotFoundError(f"找不到导出文件: {dump_path}")
+
+    engine = create_engine(f"sqlite:///{sqlite_db_path}")
+    start = time.perf_counter()
+
+    with engine.connect() as conn:
+        # 导入期间不等待写盘、回滚日志放在内存中；外键约束在导入后恢复
+        conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        conn.exec_driver_sql("PRAGMA journal_mode = MEMORY")
+        conn.exec_driver_sql("PRAGMA temp_store = MEMORY")
+        conn.exec_driver_sql("PRAGMA cache_size = -200000")
+
+        loader = BulkLoader(conn, batch_size)
+        # COPY 数据块：None 表示不在块中，True/False 表示块中的数据是否导入
+        copy_block = None
+        buffer: List[str] = []
+
+        with dump_path.open('r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                if copy_block is not None:
+                    line = line.rstrip("\n")
+                    if line == "\\.":
+                        copy_block = None
+                        loader.end()
+                    elif copy_block:
+                        loader.add(parse_copy_row(line))
+                    continue
+
+                if not buffer:
+                    striped = line.strip()
+                    if not striped or striped.startswith('--'):
+                        continue
+                    match = COPY_HEADER.match(striped)
+                    if match:
+                        # 表不在 SQLite 中时仍需读完该 COPY 块
+                        copy_block = loader.begin(match.group(1), _split_columns(match.group(2)))
+                        continue
+
+                buffer.append(line)
+                if not _statement_complete(buffer):
+                    continue
+                statement = "".join(buffer).strip()
+                buffer.clear()
+
+                match = INSERT_HEADER.match(statement)
+                if not match:
+                    # 跳过非数据语句（CREATE/ALTER/SET/SELECT setval 等）
+                    continue
+                if not loader.begin(match.group(1), _split_columns(match.group(2))):
+                    continue
+                try:
+                    rows = parse_insert_rows(statement[match.end():])
+                except ValueError as e:
+                    loader.failed_rows += 1
+                    print(f"⚠️ 解析失败，已跳过: {e}\n语句: {statement[:200]}...")
+                    continue
+                for row in rows:
+                    loader.add(row)
+
+        loader.end()
+        load_seconds = time.perf_counter() - start
+        index_seconds = loader.rebuild_indexes()
+        conn.commit()
+        conn.exec_driver_sql("PRAGMA foreign_keys = ON")
+        conn.exec_driver_sql("PRAGMA synchronous = FULL")
+
+    total_rows = 0
+    print(f"{'表':<24}{'行数':>10}{'耗时':>10}{'行/秒':>12}")
+    for table, (rows, seconds) in loader.stats.items():
+        total_rows += rows
+        rate = rows / seconds if seconds else 0
+        print(f"{table:<24}{rows:>10}{seconds:>9.2f}s{rate:>12.0f}")
+    total_seconds = time.perf_counter() - start
+    print(
+        f"✅ 导入完成：{total_rows} 行，失败 {loader.failed_rows} 行，"
+        f"写入 {load_seconds:.2f}s，重建索引 {index_seconds:.2f}s，"
+        f"共 {total_seconds:.2f}s（{total_rows / total_seconds if total_seconds else 0:.0f} 行/秒）"
+    )
+
+
 def main():
-    parser = argparse.ArgumentParser(description="导入 pg_dump --inserts 到 SQLite")
+    parser = argparse.ArgumentParser(description="导入 pg_dump 导出文件到 SQLite")
     parser.add_argument('--dump', default=str(Path(__file__).resolve().parent.parent / 'pg_dump.sql'), help='pg_dump.sql 路径')
     parser.add_argument('--db', default=str(Path(__file__).resolve().parent.parent / 'order_system.db'), help='SQLite 数据库文件路径')
     parser.add_argument('--reset', action='store_true', help='重置数据库文件并仅初始化表结构（不插入初始数据）')
+    parser.add_argument('--mode', choices=['bulk', 'statements'], default='bulk',
+                        help='bulk：解析 COPY/INSERT 数据后分批写入（默认）；statements：逐条执行 INSERT 语句')
+    parser.add_argument('--batch-size', type=int, default=10000, help='bulk 模式每批写入的行数')
     args = parser.parse_args()
 
     dump_path = Path(args.dump)
@@ -134,7 +438,10 @@ def main():
         if not sqlite_db_path.exists():
             sqlite_db_path.touch()
 
-    import_dump_to_sqlite(dump_path, sqlite_db_path)
+    if args.mode == 'bulk':
+        bulk_import_dump_to_sqlite(dump_path, sqlite_db_path, args.batch_size)
+    else:
+        import_dump_to_sqlite(dump_path, sqlite_db_path)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量清理订单及其关联数据（设计进度、拆单及拆单进度、生产及生产进度、订单详情快照），
+规则与 POST /api/v1/orders/purge 一致。
+
+使用方法：
+python server/scripts/purge_orders.py --status 已撤销 --assignment-date-end 2024-12-31 [--dry-run]
+python server/scripts/purge_orders.py --ids 1 2 3 [--database-url sqlite:///./order_system.db] [--chunk-size 500]
+
+订单ID和筛选条件至少指定一项，同时指定时取交集。默认使用 .env / 环境变量中配置的数据库。
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.schemas.order import OrderPurgeRequest  # noqa: E402
+from app.utils.order_purge import PURGE_CHUNK_SIZE, purge_orders  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量清理订单")
+    parser.add_argument("--ids", type=int, nargs="+", default=None, help="订单ID列表")
+    parser.add_argument("--status", nargs="+", default=None, help="订单状态（可多个）")
+    parser.add_argument("--assignment-date-start", default=None, help="分单日期开始")
+    parser.add_argument("--assignment-date-end", default=None, help="分单日期结束")
+    parser.add_argument("--order-date-start", default=None, help="下单日期开始")
+    parser.add_argument("--order-date-end", default=None, help="下单日期结束")
+    parser.add_argument("--database-url", default=None, help="数据库连接，默认使用配置中的数据库")
+    parser.add_argument("--chunk-size", type=int, default=PURGE_CHUNK_SIZE, help="每个事务删除的订单数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计将删除的行数，不写入")
+    args = parser.parse_args()
+
+    criteria = OrderPurgeRequest(
+        order_ids=args.ids,
+        order_status=args.status,
+        assignment_date_start=args.assignment_date_start,
+        assignment_date_end=args.assignment_date_end,
+        order_date_start=args.order_date_start,
+        order_date_end=args.order_date_end,
+    )
+
+    if args.database_url:
+        session = sessionmaker(bind=create_engine(args.database_url))()
+    else:
+        session = SessionLocal()
+
+    try:
+        counts = purge_orders(session, criteria, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"清理失败: {e}")
+        sys.exit(1)
+    finally:
+        session.close()
+
+    action = "将删除" if args.dry_run else "已删除"
+    for table_name, count in counts.items():
+        print(f"{table_name}: {action} {count} 条")
+
+
+if __name__ == "__main__":
+    main()
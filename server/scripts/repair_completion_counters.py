@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按进度表重新计算拆单/生产记录上的进度完成计数
+（total_items、completed_internal_items、completed_external_items），
+修正直接改库或历史数据导致的不一致。
+
+使用方法：
+python server/scripts/repair_completion_counters.py [--database-url sqlite:///./order_system.db] [--batch-size 1000] [--dry-run]
+
+默认使用 .env / 环境变量中配置的数据库。
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.utils.completion import rebuild_completion_counters  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="修复拆单/生产进度完成计数")
+    parser.add_argument("--database-url", default=None, help="数据库连接，默认使用配置中的数据库")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批处理的记录数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计不一致的记录，不写入")
+    args = parser.parse_args()
+
+    if args.database_url:
+        session = sessionmaker(bind=create_engine(args.database_url))()
+    else:
+        session = SessionLocal()
+
+    try:
+        result = rebuild_completion_counters(session, batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        session.close()
+
+    action = "需要修正" if args.dry_run else "已修正"
+    for table_name, (checked, fixed) in result.items():
+        print(f"{table_name}: 检查 {checked} 条，{action} {fixed} 条")
+
+
+if __name__ == "__main__":
+    main()
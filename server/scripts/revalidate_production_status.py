@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按生产进度重新校验全部生产记录的状态（可配置为每晚定时执行）。
+
+使用方法：
+python server/scripts/revalidate_production_status.py [--database-url sqlite:///./order_system.db] [--batch-size 1000] [--dry-run]
+
+默认使用 .env / 环境变量中配置的数据库。
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import AppSession, SessionLocal  # noqa: E402
+from app.models.production import Production  # noqa: E402
+from app.utils.production_status_validator import ProductionStatusValidator  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重新校验生产状态")
+    parser.add_argument("--database-url", default=None, help="数据库连接，默认使用配置中的数据库")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批校验并提交的生产记录数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计状态变化，不写入")
+    args = parser.parse_args()
+
+    if args.database_url:
+        session = sessionmaker(class_=AppSession, bind=create_engine(args.database_url))()
+    else:
+        session = SessionLocal()
+
+    checked = 0
+    transitions = Counter()
+    start = time.perf_counter()
+    try:
+        # 按ID键集分批：每批只读取本批的原状态，校验后按批提交
+        last_id = 0
+        while True:
+            batch = session.query(Production.id, Production.order_status).filter(
+                Production.id > last_id
+            ).order_by(Production.id).limit(args.batch_size).all()
+            if not batch:
+                break
+            before = dict(batch)
+            statuses = ProductionStatusValidator.bulk_validate_and_update_status(
+                session, production_ids=list(before), dry_run=args.dry_run
+            )
+            checked += len(statuses)
+            transitions.update(
+                (before[production_id], status)
+                for production_id, status in statuses.items()
+                if before[production_id] != status
+            )
+            last_id = batch[-1].id
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+
+    action = "需要更新" if args.dry_run else "已更新"
+    print(f"校验 {checked} 条生产记录，{action} {sum(transitions.values())} 条，耗时 {elapsed:.2f}s")
+    for (old_status, new_status), count in transitions.most_common():
+        print(f"  {old_status} -> {new_status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
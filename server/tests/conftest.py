@@ -0,0 +1,97 @@
+"""
+测试公共夹具
+
+使用内存SQLite数据库运行API，并提供SQL语句计数器用于校验接口的查询次数
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import AppSession, get_db
+from app.models import Base
+from app.api.v1.api import api_router
+from app.utils.cache import category_cache, user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_lookup_caches():
+    """进程内的类目、用户缓存不能跨测试（每个测试的数据库不同）"""
+    for cache in (category_cache, user_cache):
+        cache.clear()
+        cache.reset_stats()
+    yield
+
+
+@pytest.fixture
+def engine():
+    """每个测试使用独立的内存数据库"""
+    test_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def db_session(engine):
+    """数据库会话，用于准备测试数据"""
+    TestingSessionLocal = sessionmaker(class_=AppSession, autocommit=False, autoflush=False, bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(engine):
+    """挂载v1路由的测试客户端，数据库依赖替换为内存数据库"""
+    TestingSessionLocal = sessionmaker(class_=AppSession, autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+class QueryCounter:
+    """统计执行的SQL语句数量"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def query_counter(engine):
+    return QueryCounter(engine)
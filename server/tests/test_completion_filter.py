@@ -0,0 +1,156 @@
+"""拆单/生产列表类目与完成状态筛选测试"""
+
+import pytest
+
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType as SplitItemType
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
+from app.utils.completion import rebuild_completion_counters
+
+# 订单编号 -> [(类目, 是否厂内, 是否完成)]
+CASES = {
+    "A": [("柜体", True, True), ("五金", False, True)],
+    "B": [("柜体", True, True), ("五金", False, False)],
+    "C": [("柜体", True, False)],
+    "D": [],
+    "E": [("五金", False, True)],
+}
+
+FILTERS = [
+    ({"completion_status": "completed"}, {"A", "E"}),
+    ({"completion_status": "incomplete"}, {"B", "C"}),
+    ({"completion_status": "completed", "categories": ["柜体"]}, {"A", "B"}),
+    ({"completion_status": "incomplete", "categories": ["柜体"]}, {"C"}),
+    ({"completion_status": "incomplete", "categories": ["五金"]}, {"B"}),
+    ({"categories": ["五金"]}, {"A", "B", "E"}),
+    ({"completion_status": "unknown", "categories": ["柜体"]}, {"A", "B", "C", "D", "E"}),
+    ({}, {"A", "B", "C", "D", "E"}),
+]
+
+
+def _seed_splits(db):
+    for number, items in CASES.items():
+        split = Split(order_number=number, customer_name="客户", address="测试地址",
+                      order_date="2024-01-01", order_type="设计单", order_status="拆单中")
+        db.add(split)
+        db.flush()
+        for category, internal, done in items:
+            db.add(SplitProgress(
+                split_id=split.id,
+                order_number=number,
+                category_name=category,
+                item_type=SplitItemType.INTERNAL if internal else SplitItemType.EXTERNAL,
+                split_date="2024-01-02" if done and internal else None,
+                purchase_date="2024-01-03" if done and not internal else None,
+            ))
+    db.commit()
+    rebuild_completion_counters(db)
+
+
+def _seed_productions(db):
+    for index, (number, items) in enumerate(CASES.items(), start=1):
+        production = Production(order_id=index, order_number=number, customer_name="客户", order_status="未齐料")
+        db.add(production)
+        db.flush()
+        for category, internal, done in items:
+            db.add(ProductionProgress(
+                production_id=production.id,
+                order_number=number,
+                category_name=category,
+                item_type=ProductionItemType.INTERNAL if internal else ProductionItemType.EXTERNAL,
+                actual_storage_date="2024-01-02" if done and internal else None,
+                actual_arrival_date="2024-01-03" if done and not internal else None,
+            ))
+    db.commit()
+    rebuild_completion_counters(db)
+
+
+@pytest.mark.parametrize("filters,expected", FILTERS)
+def test_split_completion_filter(client, db_session, filters, expected):
+    _seed_splits(db_session)
+    payload = {"no_pagination": True}
+    if "completion_status" in filters:
+        payload["completion_status"] = filters["completion_status"]
+    if "categories" in filters:
+        payload["category_names"] = filters["categories"]
+
+    data = client.post("/api/v1/splits/list", json=payload).json()
+
+    assert {item["order_number"] for item in data["items"]} == expected
+    assert data["total"] == len(expected)
+
+
+@pytest.mark.parametrize("filters,expected", FILTERS)
+def test_production_completion_filter(client, db_session, filters, expected):
+    _seed_productions(db_session)
+    payload = {"page_size": 100}
+    if "completion_status" in filters:
+        payload["completion_status"] = filters["completion_status"]
+    if "categories" in filters:
+        payload["order_category"] = filters["categories"]
+
+    data = client.post("/api/v1/productions/list", json=payload).json()
+
+    assert {item["order_number"] for item in data["data"]} == expected
+    assert data["total"] == len(expected)
+
+
+def _counters(obj):
+    return obj.total_items, obj.completed_internal_items, obj.completed_external_items
+
+
+def test_split_progress_endpoints_maintain_counters(client, db_session):
+    _seed_splits(db_session)
+    split = db_session.query(Split).filter(Split.order_number == "C").one()
+    assert _counters(split) == (1, 0, 0)
+
+    response = client.post(f"/api/v1/split-progress/split/{split.id}/batch", json={
+        "internal_items": {"柜体": {"splitDate": "2024-02-01"}},
+        "external_items": {"五金": {"plannedDate": "2024-02-05"}},
+    })
+    assert response.status_code == 200
+    db_session.expire_all()
+    assert _counters(split) == (2, 1, 0)
+
+    external = db_session.query(SplitProgress).filter(
+        SplitProgress.split_id == split.id, SplitProgress.category_name == "五金").one()
+    assert client.put(f"/api/v1/split-progress/{external.id}", json={"purchase_date": "2024-02-06"}).status_code == 200
+    db_session.expire_all()
+    assert _counters(split) == (2, 1, 1)
+
+    assert client.delete(f"/api/v1/split-progress/{external.id}").status_code == 200
+    db_session.expire_all()
+    assert _counters(split) == (1, 1, 0)
+
+
+def test_production_progress_endpoints_maintain_counters(client, db_session):
+    _seed_productions(db_session)
+    production = db_session.query(Production).filter(Production.order_number == "B").one()
+    assert _counters(production) == (2, 1, 0)
+
+    external = db_session.query(ProductionProgress).filter(
+        ProductionProgress.production_id == production.id, ProductionProgress.category_name == "五金").one()
+    response = client.post(f"/api/v1/production-progress/production/{production.id}/batch", json=[
+        {"id": external.id, "category_name": "五金", "item_type": "external", "actual_arrival_date": "2024-02-01"}
+    ])
+    assert response.status_code == 200
+    db_session.expire_all()
+    assert _counters(production) == (2, 1, 1)
+
+    assert client.delete(f"/api/v1/production-progress/{external.id}").status_code == 200
+    db_session.expire_all()
+    assert _counters(production) == (1, 1, 0)
+
+
+def test_rebuild_repairs_drifted_counters(db_session):
+    _seed_splits(db_session)
+    db_session.query(Split).update({"total_items": 9})
+    db_session.commit()
+
+    assert rebuild_completion_counters(db_session, batch_size=2, dry_run=True)["splits"] == (5, 5)
+    assert rebuild_completion_counters(db_session, batch_size=2)["splits"] == (5, 5)
+    assert rebuild_completion_counters(db_session)["splits"] == (5, 0)
+    db_session.expire_all()
+    split = db_session.query(Split).filter(Split.order_number == "A").one()
+    assert _counters(split) == (2, 1, 1)
@@ -0,0 +1,132 @@
+"""列表接口游标分页测试"""
+
+import pytest
+
+from app.models.order import Order
+from app.models.split import Split
+from app.models.production import Production
+from app.utils.pagination import encode_cursor
+
+
+def _walk(client, url, payload, items_key):
+    """按游标翻页直到最后一页，返回所有订单编号"""
+    numbers = []
+    cursor = None
+    for _ in range(50):
+        response = client.post(url, json={**payload, "cursor_mode": True, "cursor": cursor})
+        assert response.status_code == 200
+        data = response.json()
+        numbers.extend(item["order_number"] for item in data[items_key])
+        cursor = data["next_cursor"]
+        if not cursor:
+            return numbers
+    raise AssertionError("游标分页没有结束")
+
+
+def _seed_orders(db, count, prefix="CO"):
+    for i in range(count):
+        db.add(Order(
+            order_number=f"{prefix}{i:04d}",
+            customer_name=f"客户{i}",
+            address="测试地址",
+            # 多个订单共用同一分单日期，验证按ID区分
+            assignment_date=f"2024-01-{i // 3 + 1:02d}",
+            category_name="柜体",
+            order_type="设计单",
+            order_status="进行中"
+        ))
+    db.commit()
+
+
+def test_order_cursor_pages_match_offset_order(client, db_session, query_counter):
+    _seed_orders(db_session, 11)
+
+    expected = [
+        item["order_number"]
+        for item in client.post("/api/v1/orders/list", json={"no_pagination": True}).json()["items"]
+    ]
+    expected_by_key = [
+        o.order_number for o in db_session.query(Order).order_by(Order.assignment_date.desc(), Order.id.desc())
+    ]
+    assert sorted(expected) == sorted(expected_by_key)
+    assert _walk(client, "/api/v1/orders/list", {"page_size": 4}, "items") == expected_by_key
+
+    # 默认不查询总数，只有一次分页查询
+    with query_counter:
+        data = client.post("/api/v1/orders/list", json={"cursor_mode": True, "page_size": 4}).json()
+    assert data["total"] is None
+    assert query_counter.count == 1
+
+    data = client.post("/api/v1/orders/list", json={
+        "cursor_mode": True, "page_size": 4, "include_total": True
+    }).json()
+    assert data["total"] == 11
+    assert data["total_pages"] == 3
+
+
+def test_order_cursor_is_stable_when_rows_are_inserted(client, db_session):
+    _seed_orders(db_session, 6)
+
+    first = client.post("/api/v1/orders/list", json={"cursor_mode": True, "page_size": 3}).json()
+    # 翻页期间新增一条最新的订单
+    _seed_orders(db_session, 1, prefix="NEW")
+    db_session.query(Order).filter(Order.order_number == "NEW0000").update({"assignment_date": "2025-01-01"})
+    db_session.commit()
+    second = client.post("/api/v1/orders/list", json={
+        "cursor_mode": True, "page_size": 3, "cursor": first["next_cursor"]
+    }).json()
+
+    numbers = [item["order_number"] for item in first["items"] + second["items"]]
+    assert len(numbers) == len(set(numbers)) == 6
+    assert "NEW0000" not in numbers
+
+
+def test_split_cursor_handles_null_dates(client, db_session):
+    for i in range(7):
+        db_session.add(Split(
+            order_number=f"CS{i:04d}",
+            customer_name="客户",
+            address="测试地址",
+            order_date=None if i % 3 == 0 else f"2024-02-{i % 2 + 1:02d}",
+            order_type="设计单",
+            order_status="拆单中"
+        ))
+    db_session.commit()
+
+    numbers = _walk(client, "/api/v1/splits/list", {"page_size": 2}, "items")
+
+    assert numbers == ["CS0005", "CS0001", "CS0004", "CS0002", "CS0006", "CS0003", "CS0000"]
+
+
+def test_production_cursor_follows_requested_sort(client, db_session):
+    for i in range(6):
+        db_session.add(Production(
+            order_id=i + 1,
+            order_number=f"CP{i:04d}",
+            customer_name="客户",
+            expected_shipping_date=None if i == 2 else f"2024-03-{i % 3 + 1:02d}",
+            order_status="未齐料"
+        ))
+    db_session.commit()
+
+    numbers = _walk(client, "/api/v1/productions/list", {
+        "page_size": 2, "sort": "expected_shipping_date", "sort_order": "asc"
+    }, "data")
+
+    assert numbers == ["CP0003", "CP0000", "CP0004", "CP0001", "CP0005", "CP0002"]
+
+
+@pytest.mark.parametrize("path,cursor", [
+    ("/api/v1/orders/list", "not-a-cursor"),
+    ("/api/v1/splits/list", "not-a-cursor"),
+    ("/api/v1/productions/list", "not-a-cursor"),
+    # 格式正确但值类型不符的游标
+    ("/api/v1/orders/list", encode_cursor(["not-a-date", "x"])),
+    ("/api/v1/orders/list", encode_cursor([None, 1])),
+    ("/api/v1/splits/list", encode_cursor(["2024-01-01", "SP0001", "1"])),
+    ("/api/v1/productions/list", encode_cursor([20240101, "CP0001"])),
+])
+def test_invalid_cursor_is_rejected(client, path, cursor):
+    response = client.post(path, json={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "无效的分页游标"
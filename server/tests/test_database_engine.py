@@ -0,0 +1,57 @@
+"""数据库引擎工厂测试"""
+
+import pytest
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.config import Settings
+from app.core.database import create_db_engine
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_sqlite_file_engine_applies_production_profile(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", sqlite_profile="production")
+    try:
+        assert isinstance(engine.pool, QueuePool)
+        assert _pragma(engine, "journal_mode") == "wal"
+        assert _pragma(engine, "synchronous") == 1  # NORMAL
+        assert _pragma(engine, "busy_timeout") == 5000
+        assert _pragma(engine, "cache_size") == -16000
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_default_profile_keeps_sqlite_defaults(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", sqlite_profile="default")
+    try:
+        assert _pragma(engine, "journal_mode") == "delete"
+        assert _pragma(engine, "synchronous") == 2  # FULL
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_memory_engine_shares_one_connection():
+    engine = create_db_engine("sqlite://", sqlite_profile="durable")
+    try:
+        assert isinstance(engine.pool, StaticPool)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE t (id INTEGER)")
+        # 其他连接看到同一个内存库
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT count(*) FROM t").scalar() == 0
+        assert _pragma(engine, "synchronous") == 2
+    finally:
+        engine.dispose()
+
+
+def test_unknown_sqlite_profile_is_rejected():
+    with pytest.raises(ValueError):
+        create_db_engine("sqlite://", sqlite_profile="fast")
+
+
+@pytest.mark.parametrize("mode,expected", [("threadpool", 24), ("serial", 1)])
+def test_execution_mode_selects_worker_threads(mode, expected):
+    assert Settings(EXECUTION_MODE=mode, THREADPOOL_SIZE=24).get_worker_threads() == expected
@@ -0,0 +1,48 @@
+"""日期工具测试"""
+
+from datetime import date, datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils import dates
+from app.utils.dates import RequestTodayMiddleware, days_between, parse_date, today, today_scope, today_str
+
+
+def test_parse_date_formats_and_cache():
+    dates._parse_date_text.cache_clear()
+
+    assert parse_date("2024-01-05") == date(2024, 1, 5)
+    assert parse_date("2024-01-05T10:00:00Z") == date(2024, 1, 5)
+    assert parse_date("2024/1/5") == date(2024, 1, 5)
+    assert parse_date(datetime(2024, 1, 5, 8)) == date(2024, 1, 5)
+    assert parse_date(None) is None
+    assert parse_date("") is None
+    assert parse_date("bad") is None
+
+    parse_date("2024-01-05")
+    assert dates._parse_date_text.cache_info().hits >= 1
+
+    assert days_between("2024-01-10", "2024-01-05") == 5
+    assert days_between("2024-01-10", None) is None
+
+
+def test_today_scope_pins_date():
+    pinned = date(2024, 2, 29)
+    with today_scope(pinned):
+        assert today() == pinned
+        assert today_str() == "2024-02-29"
+    assert today() == date.today()
+
+
+def test_middleware_pins_today_for_sync_endpoints():
+    app = FastAPI()
+    app.add_middleware(RequestTodayMiddleware)
+
+    @app.get("/today")
+    def read_today():
+        # 同步接口在线程池中执行，也能读取到请求固定的日期
+        return {"pinned": dates._request_today.get() is not None, "today": today_str()}
+
+    data = TestClient(app).get("/today").json()
+    assert data == {"pinned": True, "today": date.today().isoformat()}
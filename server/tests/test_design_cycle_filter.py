@@ -0,0 +1,93 @@
+"""订单列表设计周期筛选测试"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.order import Order
+from app.utils.scheduler import calculate_design_cycle_days, calculate_design_cycle_days_batch
+
+
+def _days_ago(days):
+    return (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def _seed_orders(db):
+    samples = [
+        # (分单日期, 下单日期, 状态)
+        (_days_ago(5), None, "进行中"),
+        (_days_ago(20), None, "进行中"),
+        (_days_ago(21), None, "进行中"),
+        (_days_ago(60), None, "进行中"),
+        (_days_ago(100), _days_ago(90), "已下单"),
+        (_days_ago(100), _days_ago(40), "已下单"),
+        (_days_ago(100), "", "已下单"),
+        (_days_ago(10), _days_ago(15), "已下单"),
+        (_days_ago(-3), None, "进行中"),
+    ]
+    for i, (assignment_date, order_date, status) in enumerate(samples):
+        db.add(Order(
+            order_number=f"DC{i:04d}",
+            customer_name=f"客户{i}",
+            address="测试地址",
+            assignment_date=assignment_date,
+            order_date=order_date,
+            category_name="柜体",
+            order_type="设计单",
+            order_status=status
+        ))
+    db.commit()
+
+
+@pytest.mark.parametrize("design_cycle_filter,predicate", [
+    ("lte20", lambda days: days <= 20),
+    ("gt20", lambda days: days > 20),
+    ("lt50", lambda days: days < 50),
+])
+def test_design_cycle_filter_matches_python_rules(client, db_session, design_cycle_filter, predicate):
+    _seed_orders(db_session)
+    expected = sorted(
+        order.order_number
+        for order in db_session.query(Order).all()
+        if predicate(calculate_design_cycle_days(order.assignment_date, order.order_date, order.order_status))
+    )
+
+    response = client.post("/api/v1/orders/list", json={
+        "design_cycle_filter": design_cycle_filter,
+        "no_pagination": True
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == len(expected)
+    assert sorted(item["order_number"] for item in data["items"]) == expected
+
+
+def test_design_cycle_filter_paginates_in_database(client, db_session, query_counter):
+    _seed_orders(db_session)
+
+    with query_counter:
+        response = client.post("/api/v1/orders/list", json={
+            "design_cycle_filter": "gt20",
+            "page": 2,
+            "page_size": 2
+        })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert data["total_pages"] == 2
+    assert len(data["items"]) == 2
+    # 总数查询 + 分页查询
+    assert query_counter.count == 2
+
+
+def test_batch_design_cycle_matches_rules():
+    today = date(2024, 3, 1)
+    assignment_dates = [None, "bad", "2024-02-20", "2024-01-01", "2024-01-10", "2024-01-01", "2024-03-05"]
+    order_dates = [None, None, None, "2024-01-10", "2024-01-01", "bad", None]
+    statuses = ["进行中", "进行中", "进行中", "已下单", "已下单", "已下单", "进行中"]
+
+    assert calculate_design_cycle_days_batch(assignment_dates, order_dates, statuses, today=today) == [
+        1, 1, 10, 9, 1, 60, 1
+    ]
@@ -0,0 +1,121 @@
+"""列表流式导出测试"""
+
+import csv
+import io
+import re
+import zipfile
+
+from app.models.order import Order
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType
+from app.utils.export import iter_query_batches
+
+
+def _seed(db, count=5):
+    for i in range(count):
+        order_number = f"EX{i:04d}"
+        db.add(Order(
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            address="测试地址",
+            assignment_date=f"2024-01-{i + 1:02d}",
+            category_name="柜体",
+            order_type="设计单",
+            order_status="进行中" if i % 2 else "已下单",
+            is_installation=bool(i % 2),
+            remarks="含,逗号\n和换行",
+        ))
+        split = Split(
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            address="测试地址",
+            order_date=f"2024-02-{i + 1:02d}",
+            order_type="设计单",
+            order_status="拆单中"
+        )
+        db.add(split)
+        production = Production(
+            order_id=i + 1,
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            order_status="未齐料",
+            expected_shipping_date=f"2024-03-{i + 1:02d}"
+        )
+        db.add(production)
+        db.flush()
+        db.add(SplitProgress(
+            split_id=split.id, order_number=order_number,
+            item_type=ItemType.INTERNAL, category_name="柜体", split_date="2024-02-20"
+        ))
+        db.add(ProductionProgress(
+            production_id=production.id, order_number=order_number,
+            item_type=ProductionItemType.EXTERNAL, category_name="五金", quantity=2
+        ))
+    db.commit()
+
+
+def _read_csv(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].startswith("attachment; filename*=UTF-8''")
+    assert response.content.startswith(b"\xef\xbb\xbf")
+    return list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+
+
+def test_export_orders_csv_applies_filters(client, db_session):
+    _seed(db_session)
+
+    rows = _read_csv(client.post("/api/v1/orders/export", json={"order_status": ["进行中"], "page_size": 1}))
+
+    header, data = rows[0], rows[1:]
+    assert header[0] == "订单编号"
+    # 导出忽略分页参数，按分单日期降序
+    assert [row[0] for row in data] == ["EX0003", "EX0001"]
+    assert data[0][header.index("是否安装")] == "是"
+    assert data[0][header.index("备注")] == "含,逗号\n和换行"
+    assert data[0][header.index("设计过程")] == "暂无进度"
+
+
+def test_export_splits_and_productions_csv(client, db_session):
+    _seed(db_session)
+
+    split_rows = _read_csv(client.post("/api/v1/splits/export", json={"order_number": "EX000"}))
+    assert len(split_rows) == 6
+    assert split_rows[1][split_rows[0].index("厂内生产项")] == "柜体:2024-02-20:15"
+
+    production_rows = _read_csv(client.post("/api/v1/productions/export", json={
+        "sort": "expected_shipping_date", "sort_order": "asc"
+    }))
+    header = production_rows[0]
+    assert [row[0] for row in production_rows[1:]] == [f"EX{i:04d}" for i in range(5)]
+    assert production_rows[1][header.index("成品入库数量")] == "五金:2"
+
+
+def test_export_orders_xlsx(client, db_session):
+    _seed(db_session)
+
+    response = client.post("/api/v1/orders/export?format=xlsx", json={})
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        assert "xl/workbook.xml" in archive.namelist()
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row ") == 6
+    assert '<c r="A1" t="inlineStr"><is><t xml:space="preserve">订单编号</t></is></c>' in sheet
+    assert re.search(r'<row r="2"><c r="A2" t="inlineStr"><is><t xml:space="preserve">EX0004</t>', sheet)
+
+
+def test_export_rejects_unknown_format(client):
+    response = client.post("/api/v1/orders/export?format=pdf", json={})
+    assert response.status_code == 422
+
+
+def test_iter_query_batches(db_session):
+    _seed(db_session)
+
+    batches = list(iter_query_batches(db_session.query(Order).order_by(Order.id), batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
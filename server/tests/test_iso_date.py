@@ -0,0 +1,82 @@
+"""日期列类型测试"""
+
+from datetime import date, datetime
+
+import pytest
+
+from app.models.order import Order
+from app.models.types import parse_iso_date
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("2024-01-05", date(2024, 1, 5)),
+    ("2024-01-05 10:30:00", date(2024, 1, 5)),
+    ("2024-01-05T10:30:00Z", date(2024, 1, 5)),
+    ("2024/1/5", date(2024, 1, 5)),
+    (datetime(2024, 1, 5, 10, 30), date(2024, 1, 5)),
+    ("", None),
+    (None, None),
+])
+def test_parse_iso_date(value, expected):
+    assert parse_iso_date(value) == expected
+
+
+def test_parse_iso_date_rejects_invalid_value():
+    with pytest.raises(ValueError):
+        parse_iso_date("不是日期")
+
+
+def test_date_columns_round_trip_as_iso_strings(db_session):
+    for i, (assignment_date, order_date) in enumerate([
+        ("2024-01-05", "2024-02-01 09:00:00"),
+        ("2024-03-10", ""),
+    ]):
+        db_session.add(Order(
+            order_number=f"ISO{i}",
+            customer_name="客户",
+            address="测试地址",
+            assignment_date=assignment_date,
+            order_date=order_date,
+            category_name="柜体",
+            order_type="设计单",
+            order_status="进行中"
+        ))
+    db_session.commit()
+    db_session.expire_all()
+
+    orders = db_session.query(Order).filter(
+        Order.assignment_date >= "2024-01-01",
+        Order.assignment_date <= "2024-01-31"
+    ).all()
+    assert [(o.assignment_date, o.order_date) for o in orders] == [("2024-01-05", "2024-02-01")]
+
+    empty = db_session.query(Order).filter(Order.order_date.is_(None)).one()
+    assert empty.order_number == "ISO1"
+
+
+@pytest.mark.parametrize("path,payload", [
+    ("/api/v1/orders/list", {"assignment_date_start": "not-a-date"}),
+    ("/api/v1/splits/list", {"order_date_end": "2024-13-40"}),
+    ("/api/v1/productions/list", {"cutting_date_start": "2024/13/40"}),
+    ("/api/v1/orders/", {
+        "order_number": "ISO9", "customer_name": "客户", "address": "测试地址", "assignment_date": "2024/13/40",
+        "category_name": "柜体", "order_type": "设计单",
+    }),
+])
+def test_invalid_request_dates_are_rejected(client, db_session, path, payload):
+    response = client.post(path, json=payload)
+
+    assert response.status_code == 422
+    assert "日期格式错误" in response.text
+
+
+def test_request_dates_are_normalized(client, db_session):
+    response = client.post("/api/v1/orders/", json={
+        "order_number": "ISO8", "customer_name": "客户", "address": "测试地址", "assignment_date": "2024/1/5",
+        "category_name": "柜体", "order_type": "设计单",
+    })
+
+    assert response.json()["code"] == 200
+    assert db_session.query(Order).one().assignment_date == "2024-01-05"
+    body = client.post("/api/v1/orders/list", json={"assignment_date_start": "2024/1/5"}).json()
+    assert body["total"] == 1
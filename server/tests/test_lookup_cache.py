@@ -0,0 +1,74 @@
+"""类目、用户查询缓存测试"""
+
+from app.models.category import Category, CategoryType
+from app.models.split_progress import SplitProgress, ItemType
+from app.models.user import User, UserRole
+from app.utils.cache import get_user_info
+
+
+def _category_selects(statements):
+    return [statement for statement in statements if "FROM categories" in statement]
+
+
+def _create_order(client, order_number, category_name):
+    response = client.post("/api/v1/orders/", json={
+        "order_number": order_number,
+        "customer_name": "客户",
+        "address": "地址",
+        "assignment_date": "2024-01-01",
+        "category_name": category_name,
+        "order_type": "生产单",
+    })
+    assert response.status_code == 200
+    assert response.json()["code"] == 200
+
+
+def test_category_lookups_are_cached_and_invalidated(client, db_session, query_counter):
+    db_session.add_all([
+        Category(name="柜体", category_type=CategoryType.INTERNAL_PRODUCTION),
+        Category(name="五金", category_type=CategoryType.EXTERNAL_PURCHASE),
+    ])
+    db_session.commit()
+
+    with query_counter:
+        _create_order(client, "C001", "柜体,五金,台面")
+        _create_order(client, "C002", "柜体,五金")
+    # 多个订单、多个类目只加载一次类目表
+    assert len(_category_selects(query_counter.statements)) == 1
+
+    # 新增类目后缓存失效，新类目立即生效
+    response = client.post("/api/v1/categories/", json={"name": "台面", "category_type": "外购项"})
+    assert response.status_code == 201
+    _create_order(client, "C003", "台面")
+
+    item_types = dict(
+        db_session.query(SplitProgress.order_number, SplitProgress.item_type)
+        .filter(SplitProgress.category_name == "台面").all()
+    )
+    # 类目不存在时默认为厂内生产项
+    assert item_types == {"C001": ItemType.INTERNAL, "C003": ItemType.EXTERNAL}
+
+    stats = client.get("/api/v1/health/cache").json()["caches"]["categories"]
+    assert stats["misses"] == 2
+    assert stats["hits"] == 4
+
+
+def test_user_lookups_are_cached_and_invalidated(client, db_session, query_counter):
+    db_session.add(User(username="拆单员", password="x", role=UserRole.SPLITTING))
+    db_session.commit()
+
+    with query_counter:
+        first = get_user_info(db_session, "拆单员")
+        second = get_user_info(db_session, "拆单员")
+        assert get_user_info(db_session, "不存在") is None
+        assert get_user_info(db_session, "不存在") is None
+    assert first == second
+    assert first.role == UserRole.SPLITTING
+    assert query_counter.count == 2
+
+    response = client.delete("/api/v1/users/拆单员")
+    assert response.status_code == 200
+    assert get_user_info(db_session, "拆单员") is None
+
+    stats = client.get("/api/v1/health/cache").json()["caches"]["users"]
+    assert stats == {"size": 2, "ttl_seconds": stats["ttl_seconds"], "hits": 2, "misses": 3, "hit_rate": 0.4}
@@ -0,0 +1,68 @@
+"""小程序订单列表查询次数回归测试"""
+
+import pytest
+
+from app.models.order import Order
+from app.models.split import Split
+from app.models.production import Production
+
+
+def _seed(db, count, prefix):
+    for i in range(count):
+        order_number = f"{prefix}{i:04d}"
+        order = Order(
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            address="测试地址",
+            assignment_date="2024-01-01",
+            category_name="柜体",
+            order_type="设计单",
+            order_status="已下单"
+        )
+        db.add(order)
+        db.flush()
+        db.add(Split(
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            address="测试地址",
+            order_date="2024-01-10",
+            order_type="设计单",
+            order_status="已下单",
+            splitter="拆单员A"
+        ))
+        db.add(Production(
+            order_id=order.id,
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            expected_shipping_date="2024-02-01",
+            order_status="已齐料"
+        ))
+    db.commit()
+
+
+@pytest.mark.parametrize("order_progress", [
+    ["设计"],
+    ["拆单"],
+    ["生产"],
+    ["设计", "拆单", "生产"],
+])
+def test_miniprogram_list_query_count_is_constant(client, db_session, query_counter, order_progress):
+    _seed(db_session, 2, prefix="MA")
+    with query_counter:
+        response = client.post("/api/v1/miniprogram-orders/list", json={
+            "order_progress": order_progress, "page": 1, "page_size": 20
+        })
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+    small_count = query_counter.count
+
+    _seed(db_session, 25, prefix="MB")
+    with query_counter:
+        response = client.post("/api/v1/miniprogram-orders/list", json={
+            "order_progress": order_progress, "page": 1, "page_size": 20
+        })
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 20
+
+    assert query_counter.count == small_count
+    assert query_counter.count <= 6
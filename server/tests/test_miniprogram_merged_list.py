@@ -0,0 +1,102 @@
+"""小程序合并订单列表测试"""
+
+from app.models.order import Order
+from app.models.split import Split
+from app.models.production import Production
+
+
+def _seed(db):
+    # MP0001-MP0004: 设计 + 拆单 + 生产；MP0005-MP0006: 仅拆单 + 生产；MP0007: 仅生产
+    for i in range(1, 8):
+        order_number = f"MP{i:04d}"
+        order_id = None
+        if i <= 4:
+            order = Order(
+                order_number=order_number,
+                customer_name=f"客户{i}",
+                address="测试地址",
+                assignment_date="2024-01-01",
+                category_name="柜体",
+                order_type="设计单",
+                order_status="已下单" if i % 2 else "量尺"
+            )
+            db.add(order)
+            db.flush()
+            order_id = order.id
+        if i <= 6:
+            db.add(Split(
+                order_number=order_number,
+                customer_name=f"客户{i}",
+                address="测试地址",
+                order_date="2024-01-10",
+                order_type="设计单",
+                order_status="已下单" if i % 2 else "拆单中",
+                splitter="拆单员A"
+            ))
+        db.add(Production(
+            order_id=order_id or 0,
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            expected_shipping_date="2024-02-01",
+            order_status="已齐料"
+        ))
+    db.commit()
+
+
+def test_merged_list_dedupes_by_priority_and_sorts(client, db_session):
+    _seed(db_session)
+
+    response = client.post("/api/v1/miniprogram-orders/list", json={"no_pagination": True})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 7
+    assert [item["order_number"] for item in data["items"]] == [f"MP{i:04d}" for i in range(7, 0, -1)]
+    statuses = {item["order_number"]: item["order_status"] for item in data["items"]}
+    # 设计已下单 -> 拆单已下单 -> 生产状态
+    assert statuses["MP0001"] == "生产-已齐料"
+    assert statuses["MP0002"] == "设计-量尺"
+    # 拆单中的订单来自拆单表
+    assert statuses["MP0006"] == "拆单-拆单中"
+    assert statuses["MP0005"] == "生产-已齐料"
+    assert statuses["MP0007"] == "生产-已齐料"
+
+
+def test_merged_list_shows_the_record_matching_the_filters(client, db_session):
+    for order_status in ("拆单中", "已审核"):
+        db_session.add(Split(order_number="MP0100", customer_name="客户", address="测试地址",
+                             order_date="2024-01-10", order_type="设计单", order_status=order_status))
+    db_session.commit()
+
+    response = client.post("/api/v1/miniprogram-orders/list", json={
+        "no_pagination": True, "order_progress": ["拆单", "生产"], "order_status_detail": ["已审核"]
+    })
+
+    items = response.json()["items"]
+    assert [(item["order_number"], item["order_status"]) for item in items] == [("MP0100", "拆单-已审核")]
+
+
+def test_merged_list_paginates_in_database(client, db_session):
+    _seed(db_session)
+
+    response = client.post("/api/v1/miniprogram-orders/list", json={"page": 2, "page_size": 3})
+
+    data = response.json()
+    assert data["total"] == 7
+    assert data["total_pages"] == 3
+    assert [item["order_number"] for item in data["items"]] == ["MP0004", "MP0003", "MP0002"]
+
+
+def test_merged_list_respects_selected_progress_and_filters(client, db_session):
+    _seed(db_session)
+
+    response = client.post("/api/v1/miniprogram-orders/list", json={
+        "order_progress": ["拆单", "生产"],
+        "splitter": "拆单员",
+        "no_pagination": True
+    })
+
+    data = response.json()
+    # 拆单员筛选对拆单表和生产表分别生效，生产表的拆单员为空
+    assert data["total"] == 6
+    assert all(item["splitter"] == "拆单员A" for item in data["items"])
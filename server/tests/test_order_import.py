@@ -0,0 +1,120 @@
+"""订单批量导入测试"""
+
+import json
+
+from app.models.category import Category, CategoryType
+from app.models.order import Order
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType
+from app.utils.completion import rebuild_completion_counters
+from app.utils.order_import import import_orders, iter_import_rows
+
+CSV_CONTENT = """order_number,customer_name,address,assignment_date,category_name,order_type,is_installation,order_amount
+IM001,客户1,地址1,2024-01-05,"柜体,五金",生产单,是,1000.5
+IM002,客户2,地址2,2024/01/06,柜体,设计单,否,
+IM003,客户3,地址3,2024-13-01,柜体,设计单,,
+IM004,客户4,地址4,2024-01-07,,设计单,,
+IM001,客户1,地址1,2024-01-05,柜体,设计单,,
+EXIST,客户5,地址5,2024-01-08,柜体,设计单,,
+""".encode("utf-8-sig")
+
+
+def _seed(db):
+    db.add_all([
+        Category(name="柜体", category_type=CategoryType.INTERNAL_PRODUCTION),
+        Category(name="五金", category_type=CategoryType.EXTERNAL_PURCHASE),
+        Order(order_number="EXIST", customer_name="已有", address="地址", assignment_date="2024-01-01",
+              category_name="柜体", order_type="设计单", order_status="进行中"),
+    ])
+    db.commit()
+
+
+def test_import_csv_creates_orders_splits_and_reports_errors(client, db_session):
+    _seed(db_session)
+
+    response = client.post("/api/v1/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["code"] == 200
+    report = body["data"]
+    assert report["total_rows"] == 6
+    assert report["created_orders"] == 2
+    assert report["created_splits"] == 1
+    assert report["created_split_progress"] == 2
+    errors = {error["row"]: error for error in report["errors"]}
+    assert sorted(errors) == [4, 5, 6, 7]
+    assert "日期格式错误" in errors[4]["error"]
+    assert "category_name" in errors[5]["error"]
+    assert errors[6]["error"] == "订单编号在导入文件中重复"
+    assert errors[7]["error"] == "订单编号已存在"
+
+    orders = {order.order_number: order for order in db_session.query(Order).all()}
+    assert orders["IM001"].order_status == "已下单"
+    assert orders["IM001"].is_installation is True
+    assert orders["IM002"].order_status == "进行中"
+    assert orders["IM002"].assignment_date == "2024-01-06"
+
+    split = db_session.query(Split).filter(Split.order_number == "IM001").one()
+    assert split.order_date == "2024-01-05"
+    assert split.order_status == "未开始"
+    item_types = dict(
+        db_session.query(SplitProgress.category_name, SplitProgress.item_type)
+        .filter(SplitProgress.split_id == split.id).all()
+    )
+    assert item_types == {"柜体": ItemType.INTERNAL, "五金": ItemType.EXTERNAL}
+    # 写入时给出的进度完成计数与按进度表统计的一致
+    assert rebuild_completion_counters(db_session, dry_run=True)["splits"] == (1, 0)
+
+
+def test_import_dry_run_writes_nothing(client, db_session):
+    _seed(db_session)
+
+    response = client.post(
+        "/api/v1/orders/import?dry_run=true",
+        files={"file": ("orders.csv", CSV_CONTENT, "text/csv")}
+    )
+
+    assert response.json()["data"]["created_orders"] == 2
+    assert db_session.query(Order).count() == 1
+
+
+def test_import_jsonl_in_chunks(db_session, query_counter):
+    _seed(db_session)
+    lines = [
+        json.dumps({
+            "order_number": f"JL{i:03d}", "customer_name": "客户", "address": "地址",
+            "assignment_date": "2024-02-01", "category_name": "柜体,五金", "order_type": "生产单",
+        }, ensure_ascii=False)
+        for i in range(25)
+    ]
+    content = "\n".join(lines).encode("utf-8")
+
+    with query_counter:
+        report = import_orders(db_session, iter_import_rows(content, "orders.jsonl"), chunk_size=10)
+
+    assert report.created_orders == 25
+    assert report.created_split_progress == 50
+    # 每块：查已有编号、写订单、写拆单、查拆单ID、写拆单进度
+    inserts = [statement for statement in query_counter.statements if statement.startswith("INSERT")]
+    assert len(inserts) == 3 * 3
+    assert db_session.query(SplitProgress).count() == 50
+
+
+def test_import_exported_xlsx(client, db_session):
+    _seed(db_session)
+    exported = client.post("/api/v1/orders/export?format=xlsx", json={}).content
+    db_session.query(Order).delete()
+    db_session.commit()
+
+    report = import_orders(db_session, iter_import_rows(exported, "订单列表.xlsx"))
+
+    assert report.errors == []
+    assert report.created_orders == 1
+    order = db_session.query(Order).one()
+    assert (order.order_number, order.assignment_date, order.category_name) == ("EXIST", "2024-01-01", "柜体")
+
+
+def test_import_rejects_unknown_file_type(client):
+    response = client.post("/api/v1/orders/import", files={"file": ("orders.txt", b"abc", "text/plain")})
+    assert response.json()["code"] == 400
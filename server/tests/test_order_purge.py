@@ -0,0 +1,104 @@
+"""订单批量清理测试"""
+
+from sqlalchemy import insert
+
+from app.models.order import Order
+from app.models.order_timeline import OrderTimeline
+from app.models.progress import Progress
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType as SplitItemType
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
+from app.schemas.order import OrderPurgeRequest
+from app.utils.dates import today_str
+from app.utils.order_purge import purge_orders
+from app.utils.order_timeline import etag_cache
+
+MODELS = [Order, Progress, Split, SplitProgress, Production, ProductionProgress, OrderTimeline]
+
+
+def _seed_order(db, number, order_status, assignment_date):
+    order = Order(order_number=number, customer_name="客户", address="测试地址", assignment_date=assignment_date,
+                  category_name="柜体", order_type="生产单", order_status=order_status)
+    db.add(order)
+    db.flush()
+    split = Split(order_number=number, customer_name="客户", address="测试地址", order_type="生产单",
+                  order_status="撤销中")
+    production = Production(order_id=order.id, order_number=number, customer_name="客户", order_status="未齐料")
+    db.add_all([
+        Progress(order_id=order.id, task_item="下单", planned_date="2024-01-10"),
+        split,
+        production,
+    ])
+    db.flush()
+    db.add_all([
+        SplitProgress(split_id=split.id, order_number=number, category_name="柜体", item_type=SplitItemType.INTERNAL),
+        ProductionProgress(production_id=production.id, order_number=number, category_name="柜体",
+                           item_type=ProductionItemType.INTERNAL),
+    ])
+    db.commit()
+    # 快照最后写入：写入拆单、生产等记录时会使快照失效
+    db.execute(insert(OrderTimeline.__table__).values(
+        order_number=number, payload={}, etag="etag", snapshot_date="2024-01-10"))
+    db.commit()
+    return order.id
+
+
+def _seed(db):
+    ids = [_seed_order(db, f"PG{i:03d}", "已撤销", f"2024-0{i % 3 + 1}-15") for i in range(5)]
+    ids.append(_seed_order(db, "KEEP1", "进行中", "2024-01-15"))
+    ids.append(_seed_order(db, "KEEP2", "已撤销", "2025-01-15"))
+    return ids
+
+
+def _row_counts(db):
+    return {model.__tablename__: db.query(model).count() for model in MODELS}
+
+
+def test_purge_dry_run_reports_counts(client, db_session):
+    _seed(db_session)
+    before = _row_counts(db_session)
+
+    response = client.post("/api/v1/orders/purge?dry_run=true", json={
+        "order_status": ["已撤销"], "assignment_date_end": "2024-12-31"
+    })
+
+    body = response.json()
+    assert body["code"] == 200
+    assert body["data"]["dry_run"] is True
+    assert set(body["data"]["deleted"].values()) == {5}
+    assert _row_counts(db_session) == before
+
+
+def test_purge_by_filter_in_chunks(db_session):
+    _seed(db_session)
+    etag_cache.set("PG000", "etag", today_str())
+    etag_cache.set("KEEP1", "etag", today_str())
+
+    counts = purge_orders(
+        db_session, OrderPurgeRequest(order_status=["已撤销"], assignment_date_end="2024-12-31"), chunk_size=2)
+
+    assert set(counts.values()) == {5}
+    assert set(_row_counts(db_session).values()) == {2}
+    assert {order.order_number for order in db_session.query(Order)} == {"KEEP1", "KEEP2"}
+    assert etag_cache.get("PG000") is None
+    assert etag_cache.get("KEEP1") == "etag"
+
+
+def test_purge_by_ids_intersects_filter(client, db_session):
+    ids = _seed(db_session)
+
+    response = client.post("/api/v1/orders/purge", json={"order_ids": [ids[0], ids[5], 999], "order_status": ["已撤销"]})
+
+    assert response.json()["data"]["deleted"]["orders"] == 1
+    assert db_session.query(Order).filter(Order.id == ids[0]).count() == 0
+    assert db_session.query(Order).filter(Order.id == ids[5]).count() == 1
+
+
+def test_purge_requires_criteria(client, db_session):
+    _seed(db_session)
+
+    response = client.post("/api/v1/orders/purge", json={})
+
+    assert response.json()["code"] == 400
+    assert db_session.query(Order).count() == 7
@@ -0,0 +1,104 @@
+"""订单状态批量更新测试"""
+
+from app.models.category import Category, CategoryType
+from app.models.order import Order
+from app.models.progress import Progress
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType
+from app.utils.cache import get_category_types
+from app.utils.completion import rebuild_completion_counters
+from app.utils.dates import today_str
+
+
+def _seed_order(db, number, with_order_progress=True, paid=False):
+    order = Order(order_number=number, customer_name="客户", address="测试地址", assignment_date="2024-01-01",
+                  category_name="柜体,五金", order_type="生产单", order_status="进行中")
+    db.add(order)
+    db.flush()
+    if with_order_progress:
+        db.add(Progress(order_id=order.id, task_item="下单", planned_date="2024-01-10"))
+    db.add(Progress(order_id=order.id, task_item="打款", planned_date="2024-01-05",
+                    actual_date="2024-01-06" if paid else None))
+    db.commit()
+    return order.id
+
+
+def _seed_categories(db):
+    db.add_all([
+        Category(name="柜体", category_type=CategoryType.INTERNAL_PRODUCTION),
+        Category(name="五金", category_type=CategoryType.EXTERNAL_PURCHASE),
+    ])
+    db.commit()
+
+
+def test_batch_place_orders_creates_splits(client, db_session):
+    _seed_categories(db_session)
+    paid = _seed_order(db_session, "OS001", paid=True)
+    unpaid = _seed_order(db_session, "OS002")
+    no_progress = _seed_order(db_session, "OS003", with_order_progress=False)
+    measured = _seed_order(db_session, "OS004")
+
+    response = client.patch("/api/v1/orders/status/batch", json={"updates": [
+        {"order_ids": [paid, unpaid, no_progress, 999], "order_status": "已下单"},
+        {"order_ids": [measured, paid], "order_status": "量尺"},
+    ]})
+
+    data = response.json()["data"]
+    assert (data["updated"], data["failed"]) == (3, 3)
+    results = data["results"]
+    assert [result["order_id"] for result in results] == [paid, unpaid, no_progress, 999, measured, paid]
+    assert results[0]["split_created"] is True
+    assert results[0]["order_date"] == today_str()
+    assert results[2]["error"] == "订单中不存在下单进度事项，无法下单"
+    assert results[3]["error"] == "订单不存在"
+    assert results[4]["order_status"] == "量尺" and results[4]["split_created"] is False
+    assert results[5]["error"] == "订单在本次批量更新中重复"
+
+    db_session.expire_all()
+    splits = {split.order_number: split for split in db_session.query(Split).all()}
+    assert set(splits) == {"OS001", "OS002"}
+    assert (splits["OS001"].quote_status, splits["OS001"].actual_payment_date) == ("已打款", "2024-01-06")
+    assert splits["OS002"].quote_status == "未打款"
+    assert splits["OS001"].order_date == today_str()
+    item_types = dict(
+        db_session.query(SplitProgress.category_name, SplitProgress.item_type)
+        .filter(SplitProgress.split_id == splits["OS001"].id).all()
+    )
+    assert item_types == {"柜体": ItemType.INTERNAL, "五金": ItemType.EXTERNAL}
+    assert rebuild_completion_counters(db_session, dry_run=True)["splits"] == (2, 0)
+
+    order_progress = db_session.query(Progress).filter_by(order_id=paid, task_item="下单").one()
+    assert order_progress.actual_date == today_str()
+    assert db_session.get(Order, no_progress).order_status == "进行中"
+
+
+def test_batch_cancel_and_replace_sync_split_status(client, db_session):
+    order_id = _seed_order(db_session, "OS010")
+    client.patch("/api/v1/orders/status/batch", json={"updates": [{"order_ids": [order_id], "order_status": "已下单"}]})
+
+    client.patch("/api/v1/orders/status/batch", json={"updates": [{"order_ids": [order_id], "order_status": "已撤销"}]})
+    db_session.expire_all()
+    assert db_session.query(Split).one().order_status == "撤销中"
+
+    response = client.patch(f"/api/v1/orders/{order_id}/status", json={"order_status": "已下单"})
+    assert response.json()["code"] == 200
+    db_session.expire_all()
+    assert db_session.query(Split).one().order_status == "拆单中"
+    assert db_session.query(Split).count() == 1
+
+
+def test_batch_statement_count_does_not_grow(client, db_session, query_counter):
+    _seed_categories(db_session)
+    # 类目映射已缓存，两次请求的语句一致
+    get_category_types(db_session)
+    counts = []
+    for prefix, size in (("SA", 3), ("SB", 30)):
+        order_ids = [_seed_order(db_session, f"{prefix}{i:03d}") for i in range(size)]
+        with query_counter:
+            response = client.patch("/api/v1/orders/status/batch", json={"updates": [
+                {"order_ids": order_ids, "order_status": "已下单"}
+            ]})
+        assert response.json()["data"]["updated"] == size
+        counts.append(query_counter.count)
+
+    assert counts[0] == counts[1]
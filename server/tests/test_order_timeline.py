@@ -0,0 +1,151 @@
+"""小程序订单详情快照测试"""
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.models.order import Order
+from app.models.progress import Progress
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType
+from app.models.order_timeline import OrderTimeline
+from app.utils.order_timeline import etag_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_etag_cache():
+    etag_cache.clear()
+    yield
+    etag_cache.clear()
+
+
+def _seed(db, order_number="TL0001"):
+    order = Order(
+        order_number=order_number,
+        customer_name="客户",
+        address="测试地址",
+        assignment_date="2024-01-01",
+        category_name="柜体",
+        order_type="设计单",
+        order_status="量尺"
+    )
+    db.add(order)
+    db.flush()
+    db.add(Progress(order_id=order.id, task_item="量尺", planned_date="2024-01-02"))
+    db.add(Split(
+        order_number=order_number,
+        customer_name="客户",
+        address="测试地址",
+        order_type="设计单",
+        order_status="未开始"
+    ))
+    db.commit()
+    return order
+
+
+def test_detail_serves_snapshot_and_supports_etag(client, db_session, query_counter):
+    _seed(db_session)
+
+    response = client.get("/api/v1/miniprogram-orders/detail/TL0001")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    data = response.json()["data"]
+    assert data["design_progress"]["design_process"] == "量尺:2024-01-02:-"
+    assert data["order_info"]["splitter"] is None
+    assert db_session.query(OrderTimeline).filter_by(order_number="TL0001").count() == 1
+
+    # ETag 未变化时返回 304，且不访问数据库
+    with query_counter:
+        response = client.get("/api/v1/miniprogram-orders/detail/TL0001", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert query_counter.count == 0
+
+    # 缓存失效后从快照读取，仍然返回 304
+    etag_cache.clear()
+    with query_counter:
+        response = client.get("/api/v1/miniprogram-orders/detail/TL0001", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert query_counter.count == 1
+
+
+def test_progress_change_invalidates_snapshot(client, db_session):
+    order = _seed(db_session)
+    etag = client.get("/api/v1/miniprogram-orders/detail/TL0001").headers["etag"]
+
+    progress = db_session.query(Progress).filter_by(order_id=order.id).one()
+    progress.actual_date = "2024-01-03"
+    db_session.commit()
+
+    assert db_session.query(OrderTimeline).filter_by(order_number="TL0001").count() == 0
+    response = client.get("/api/v1/miniprogram-orders/detail/TL0001", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["data"]["design_progress"]["design_process"] == "量尺:2024-01-02:2024-01-03"
+
+
+def test_bulk_update_invalidates_snapshot(client, db_session):
+    _seed(db_session)
+    etag = client.get("/api/v1/miniprogram-orders/detail/TL0001").headers["etag"]
+
+    db_session.query(Split).filter(Split.order_number == "TL0001").update({"splitter": "拆单员A"})
+    db_session.commit()
+
+    response = client.get("/api/v1/miniprogram-orders/detail/TL0001", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"]["order_info"]["splitter"] == "拆单员A"
+
+
+def test_bulk_insert_invalidates_snapshot(client, db_session):
+    order = _seed(db_session)
+    client.get("/api/v1/miniprogram-orders/detail/TL0001")
+
+    db_session.execute(insert(Progress), [
+        {"order_id": order.id, "task_item": "初稿", "planned_date": "2024-01-05"},
+    ])
+    db_session.commit()
+
+    assert db_session.query(OrderTimeline).filter_by(order_number="TL0001").count() == 0
+
+
+def test_bulk_update_by_primary_key_invalidates_only_affected_orders(client, db_session):
+    for order_number in ("TL0001", "TL0002", "TL0003"):
+        _seed(db_session, order_number)
+    split = db_session.query(Split).filter(Split.order_number == "TL0002").one()
+    progress = SplitProgress(split_id=split.id, order_number="TL0002", category_name="柜体", item_type=ItemType.INTERNAL)
+    db_session.add(progress)
+    db_session.commit()
+    for order_number in ("TL0001", "TL0002", "TL0003"):
+        client.get(f"/api/v1/miniprogram-orders/detail/{order_number}")
+    assert db_session.query(OrderTimeline).count() == 3
+
+    db_session.execute(update(SplitProgress), [{"id": progress.id, "remarks": "备注"}])
+    db_session.commit()
+
+    assert {timeline.order_number for timeline in db_session.query(OrderTimeline)} == {"TL0001", "TL0003"}
+
+
+def test_core_table_update_invalidates_snapshot(client, db_session):
+    _seed(db_session)
+    _seed(db_session, "TL0002")
+    client.get("/api/v1/miniprogram-orders/detail/TL0001")
+    client.get("/api/v1/miniprogram-orders/detail/TL0002")
+
+    table = Split.__table__
+    db_session.execute(update(table).where(table.c.order_number == "TL0001").values(splitter="拆单员A"))
+    db_session.commit()
+
+    assert {timeline.order_number for timeline in db_session.query(OrderTimeline)} == {"TL0002"}
+
+
+def test_rolled_back_change_keeps_snapshot(client, db_session):
+    _seed(db_session)
+    client.get("/api/v1/miniprogram-orders/detail/TL0001")
+
+    db_session.query(Split).filter(Split.order_number == "TL0001").update({"splitter": "拆单员A"})
+    db_session.rollback()
+
+    assert db_session.query(OrderTimeline).filter_by(order_number="TL0001").count() == 1
+
+
+def test_missing_order_returns_404(client):
+    response = client.get("/api/v1/miniprogram-orders/detail/NOPE")
+    assert response.status_code == 404
@@ -0,0 +1,122 @@
+"""拆单下单测试"""
+
+from app.models.order import Order
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType as SplitItemType
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
+from app.utils.completion import rebuild_completion_counters
+from app.utils.dates import today_str
+
+
+def _seed(db, number, items):
+    db.add(Order(order_number=number, customer_name="客户", address="测试地址", assignment_date="2024-01-01",
+                 category_name="柜体", order_type="生产单", order_status="进行中"))
+    split = Split(order_number=number, customer_name="客户", address="测试地址", order_type="生产单",
+                  order_status="拆单中", designer="设计师A", actual_payment_date="2024-01-02")
+    db.add(split)
+    db.flush()
+    for category, internal, done_date in items:
+        db.add(SplitProgress(
+            split_id=split.id, order_number=number, category_name=category,
+            item_type=SplitItemType.INTERNAL if internal else SplitItemType.EXTERNAL,
+            split_date=done_date if internal else None,
+            purchase_date=None if internal else done_date,
+        ))
+    db.commit()
+    return split.id
+
+
+def _progress(db, number):
+    return {
+        progress.category_name: progress
+        for progress in db.query(ProductionProgress).filter(ProductionProgress.order_number == number)
+    }
+
+
+def test_place_order_creates_production(client, db_session):
+    split_id = _seed(db_session, "PO001", [("柜体", True, "2024-01-05"), ("门板", False, None)])
+
+    response = client.put(f"/api/v1/splits/{split_id}/place-order")
+
+    body = response.json()
+    assert body["code"] == 200
+    assert body["data"]["production_created"] is True
+    assert body["data"]["completion_date"] == today_str()
+    assert db_session.query(Order).one().order_status == "已下单"
+
+    production = db_session.query(Production).one()
+    assert production.internal_production_items == "柜体"
+    assert production.external_purchase_items == "门板"
+    assert production.expected_delivery_date == "2024-01-22"
+    assert production.designer == "设计师A"
+    progress = _progress(db_session, "PO001")
+    assert progress["柜体"].order_date == "2024-01-05"
+    assert progress["门板"].item_type == ProductionItemType.EXTERNAL
+    assert progress["五金"].order_date == today_str()
+    assert production.total_items == 3
+    assert rebuild_completion_counters(db_session, dry_run=True)["productions"] == (1, 0)
+
+
+def test_place_order_again_syncs_existing_production(client, db_session):
+    split_id = _seed(db_session, "PO002", [("柜体", True, None), ("门板", False, None)])
+    client.put(f"/api/v1/splits/{split_id}/place-order")
+
+    # 调整拆单类目：门板改为厂内，删除柜体，新增玻璃
+    db_session.query(SplitProgress).filter(SplitProgress.category_name == "柜体").delete()
+    door = db_session.query(SplitProgress).filter(SplitProgress.category_name == "门板").one()
+    door.item_type = SplitItemType.INTERNAL
+    door.split_date = "2024-01-08"
+    db_session.add(SplitProgress(split_id=split_id, order_number="PO002", category_name="玻璃",
+                                 item_type=SplitItemType.EXTERNAL, purchase_date="2024-01-09"))
+    db_session.commit()
+
+    response = client.put(f"/api/v1/splits/{split_id}/place-order")
+
+    assert response.json()["data"]["production_created"] is False
+    db_session.expire_all()
+    progress = _progress(db_session, "PO002")
+    assert set(progress) == {"门板", "玻璃", "五金"}
+    assert (progress["门板"].item_type, progress["门板"].order_date) == (ProductionItemType.INTERNAL, "2024-01-08")
+    assert progress["玻璃"].order_date == "2024-01-09"
+    production = db_session.query(Production).one()
+    assert (production.internal_production_items, production.external_purchase_items) == ("门板", "玻璃")
+    assert production.total_items == 3
+
+
+def test_place_order_missing_split(client):
+    response = client.put("/api/v1/splits/999/place-order")
+    assert response.json()["code"] == 404
+
+
+def test_batch_place_orders_reports_per_split(client, db_session):
+    first = _seed(db_session, "PB001", [("柜体", True, None)])
+    second = _seed(db_session, "PB002", [("门板", False, None)])
+    duplicate = Split(order_number="PB001", customer_name="客户", address="测试地址", order_type="生产单",
+                      order_status="拆单中")
+    db_session.add(duplicate)
+    db_session.commit()
+
+    response = client.post("/api/v1/splits/place-orders", json={"split_ids": [first, 999, second, duplicate.id]})
+
+    data = response.json()["data"]
+    assert (data["placed"], data["failed"]) == (2, 2)
+    results = {item["split_id"]: item for item in data["results"]}
+    assert results[999]["error"] == "拆单不存在"
+    assert results[duplicate.id]["error"] == "同一订单的拆单重复下单"
+    assert results[first]["production_created"] and results[second]["production_created"]
+    assert db_session.query(Production).count() == 2
+    assert set(_progress(db_session, "PB002")) == {"门板", "五金"}
+
+
+def test_batch_place_orders_statement_count_does_not_grow(client, db_session, query_counter):
+    counts = []
+    for prefix, size in (("PS", 2), ("PL", 20)):
+        split_ids = [_seed(db_session, f"{prefix}{i:03d}", [("柜体", True, None), ("门板", False, None)])
+                     for i in range(size)]
+        with query_counter:
+            response = client.post("/api/v1/splits/place-orders", json={"split_ids": split_ids})
+        assert response.json()["data"]["placed"] == size
+        counts.append(query_counter.count)
+
+    assert counts[0] == counts[1]
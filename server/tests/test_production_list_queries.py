@@ -0,0 +1,79 @@
+"""生产管理列表接口查询次数回归测试"""
+
+from app.models.order import Order
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType
+
+
+def _seed_productions(db, count, prefix="PD"):
+    for i in range(count):
+        order_number = f"{prefix}{i:04d}"
+        order = Order(
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            address="测试地址",
+            assignment_date="2024-01-01",
+            category_name="柜体,石材",
+            order_type="设计单",
+            order_status="已下单"
+        )
+        db.add(order)
+        db.flush()
+        production = Production(
+            order_id=order.id,
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            expected_shipping_date="2024-02-01",
+            order_status="未齐料"
+        )
+        db.add(production)
+        db.flush()
+        db.add_all([
+            ProductionProgress(
+                production_id=production.id,
+                order_number=order_number,
+                item_type=ItemType.INTERNAL,
+                category_name="柜体",
+                expected_material_date="2024-01-20",
+                actual_storage_date="2024-01-22",
+                quantity="12"
+            ),
+            ProductionProgress(
+                production_id=production.id,
+                order_number=order_number,
+                item_type=ItemType.EXTERNAL,
+                category_name="石材",
+                expected_arrival_date="2024-01-25"
+            ),
+        ])
+    db.commit()
+
+
+def test_production_list_builds_progress_summary(client, db_session):
+    _seed_productions(db_session, 1)
+
+    response = client.post("/api/v1/productions/list", json={"page": 1, "page_size": 10})
+
+    assert response.status_code == 200
+    item = response.json()["data"][0]
+    assert item["purchase_status"] == "柜体材料:2024-01-20:2024-01-22; 石材:2024-01-25:"
+    assert item["finished_goods_quantity"] == "柜体:12; 石材:"
+
+
+def test_production_list_query_count_does_not_grow_with_rows(client, db_session, query_counter):
+    _seed_productions(db_session, 2)
+    with query_counter:
+        response = client.post("/api/v1/productions/list", json={"no_pagination": True})
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 2
+    small_count = query_counter.count
+
+    _seed_productions(db_session, 30, prefix="PE")
+    with query_counter:
+        response = client.post("/api/v1/productions/list", json={"no_pagination": True})
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 32
+
+    # 总数查询 + 生产记录查询 + 一次批量进度查询
+    assert query_counter.count == small_count
+    assert query_counter.count <= 3
@@ -0,0 +1,101 @@
+"""生产进度批量更新测试"""
+
+from app.api.v1.endpoints import production_progress
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType as SplitItemType
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
+
+
+def _seed(db, size):
+    split = Split(order_number="PP001", customer_name="客户", address="测试地址",
+                  order_date="2024-01-01", order_type="生产单", order_status="拆单中")
+    production = Production(order_id=1, order_number="PP001", customer_name="客户", order_status="未齐料")
+    db.add_all([split, production])
+    db.flush()
+    for i in range(size):
+        db.add(SplitProgress(split_id=split.id, order_number="PP001", category_name=f"外购{i}",
+                             item_type=SplitItemType.EXTERNAL))
+        db.add(ProductionProgress(production_id=production.id, order_number="PP001", category_name=f"外购{i}",
+                                  item_type=ProductionItemType.EXTERNAL))
+    db.commit()
+    return split.id, production.id
+
+
+def _post(client, db_session, production_id, extra=()):
+    items = db_session.query(ProductionProgress).filter(ProductionProgress.production_id == production_id).all()
+    payload = [
+        {"id": item.id, "order_date": "2024-01-11", "actual_arrival_date": "2024-01-20"}
+        for item in items
+    ]
+    return client.post(f"/api/v1/production-progress/production/{production_id}/batch",
+                       json=payload + list(extra))
+
+
+def test_batch_syncs_order_date_to_split_purchase_date(client, db_session):
+    split_id, production_id = _seed(db_session, 3)
+
+    response = _post(client, db_session, production_id, extra=[
+        {"item_type": "internal", "category_name": "柜体", "order_date": "2024-01-12"}
+    ])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 4
+    assert all(item["id"] for item in data)
+    assert data[-1]["item_type"] == "internal"
+
+    db_session.expire_all()
+    synced = db_session.query(SplitProgress).filter(SplitProgress.split_id == split_id).all()
+    assert {(item.purchase_date, item.cycle_days) for item in synced} == {("2024-01-11", "10天")}
+    split = db_session.get(Split, split_id)
+    assert (split.total_items, split.completed_external_items) == (3, 3)
+
+
+def test_batch_split_sync_failure_rolls_back(client, db_session, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("同步失败")
+
+    monkeypatch.setattr(production_progress, "days_between", fail)
+    split_id, production_id = _seed(db_session, 2)
+
+    response = _post(client, db_session, production_id)
+
+    assert response.status_code == 500
+    db_session.expire_all()
+    assert {item.order_date for item in db_session.query(ProductionProgress)} == {None}
+    assert {item.purchase_date for item in db_session.query(SplitProgress)} == {None}
+
+
+def test_batch_counter_refresh_failure_rolls_back_status_change(client, db_session, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("计数刷新失败")
+
+    monkeypatch.setattr(production_progress, "refresh_production_counters", fail)
+    split_id, production_id = _seed(db_session, 2)
+
+    # 新增的厂内项已齐料，生产状态会变为已齐料
+    response = _post(client, db_session, production_id, extra=[
+        {"item_type": "internal", "category_name": "柜体", "actual_storage_date": "2024-01-15"}
+    ])
+
+    assert response.status_code == 500
+    db_session.expire_all()
+    assert db_session.get(Production, production_id).order_status == "未齐料"
+    assert db_session.query(ProductionProgress).count() == 2
+    assert {item.order_date for item in db_session.query(ProductionProgress)} == {None}
+    assert {item.purchase_date for item in db_session.query(SplitProgress)} == {None}
+
+
+def test_batch_statement_count_does_not_grow_with_items(client, db_session, query_counter):
+    counts = []
+    for size in (3, 30):
+        _, production_id = _seed(db_session, size)
+        with query_counter:
+            assert _post(client, db_session, production_id).status_code == 200
+        counts.append(query_counter.count)
+        for model in (ProductionProgress, Production, SplitProgress, Split):
+            db_session.query(model).delete()
+        db_session.commit()
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,82 @@
+"""生产状态批量校验测试"""
+
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType
+from app.utils.production_status_validator import (
+    ProductionStatusValidator,
+    batch_validate_production_status,
+)
+
+# 订单编号 -> (当前状态, 实际出货日期, 下料日期, [(是否厂内, 实际入库日期, 入库时间)], 期望状态)
+CASES = {
+    "P1": ("未齐料", None, None, [(True, None, None)], "未齐料"),
+    "P2": ("未齐料", None, None, [(True, "2024-01-02", None), (False, None, None)], "已齐料"),
+    "P3": ("已齐料", None, "2024-01-05", [(True, "2024-01-02", None)], "已下料"),
+    "P4": ("未齐料", None, "2024-01-05", [(True, "2024-01-02", "10:00")], "已入库"),
+    "P5": ("已下料", "2024-02-01", None, [], "已发货"),
+    "P6": ("已完成", None, None, [], "已完成"),
+    "P7": ("已齐料", None, None, [], "未齐料"),
+}
+
+
+def _seed(db):
+    ids = {}
+    for index, (number, (status, delivery, cutting, items, _)) in enumerate(CASES.items(), start=1):
+        production = Production(
+            order_id=index, order_number=number, customer_name="客户", order_status=status,
+            actual_delivery_date=delivery, cutting_date=cutting
+        )
+        db.add(production)
+        db.flush()
+        ids[number] = production.id
+        for internal, storage_date, storage_time in items:
+            db.add(ProductionProgress(
+                production_id=production.id,
+                order_number=number,
+                category_name="柜体" if internal else "五金",
+                item_type=ItemType.INTERNAL if internal else ItemType.EXTERNAL,
+                actual_storage_date=storage_date,
+                storage_time=storage_time,
+            ))
+    db.commit()
+    return ids
+
+
+def test_bulk_validation_matches_single_rules(db_session, query_counter):
+    ids = _seed(db_session)
+
+    with query_counter:
+        statuses = ProductionStatusValidator.bulk_validate_and_update_status(db_session)
+
+    assert statuses == {ids[number]: case[-1] for number, case in CASES.items()}
+    # 生产记录、进度项各一次查询，按目标状态分组更新（不计订单时间线快照的失效语句）
+    statements = [
+        statement for statement in query_counter.statements
+        if "order_timelines" not in statement and not statement.startswith("SELECT productions.order_number")
+    ]
+    updates = [statement for statement in statements if statement.startswith("UPDATE")]
+    selects = [statement for statement in statements if statement.startswith("SELECT")]
+    assert len(selects) == 2
+    assert len(updates) == len({"已齐料", "已下料", "已入库", "已发货", "未齐料"})
+
+    db_session.expire_all()
+    for number, case in CASES.items():
+        production = db_session.get(Production, ids[number])
+        assert production.order_status == case[-1]
+        # 与逐条校验结果一致
+        assert ProductionStatusValidator.validate_and_update_status(db_session, ids[number]) == case[-1]
+
+
+def test_bulk_validation_dry_run_and_missing_ids(db_session):
+    ids = _seed(db_session)
+
+    statuses = ProductionStatusValidator.bulk_validate_and_update_status(
+        db_session, [ids["P2"]], dry_run=True)
+    assert statuses == {ids["P2"]: "已齐料"}
+    db_session.expire_all()
+    assert db_session.get(Production, ids["P2"]).order_status == "未齐料"
+
+    results = batch_validate_production_status(db_session, [ids["P2"], 9999])
+    assert results == {ids["P2"]: "已齐料", 9999: "校验失败"}
+    db_session.expire_all()
+    assert db_session.get(Production, ids["P2"]).order_status == "已齐料"
@@ -0,0 +1,75 @@
+"""拆单列表接口查询次数回归测试"""
+
+from app.models.order import Order
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType
+
+
+def _seed_splits(db, count, prefix="SP"):
+    for i in range(count):
+        order_number = f"{prefix}{i:04d}"
+        db.add(Order(
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            address="测试地址",
+            assignment_date="2024-01-01",
+            category_name="柜体,五金",
+            order_type="设计单",
+            order_status="已下单"
+        ))
+        split = Split(
+            order_number=order_number,
+            customer_name=f"客户{i}",
+            address="测试地址",
+            order_date="2024-01-10",
+            order_type="设计单",
+            order_status="拆单中"
+        )
+        db.add(split)
+        db.flush()
+        db.add_all([
+            SplitProgress(
+                split_id=split.id,
+                order_number=order_number,
+                item_type=ItemType.INTERNAL,
+                category_name="柜体",
+                split_date="2024-01-15"
+            ),
+            SplitProgress(
+                split_id=split.id,
+                order_number=order_number,
+                item_type=ItemType.EXTERNAL,
+                category_name="五金"
+            ),
+        ])
+    db.commit()
+
+
+def test_split_list_builds_progress_items(client, db_session):
+    _seed_splits(db_session, 1)
+
+    response = client.post("/api/v1/splits/list", json={"page": 1, "page_size": 10})
+
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["internal_production_items"] == "柜体:2024-01-15:5"
+    assert item["external_purchase_items"] == "五金::0"
+
+
+def test_split_list_query_count_does_not_grow_with_rows(client, db_session, query_counter):
+    _seed_splits(db_session, 2)
+    with query_counter:
+        response = client.post("/api/v1/splits/list", json={"no_pagination": True})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+    small_count = query_counter.count
+
+    _seed_splits(db_session, 30, prefix="SQ")
+    with query_counter:
+        response = client.post("/api/v1/splits/list", json={"no_pagination": True})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 32
+
+    # 总数查询 + 拆单查询 + 一次批量进度查询
+    assert query_counter.count == small_count
+    assert query_counter.count <= 3
@@ -0,0 +1,90 @@
+"""拆单进度批量更新测试"""
+
+from app.models.split import Split
+from app.models.split_progress import SplitProgress, ItemType as SplitItemType
+from app.models.production import Production
+from app.models.production_progress import ProductionProgress, ItemType as ProductionItemType
+
+
+def _seed(db, categories):
+    split = Split(order_number="SP001", customer_name="客户", address="测试地址",
+                  order_date="2024-01-01", order_type="生产单", order_status="拆单中")
+    production = Production(order_id=1, order_number="SP001", customer_name="客户", order_status="未齐料")
+    db.add_all([split, production])
+    db.flush()
+    for category in categories:
+        # 偶数类目已有拆单进度，奇数类目由批量接口新建
+        if int(category[1:]) % 2 == 0:
+            db.add(SplitProgress(split_id=split.id, order_number="SP001", category_name=category,
+                                 item_type=SplitItemType.INTERNAL, planned_date="2024-01-05",
+                                 split_date="2024-01-06"))
+        db.add(ProductionProgress(production_id=production.id, order_number="SP001", category_name=category,
+                                  item_type=ProductionItemType.INTERNAL))
+    db.add(SplitProgress(split_id=split.id, order_number="SP001", category_name="五金",
+                         item_type=SplitItemType.EXTERNAL))
+    db.add(ProductionProgress(production_id=production.id, order_number="SP001", category_name="五金",
+                              item_type=ProductionItemType.EXTERNAL))
+    db.commit()
+    return split, production
+
+
+def _payload(categories):
+    return {
+        "internal_items": {
+            category: {"plannedDate": "2024-02-01", "splitDate": "" if category == "C0" else "2024-02-03"}
+            for category in categories
+        },
+        "external_items": {"五金": {"purchaseDate": "2024-02-04"}},
+        "remarks": "批量备注",
+    }
+
+
+def _statement_count(client, db_session, query_counter, size):
+    categories = [f"C{i}" for i in range(size)]
+    split, _ = _seed(db_session, categories)
+    with query_counter:
+        response = client.post(f"/api/v1/split-progress/split/{split.id}/batch", json=_payload(categories))
+    assert response.status_code == 200
+    return query_counter.count
+
+
+def test_batch_upserts_progress_and_syncs_production(client, db_session):
+    categories = [f"C{i}" for i in range(6)]
+    split, production = _seed(db_session, categories)
+
+    response = client.post(f"/api/v1/split-progress/split/{split.id}/batch", json=_payload(categories))
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 7
+    db_session.expire_all()
+    rows = {
+        (row.item_type, row.category_name): row
+        for row in db_session.query(SplitProgress).filter(SplitProgress.split_id == split.id)
+    }
+    assert len(rows) == 7
+    assert rows[(SplitItemType.INTERNAL, "C0")].split_date is None
+    assert rows[(SplitItemType.INTERNAL, "C1")].planned_date == "2024-02-01"
+    assert rows[(SplitItemType.INTERNAL, "C2")].split_date == "2024-02-03"
+    assert rows[(SplitItemType.EXTERNAL, "五金")].purchase_date == "2024-02-04"
+    assert db_session.get(Split, split.id).remarks == "批量备注"
+
+    order_dates = dict(
+        db_session.query(ProductionProgress.category_name, ProductionProgress.order_date)
+        .filter(ProductionProgress.production_id == production.id).all()
+    )
+    # 清空的拆单日期不同步
+    assert order_dates == {"C0": None, **{f"C{i}": "2024-02-03" for i in range(1, 6)}, "五金": "2024-02-04"}
+
+
+def test_batch_statement_count_does_not_grow_with_categories(client, db_session, query_counter):
+    small = _statement_count(client, db_session, query_counter, 4)
+    db_session.query(ProductionProgress).delete()
+    db_session.query(Production).delete()
+    db_session.query(SplitProgress).delete()
+    db_session.query(Split).delete()
+    db_session.commit()
+    query_counter.statements.clear()
+
+    large = _statement_count(client, db_session, query_counter, 40)
+
+    assert large == small